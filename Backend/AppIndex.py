@@ -0,0 +1,377 @@
+"""
+Installed-application index for "open <name>".
+
+Sources, in priority order when two of them use the same name:
+- Start Menu shortcuts (recursive, per-user and all-users)
+- UWP / Store apps (Get-StartApps)
+- App Paths registry entries (chrome.exe, winword.exe, ...)
+- Executables on PATH
+
+The index is saved to Data/app_index.json. A refresh only re-lists
+directories whose mtime changed, so after the first build it costs a few
+stat() calls. Lookups are a dict hit, then whole-word, prefix and fuzzy
+matching over the in-memory names. Whole-word and prefix matches must cover
+at least MIN_MATCH_SCORE of the app name, so "python" does not launch
+"python 3 12 module docs".
+
+Directories and sources are constructor arguments, so the indexing logic
+runs on any OS against a synthetic tree:
+    python -m Backend.AppIndex --root /tmp/fake_start_menu chrome "visual studio"
+"""
+import bisect
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import threading
+import time
+from difflib import get_close_matches
+from pathlib import Path
+
+INDEX_PATH = "Data/app_index.json"
+INDEX_VERSION = 2                  # 2: skip words match on word boundaries
+UWP_TTL = 24 * 3600
+SHORTCUT_EXTS = {".lnk", ".url", ".appref-ms", ".exe"}
+SKIP_WORDS = ("uninstall", "readme", "help", "documentation", "release notes", "website")
+SKIP_RE = re.compile(r"\b(?:" + "|".join(re.escape(w) for w in SKIP_WORDS) + r")\b")
+MIN_MATCH_SCORE = 0.5              # share of the app name a partial match must cover
+KIND_PRIORITY = {"shortcut": 0, "uwp": 1, "app_path": 2, "path": 3}
+APP_PATHS_KEY = r"SOFTWARE\Microsoft\Windows\CurrentVersion\App Paths"
+IS_WINDOWS = platform.system() == "Windows"
+
+
+def normalize(name):
+    """Lowercase, drop punctuation and extra spaces: 'Visual Studio Code (User)' -> 'visual studio code user'"""
+    return " ".join(re.sub(r"[^\w\s+#]", " ", name.lower()).split())
+
+
+def default_start_menu_dirs():
+    return [
+        Path(os.environ.get("PROGRAMDATA", "")) / "Microsoft/Windows/Start Menu/Programs",
+        Path(os.environ.get("APPDATA", "")) / "Microsoft/Windows/Start Menu/Programs",
+    ]
+
+
+def default_path_dirs():
+    return [Path(p) for p in os.environ.get("PATH", "").split(os.pathsep) if p]
+
+
+def _path_executable_exts():
+    if IS_WINDOWS:
+        return {e.lower() for e in os.environ.get("PATHEXT", ".EXE;.BAT;.CMD").split(";") if e}
+    return None  # POSIX: executable bit instead of extension
+
+
+class AppIndex:
+    def __init__(self, start_menu_dirs=None, path_dirs=None, index_path=INDEX_PATH,
+                 include_registry=IS_WINDOWS, include_uwp=IS_WINDOWS):
+        self.start_menu_dirs = [Path(d) for d in (start_menu_dirs if start_menu_dirs is not None else default_start_menu_dirs())]
+        self.path_dirs = [Path(d) for d in (path_dirs if path_dirs is not None else default_path_dirs())]
+        self.index_path = Path(index_path) if index_path else None
+        self.include_registry = include_registry
+        self.include_uwp = include_uwp
+
+        self._lock = threading.RLock()
+        self._refreshing = threading.Lock()
+        self._ready = threading.Event()
+        # Persistent state: per-directory listings, registry and UWP results
+        self._dirs = {}
+        self._registry = {}
+        self._uwp = {"time": 0, "entries": {}}
+        # In-memory lookup structures
+        self._entries = {}
+        self._sorted_names = []
+        self._by_word = {}
+
+        self._load()
+
+    # ===============================
+    # PERSISTENCE
+    # ===============================
+    def _load(self):
+        if not self.index_path or not self.index_path.exists():
+            return
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != INDEX_VERSION:
+                return
+            self._dirs = data.get("dirs", {})
+            self._registry = data.get("registry", {})
+            self._uwp = data.get("uwp", self._uwp)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ App index unreadable, rebuilding: {e}")
+            return
+        self._rebuild_lookup()
+        self._ready.set()
+
+    def _save(self):
+        if not self.index_path:
+            return
+        data = {"version": INDEX_VERSION, "dirs": self._dirs, "registry": self._registry, "uwp": self._uwp}
+        tmp_path = self.index_path.with_name(self.index_path.name + ".tmp")
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"⚠️ Could not save app index: {e}")
+
+    # ===============================
+    # SCANNING
+    # ===============================
+    def _scan_dir(self, directory, kind, recursive, seen, stats):
+        """Re-list directory only if its mtime changed; returns nothing, fills self._dirs"""
+        key = str(directory)
+        try:
+            mtime = directory.stat().st_mtime_ns
+        except OSError:
+            return
+        seen.add(key)
+
+        state = self._dirs.get(key)
+        if state is None or state.get("mtime") != mtime or state.get("kind") != kind:
+            stats["listed"] += 1
+            files, subdirs = {}, []
+            exts = _path_executable_exts() if kind == "path" else SHORTCUT_EXTS
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir():
+                                if recursive:
+                                    subdirs.append(entry.name)
+                                continue
+                            suffix = os.path.splitext(entry.name)[1].lower()
+                            if exts is not None:
+                                if suffix not in exts:
+                                    continue
+                            elif not os.access(entry.path, os.X_OK):
+                                continue
+                        except OSError:
+                            continue
+                        stem = os.path.splitext(entry.name)[0] if exts is not None else entry.name
+                        name = normalize(stem)
+                        if name and not SKIP_RE.search(name):
+                            files.setdefault(name, entry.path)
+            except OSError:
+                return
+            state = {"mtime": mtime, "kind": kind, "files": files, "subdirs": subdirs}
+            self._dirs[key] = state
+        else:
+            stats["reused"] += 1
+
+        for sub in state.get("subdirs", []):
+            self._scan_dir(directory / sub, kind, recursive, seen, stats)
+
+    def _scan_registry(self):
+        try:
+            import winreg
+        except ImportError:
+            return
+        entries = {}
+        for hive in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+            try:
+                root = winreg.OpenKey(hive, APP_PATHS_KEY)
+            except OSError:
+                continue
+            with root:
+                index = 0
+                while True:
+                    try:
+                        sub = winreg.EnumKey(root, index)
+                    except OSError:
+                        break
+                    index += 1
+                    try:
+                        with winreg.OpenKey(root, sub) as key:
+                            target = winreg.QueryValue(key, None)
+                    except OSError:
+                        continue
+                    name = normalize(os.path.splitext(sub)[0])
+                    if name and target:
+                        entries.setdefault(name, target.strip('"'))
+        self._registry = entries
+
+    def _scan_uwp(self, force=False):
+        if not force and time.time() - self._uwp.get("time", 0) < UWP_TTL:
+            return
+        try:
+            result = subprocess.run(
+                ["powershell", "-NoProfile", "-Command", "Get-StartApps | ConvertTo-Json -Compress"],
+                capture_output=True, text=True, timeout=20,
+                creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0)
+            )
+            apps = json.loads(result.stdout or "[]")
+        except Exception as e:
+            print(f"⚠️ UWP app scan failed: {e}")
+            return
+        if isinstance(apps, dict):
+            apps = [apps]
+        entries = {}
+        for app in apps:
+            name = normalize(app.get("Name", ""))
+            app_id = app.get("AppID")
+            if name and app_id:
+                entries.setdefault(name, f"shell:AppsFolder\\{app_id}")
+        self._uwp = {"time": time.time(), "entries": entries}
+
+    def refresh(self, force_uwp=False):
+        """Bring the index up to date; unchanged directories are not re-listed"""
+        with self._refreshing:
+            start = time.perf_counter()
+            stats = {"listed": 0, "reused": 0}
+            seen = set()
+            with self._lock:
+                for d in self.start_menu_dirs:
+                    self._scan_dir(d, "shortcut", True, seen, stats)
+                for d in self.path_dirs:
+                    self._scan_dir(d, "path", False, seen, stats)
+                # Forget directories that disappeared or are no longer configured
+                for key in [k for k in self._dirs if k not in seen]:
+                    del self._dirs[key]
+            if self.include_registry:
+                self._scan_registry()
+            if self.include_uwp:
+                self._scan_uwp(force_uwp)
+
+            with self._lock:
+                self._rebuild_lookup()
+                self._save()
+            self._ready.set()
+            stats["apps"] = len(self._entries)
+            stats["ms"] = round((time.perf_counter() - start) * 1000, 1)
+            return stats
+
+    def refresh_async(self):
+        thread = threading.Thread(target=self.refresh, daemon=True, name="app-index")
+        thread.start()
+        return thread
+
+    def wait_ready(self, timeout=None):
+        return self._ready.wait(timeout)
+
+    @property
+    def ready(self):
+        """True once a saved index was loaded or the first refresh finished"""
+        return self._ready.is_set()
+
+    # ===============================
+    # LOOKUP
+    # ===============================
+    def _rebuild_lookup(self):
+        entries = {}
+
+        def add(name, target, kind):
+            current = entries.get(name)
+            if current is None or KIND_PRIORITY[kind] < KIND_PRIORITY[current[1]]:
+                entries[name] = (target, kind)
+
+        for state in self._dirs.values():
+            for name, target in state.get("files", {}).items():
+                add(name, target, state.get("kind", "shortcut"))
+        for name, target in self._registry.items():
+            add(name, target, "app_path")
+        for name, target in self._uwp.get("entries", {}).items():
+            add(name, target, "uwp")
+
+        by_word = {}
+        for name in entries:
+            for word in name.split():
+                by_word.setdefault(word, []).append(name)
+
+        self._entries = entries
+        self._sorted_names = sorted(entries)
+        self._by_word = by_word
+
+    def _best(self, scored):
+        """Highest score, then the most authoritative source, then the shortest name"""
+        return min(scored, key=lambda n: (-scored[n], KIND_PRIORITY[self._entries[n][1]], len(n), n))
+
+    def resolve(self, name):
+        """Return (target, kind) for a spoken app name, or None"""
+        query = normalize(name)
+        if not query:
+            return None
+        with self._lock:
+            entries = self._entries
+            if query in entries:
+                return entries[query]
+
+            # Every spoken word appears in the app name: "chrome" -> "google chrome",
+            # scored by the share of the name's words that were spoken
+            words = query.split()
+            candidates = set(self._by_word.get(words[0], []))
+            for word in words[1:]:
+                candidates &= set(self._by_word.get(word, []))
+            scored = {n: len(words) / len(n.split()) for n in candidates}
+
+            # Prefix: "visual studio" -> "visual studio code", scored by characters covered
+            i = bisect.bisect_left(self._sorted_names, query)
+            while i < len(self._sorted_names) and self._sorted_names[i].startswith(query):
+                n = self._sorted_names[i]
+                scored[n] = max(scored.get(n, 0.0), len(query) / len(n))
+                i += 1
+
+            scored = {n: score for n, score in scored.items() if score >= MIN_MATCH_SCORE}
+            if scored:
+                return entries[self._best(scored)]
+
+            close = get_close_matches(query, self._sorted_names, n=3, cutoff=0.8)
+            if close:
+                return entries[close[0]]
+        return None
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def launch(target, kind):
+    """Start a resolved entry"""
+    if kind == "uwp":
+        subprocess.Popen(["explorer.exe", target])
+    elif IS_WINDOWS:
+        os.startfile(target)
+    else:
+        subprocess.Popen([target])
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_app_index():
+    """Process-wide index; loads the saved copy and refreshes it in the background"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = AppIndex()
+                _index.refresh_async()
+    return _index
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if "--root" in args:
+        i = args.index("--root")
+        root = args[i + 1]
+        del args[i:i + 2]
+        index = AppIndex(start_menu_dirs=[root], path_dirs=[], index_path=None,
+                         include_registry=False, include_uwp=False)
+    else:
+        index = AppIndex()
+
+    for label in ("Cold build", "Incremental"):
+        stats = index.refresh()
+        print(f"{label}: {stats['apps']} apps, {stats['listed']} dirs listed, "
+              f"{stats['reused']} reused, {stats['ms']} ms")
+
+    for query in args:
+        start = time.perf_counter()
+        result = index.resolve(query)
+        elapsed = (time.perf_counter() - start) * 1e6
+        print(f"  {query!r:24} -> {result} ({elapsed:.0f} µs)")
@@ -0,0 +1,199 @@
+"""
+Single long-lived microphone capture shared by hotword, command and
+interrupt listening.
+
+One thread reads the PortAudio stream and fans frames out to consumers.
+Each consumer is a CaptureSource, an sr.AudioSource whose stream reads from
+its own queue, so recognizer.listen() and listen_in_background() work
+unchanged without opening the device again. The recognizer's energy
+threshold follows the background noise continuously instead of through
+blocking adjust_for_ambient_noise() calls. Only the capture thread adapts it;
+the recognizer's own dynamic_energy_threshold is switched off.
+
+The capture also keeps a short timestamped ring of recent frames. A consumer
+can be seeded with the frames captured since a mark (e.g. the end of the
+hotword), so speech that started before it attached is not clipped.
+"""
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import speech_recognition as sr
+
+SAMPLE_RATE = 16000
+CHUNK = 1024
+RING_SECONDS = 3.0
+PREROLL_SECONDS = 1.5
+READ_TIMEOUT = 1.0
+
+
+class _ConsumerStream:
+    """Per-consumer frame queue with the read() interface sr.Recognizer expects"""
+    def __init__(self, maxlen, silence):
+        self._frames = deque(maxlen=maxlen)
+        self._cond = threading.Condition()
+        self._silence = silence
+        self.last_timestamp = None
+
+    def push(self, timestamp, frame):
+        with self._cond:
+            self._frames.append((timestamp, frame))
+            self._cond.notify()
+
+    def read(self, size=None):
+        with self._cond:
+            if not self._frames:
+                self._cond.wait(READ_TIMEOUT)
+            if not self._frames:
+                # Capture stalled: hand back silence so listen() timeouts still work
+                return self._silence
+            self.last_timestamp, frame = self._frames.popleft()
+            return frame
+
+    def close(self):
+        pass
+
+
+class CaptureSource(sr.AudioSource):
+    """sr.AudioSource view of the shared capture (register on enter, detach on exit)"""
+    def __init__(self, capture, preroll_since=None):
+        self.capture = capture
+        self.preroll_since = preroll_since
+        self.SAMPLE_RATE = capture.sample_rate
+        self.SAMPLE_WIDTH = capture.sample_width
+        self.CHUNK = capture.chunk
+        self.stream = None
+
+    def __enter__(self):
+        self.capture.start()
+        self.stream = _ConsumerStream(self.capture.ring_frames, self.capture.silence)
+        self.capture._attach(self.stream, self.preroll_since)
+        return self
+
+    def mark(self):
+        """Capture timestamp of the last frame this consumer has read"""
+        return self.stream.last_timestamp if self.stream is not None else None
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.stream is not None:
+            self.capture._detach(self.stream)
+            self.stream = None
+
+
+class AudioCapture:
+    def __init__(self, recognizer=None, sample_rate=SAMPLE_RATE, chunk=CHUNK, ring_seconds=RING_SECONDS):
+        self.recognizer = recognizer
+        self.sample_rate = sample_rate
+        self.chunk = chunk
+        self.sample_width = 2
+        self.seconds_per_buffer = chunk / sample_rate
+        self.ring_frames = max(1, int(ring_seconds / self.seconds_per_buffer))
+        self.silence = b"\x00" * (chunk * self.sample_width)
+        # The capture thread owns the noise floor. recognizer.listen() would
+        # otherwise adapt the same threshold from every listener thread too.
+        self.track_noise = bool(recognizer is not None and recognizer.dynamic_energy_threshold)
+        if self.track_noise:
+            recognizer.dynamic_energy_threshold = False
+
+        self._ring = deque(maxlen=self.ring_frames)
+        self._consumers = []
+        self._lock = threading.Lock()
+        self._thread = None
+        self._running = threading.Event()
+        self._microphone = None
+
+    # ===============================
+    # LIFECYCLE
+    # ===============================
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._microphone = sr.Microphone(sample_rate=self.sample_rate, chunk_size=self.chunk)
+            self._microphone.__enter__()
+            self.sample_width = self._microphone.SAMPLE_WIDTH
+            self._running.set()
+            self._thread = threading.Thread(target=self._capture_loop, daemon=True)
+            self._thread.start()
+        print(f"🎙️ Audio capture started ({self.sample_rate} Hz)")
+
+    def stop(self):
+        self._running.clear()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        with self._lock:
+            if self._microphone is not None:
+                try:
+                    self._microphone.__exit__(None, None, None)
+                except Exception:
+                    pass
+            self._microphone = None
+            self._thread = None
+
+    def source(self, preroll_since=None):
+        """New consumer; with preroll_since it starts with the ring frames captured after that mark"""
+        return CaptureSource(self, preroll_since)
+
+    def preroll(self, since=None, seconds=PREROLL_SECONDS):
+        """Frames captured after since (a timestamp), limited to the last seconds of audio"""
+        with self._lock:
+            return self._preroll_locked(since, seconds)
+
+    def _preroll_locked(self, since, seconds):
+        cutoff = time.time() - seconds
+        if since is not None:
+            cutoff = max(cutoff, since)
+        return [(ts, frame) for ts, frame in self._ring if ts > cutoff]
+
+    # ===============================
+    # CAPTURE THREAD
+    # ===============================
+    def _capture_loop(self):
+        stream = self._microphone.stream
+        while self._running.is_set():
+            try:
+                frame = stream.read(self.chunk)
+            except Exception as e:
+                print(f"⚠️ Audio capture error: {e}")
+                time.sleep(0.1)
+                continue
+
+            timestamp = time.time()
+            with self._lock:
+                self._ring.append((timestamp, frame))
+                consumers = list(self._consumers)
+
+            for consumer in consumers:
+                consumer.push(timestamp, frame)
+
+            self._update_noise_floor(frame)
+
+    def _update_noise_floor(self, frame):
+        """Track ambient noise the same way adjust_for_ambient_noise does, on non-speech frames"""
+        if not self.track_noise:
+            return
+        r = self.recognizer
+        samples = np.frombuffer(frame, dtype=np.int16).astype(np.float32)
+        energy = float(np.sqrt(np.mean(samples ** 2))) if len(samples) else 0.0
+        if energy > r.energy_threshold:
+            return  # speech - leave the threshold alone
+        damping = r.dynamic_energy_adjustment_damping ** self.seconds_per_buffer
+        target = energy * r.dynamic_energy_ratio
+        r.energy_threshold = r.energy_threshold * damping + target * (1 - damping)
+
+    # ===============================
+    # CONSUMERS
+    # ===============================
+    def _attach(self, consumer, preroll_since=None):
+        with self._lock:
+            # Seed and register under one lock so no frame is missed or duplicated
+            if preroll_since is not None:
+                for timestamp, frame in self._preroll_locked(preroll_since, PREROLL_SECONDS):
+                    consumer.push(timestamp, frame)
+            self._consumers.append(consumer)
+
+    def _detach(self, consumer):
+        with self._lock:
+            if consumer in self._consumers:
+                self._consumers.remove(consumer)
@@ -0,0 +1,122 @@
+"""
+Shared conversation store for Chatbot and RealtimeSearchEngine.
+
+Messages are appended to Data/ChatLog.jsonl (one JSON object per line) and
+the last HISTORY_SIZE messages are kept in an in-memory ring buffer, so a
+turn costs one small append instead of a parse plus a full rewrite. The log
+is compacted down to the ring buffer once it grows past COMPACT_AFTER lines.
+"""
+import json
+import os
+import threading
+from collections import deque
+from pathlib import Path
+
+CHATLOG_PATH = "Data/ChatLog.jsonl"
+LEGACY_CHATLOG_PATH = "Data/ChatLog.json"
+HISTORY_SIZE = 20
+COMPACT_AFTER = 200
+
+
+class ChatHistory:
+    def __init__(self, path=CHATLOG_PATH, max_messages=HISTORY_SIZE,
+                 compact_after=COMPACT_AFTER, legacy_path=LEGACY_CHATLOG_PATH):
+        self.path = Path(path)
+        self.compact_after = compact_after
+        self._messages = deque(maxlen=max_messages)
+        self._line_count = 0
+        self._lock = threading.RLock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            self._load()
+        elif legacy_path and os.path.exists(legacy_path):
+            self._import_legacy(legacy_path)
+
+    # ===============================
+    # LOADING
+    # ===============================
+    def _load(self):
+        torn = False
+        with self._lock:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    self._line_count += 1
+                    try:
+                        message = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Torn write from a crash - skip the partial line
+                        torn = True
+                        continue
+                    if isinstance(message, dict) and "role" in message:
+                        self._messages.append(message)
+            if torn:
+                # Rewrite so the next append does not land on the partial line
+                self.compact()
+
+    def _import_legacy(self, legacy_path):
+        try:
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                messages = json.load(f)
+            if isinstance(messages, list):
+                self._messages.extend(m for m in messages if isinstance(m, dict) and "role" in m)
+        except Exception as e:
+            print(f"⚠️ Could not import {legacy_path}: {e}")
+        self.compact()
+
+    # ===============================
+    # PUBLIC API
+    # ===============================
+    def recent(self, n=None):
+        """Return copies of the last n messages (all buffered messages when n is None)"""
+        with self._lock:
+            messages = list(self._messages)
+        if n is not None:
+            messages = messages[-n:] if n > 0 else []
+        return [dict(m) for m in messages]
+
+    def append(self, *messages):
+        if not messages:
+            return
+        lines = "".join(json.dumps(m, ensure_ascii=False) + "\n" for m in messages)
+
+        with self._lock:
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(lines)
+            except Exception as e:
+                print(f"Error saving chatlog: {e}")
+                return
+            self._messages.extend(dict(m) for m in messages)
+            self._line_count += len(messages)
+            if self._line_count > self.compact_after:
+                self.compact()
+
+    def clear(self):
+        with self._lock:
+            self._messages.clear()
+            self.compact()
+
+    def compact(self):
+        """Rewrite the log so it only holds the ring buffer contents"""
+        with self._lock:
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    for m in self._messages:
+                        f.write(json.dumps(m, ensure_ascii=False) + "\n")
+                os.replace(tmp_path, self.path)
+                self._line_count = len(self._messages)
+            except Exception as e:
+                print(f"Error compacting chatlog: {e}")
+
+    def __len__(self):
+        with self._lock:
+            return len(self._messages)
+
+
+# Process-wide store shared by every module that talks to the LLM
+history = ChatHistory()
@@ -1,12 +1,17 @@
 from groq import Groq
-from json import load, dump
 import datetime
 from dotenv import dotenv_values
 import os
 import re
-import threading
+import sys
 from functools import lru_cache
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Backend.SentenceStream import SentenceSplitter, iter_completion_sentences
+from Backend.ChatHistory import history
+from Backend.RateLimiter import limits, CHAT_MAX_WAIT
+
 # ===============================
 # ENVIRONMENT SETUP
 # ===============================
@@ -18,8 +23,9 @@ GroqAPIKey = env_vars.get("GroqAPIKey")
 
 client = Groq(api_key=GroqAPIKey)
 
-CHATLOG_PATH = "Data/ChatLog.json"
-chatlog_lock = threading.Lock()
+HISTORY_WINDOW = 20
+# Spoken when the Groq budget has no token within CHAT_MAX_WAIT
+BUSY_MESSAGE = "I'm experiencing high load right now. Please try again in a moment."
 
 # ===============================
 # OPTIMIZED SYSTEM PROMPTS
@@ -57,36 +63,14 @@ Rules:
 # ===============================
 # ENHANCED CHAT LOG MANAGEMENT
 # ===============================
-if not os.path.exists("Data"):
-    os.makedirs("Data")
-
-if not os.path.exists(CHATLOG_PATH):
-    with open(CHATLOG_PATH, "w") as f:
-        dump([], f)
-
 def load_chatlog():
-    with chatlog_lock:
-        try:
-            with open(CHATLOG_PATH, "r") as f:
-                messages = load(f)
-            if len(messages) > 20:
-                messages = messages[-20:]
-                with open(CHATLOG_PATH, "w") as f:
-                    dump(messages, f, indent=2)
-            return messages
-        except Exception as e:
-            print(f"Error loading chatlog: {e}")
-            return []
+    return history.recent(HISTORY_WINDOW)
 
-def save_chatlog(messages):
-    with chatlog_lock:
-        try:
-            if len(messages) > 20:
-                messages = messages[-20:]
-            with open(CHATLOG_PATH, "w") as f:
-                dump(messages, f, indent=2)
-        except Exception as e:
-            print(f"Error saving chatlog: {e}")
+def save_turn(query, answer):
+    history.append(
+        {"role": "user", "content": query},
+        {"role": "assistant", "content": answer}
+    )
 
 # ===============================
 # REALTIME INFO (CACHED)
@@ -161,6 +145,8 @@ def ChatBot(Query, use_streaming=True):
         # max_tokens = 2048 if env_query else 512
         # temperature = 0.5 if env_query else 0.3
         
+        if limits.acquire("groq", timeout=CHAT_MAX_WAIT) is None:
+            return BUSY_MESSAGE
         completion = client.chat.completions.create(
             model="llama-3.3-70b-versatile",
             messages=system_messages + messages,
@@ -179,9 +165,7 @@ def ChatBot(Query, use_streaming=True):
             answer = completion.choices[0].message.content
         
         answer = clean_response(answer)
-        
-        messages.append({"role": "assistant", "content": answer})
-        save_chatlog(messages)
+        save_turn(Query, answer)
         
         return answer
     
@@ -190,12 +174,14 @@ def ChatBot(Query, use_streaming=True):
         
         if "rate" in error_msg or "limit" in error_msg:
             print("⚠️ Rate limit reached, clearing chatlog and retrying...")
-            save_chatlog([])
+            history.clear()
             try:
                 system_messages = [
                     {"role": "system", "content": BASE_SYSTEM_PROMPT},
                     {"role": "system", "content": RealtimeInformation()}
                 ]
+                if limits.acquire("groq", timeout=CHAT_MAX_WAIT) is None:
+                    return BUSY_MESSAGE
                 completion = client.chat.completions.create(
                     model="llama-3.3-70b-versatile",
                     messages=system_messages + [{"role": "user", "content": Query}],
@@ -205,22 +191,67 @@ def ChatBot(Query, use_streaming=True):
                 )
                 return clean_response(completion.choices[0].message.content)
             except Exception as retry_error:
-                return f"I'm experiencing high load right now. Please try again in a moment."
+                return BUSY_MESSAGE
         
         elif "context" in error_msg or "token" in error_msg:
             print("⚠️ Context too long, clearing chatlog...")
-            save_chatlog([])
+            history.clear()
             return ChatBot(Query, use_streaming=False)
         
         else:
             print(f"❌ Chatbot Error: {e}")
             return "I apologize, but I encountered an error processing your request. Please try rephrasing your question."
 
+# ===============================
+# STREAMING CHATBOT (SENTENCE BY SENTENCE)
+# ===============================
+def ChatBotStream(Query):
+    """
+    Generator version of ChatBot: yields the answer one sentence at a time
+    while the model is still generating, so TTS can start on the first one.
+    """
+    splitter = SentenceSplitter()
+    try:
+        messages = load_chatlog()
+        system_messages = [
+            {"role": "system", "content": BASE_SYSTEM_PROMPT},
+            {"role": "system", "content": RealtimeInformation()}
+        ]
+        messages.append({"role": "user", "content": Query})
+
+        if limits.acquire("groq", timeout=CHAT_MAX_WAIT) is None:
+            yield BUSY_MESSAGE
+            return
+        completion = client.chat.completions.create(
+            model="llama-3.3-70b-versatile",
+            messages=system_messages + messages,
+            temperature=0.7,
+            max_tokens=8192,
+            stream=True,
+            top_p=0.9,
+        )
+
+        for sentence in iter_completion_sentences(completion, splitter):
+            yield sentence
+
+    except Exception as e:
+        if not splitter.text:
+            # Nothing spoken yet - let ChatBot handle rate limits / context errors
+            yield ChatBot(Query, use_streaming=False)
+            return
+        print(f"❌ Chatbot stream error: {e}")
+
+    finally:
+        # Runs on completion, error, or when the consumer stops early (interrupt)
+        answer = clean_response(splitter.text)
+        if answer:
+            save_turn(Query, answer)
+
 # ===============================
 # UTILITY FUNCTIONS
 # ===============================
 def clear_chat_history():
-    save_chatlog([])
+    history.clear()
     print("🧹 Chat history cleared")
 
 def get_chat_stats():
@@ -0,0 +1,147 @@
+"""
+In-process publish/subscribe bus used by Main.py, the Backend modules and the GUI.
+
+Replaces polling of Frontend/Files/*.data: publishers post typed events,
+subscribers are called immediately in the publisher's thread. The GUI turns
+those callbacks into Qt signals, so every update is delivered in order.
+
+FileChannel keeps the old file-based transport available for processes that
+cannot share memory with the assistant (e.g. the ImageGeneration watcher).
+"""
+import os
+import threading
+from pathlib import Path
+
+# ===============================
+# TOPICS
+# ===============================
+STATUS = "status"            # str  - assistant status line
+RESPONSE = "response"        # str  - message for the chat window
+MIC = "mic"                  # bool - conversation/microphone active
+EXIT = "exit"                # bool - shutdown requested
+IMAGE_JOB = "image_job"      # dict - image job update {id, prompt, state, stage, progress, path, error}
+
+TOPIC_TYPES = {
+    STATUS: str,
+    RESPONSE: str,
+    MIC: bool,
+    EXIT: bool,
+    IMAGE_JOB: dict,
+}
+
+# ===============================
+# EVENT BUS
+# ===============================
+class EventBus:
+    def __init__(self, topic_types=None):
+        self._topic_types = dict(topic_types or TOPIC_TYPES)
+        self._subscribers = {}
+        self._last = {}
+        self._lock = threading.Lock()
+
+    def register_topic(self, topic, payload_type):
+        with self._lock:
+            self._topic_types[topic] = payload_type
+
+    def publish(self, topic, payload):
+        expected = self._topic_types.get(topic)
+        if expected is None:
+            raise KeyError(f"Unknown topic: {topic}")
+        if not isinstance(payload, expected):
+            raise TypeError(
+                f"Topic '{topic}' expects {expected.__name__}, got {type(payload).__name__}"
+            )
+
+        with self._lock:
+            self._last[topic] = payload
+            callbacks = list(self._subscribers.get(topic, ()))
+
+        for callback in callbacks:
+            try:
+                callback(payload)
+            except Exception as e:
+                print(f"⚠️ Event subscriber error ({topic}): {e}")
+
+    def subscribe(self, topic, callback, replay=False):
+        """Register callback for topic. With replay=True the last value is delivered at once."""
+        if topic not in self._topic_types:
+            raise KeyError(f"Unknown topic: {topic}")
+
+        with self._lock:
+            self._subscribers.setdefault(topic, []).append(callback)
+            has_last = topic in self._last
+            last = self._last.get(topic)
+
+        if replay and has_last:
+            callback(last)
+
+        return lambda: self.unsubscribe(topic, callback)
+
+    def unsubscribe(self, topic, callback):
+        with self._lock:
+            callbacks = self._subscribers.get(topic, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+    def last(self, topic, default=None):
+        with self._lock:
+            return self._last.get(topic, default)
+
+    def consume(self, topic, default=None):
+        """Return the last value and reset it (one-shot flags such as EXIT)."""
+        with self._lock:
+            return self._last.pop(topic, default)
+
+
+# Process-wide bus
+bus = EventBus()
+
+# ===============================
+# FILE-BACKED ADAPTER (CROSS-PROCESS)
+# ===============================
+class FileChannel:
+    """
+    Single-value channel stored in a text file.
+
+    Writes are atomic (temp file + replace) and readers only open the file
+    when its mtime/size changed, so an idle poll costs one stat() call.
+    """
+    def __init__(self, path, default=""):
+        self.path = Path(path)
+        self.default = default
+        self._signature = None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not self.path.exists():
+            self.write(default)
+
+    def write(self, value):
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(str(value))
+        os.replace(tmp_path, self.path)
+
+    def read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            self.write(self.default)
+            return self.default
+
+    def poll(self):
+        """Return the new value if the file changed since the last poll, else None."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self.write(self.default)
+            return None
+
+        signature = (st.st_mtime_ns, st.st_size)
+        if signature == self._signature:
+            return None
+        self._signature = signature
+        return self.read()
+
+    def mirror(self, event_bus, topic):
+        """Write every event published on topic to this file."""
+        return event_bus.subscribe(topic, self.write, replay=True)
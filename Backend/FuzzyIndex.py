@@ -0,0 +1,143 @@
+"""
+Precompiled fuzzy lookup for the speech correction tables.
+
+Gives exactly the same answer as scanning every entry with
+SequenceMatcher(None, word, entry).ratio() and keeping the first entry
+with the highest ratio above the threshold, but skips entries that cannot
+beat the current best:
+
+- length buckets: ratio <= 2*min(len)/(len_a+len_b), so whole lengths are skipped
+- character multisets: ratio <= 2*|common chars|/(len_a+len_b)
+
+Usage:
+    python -m Backend.FuzzyIndex      # micro-benchmark against the linear scan
+"""
+import os
+import sys
+import time
+from collections import Counter
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+
+class FuzzyIndex:
+    def __init__(self, corrections: dict, threshold=0.80):
+        self.threshold = threshold
+        self._by_length = {}
+
+        for order, (wrong, correct) in enumerate(corrections.items()):
+            entry = (order, wrong, correct, Counter(wrong))
+            self._by_length.setdefault(len(wrong), []).append(entry)
+
+        self._lengths = sorted(self._by_length)
+        self._candidate_cache = {}
+
+    def _candidates(self, length):
+        """Entries whose length can reach the threshold, in original table order"""
+        if length in self._candidate_cache:
+            return self._candidate_cache[length]
+        entries = []
+        for other in self._lengths:
+            if 2.0 * min(length, other) / (length + other) > self.threshold:
+                entries.extend(self._by_length[other])
+        entries.sort(key=lambda e: e[0])
+        self._candidate_cache[length] = entries
+        return entries
+
+    def best_match(self, word):
+        """Return the correction for word, or None if nothing scores above the threshold"""
+        if not word:
+            return None
+
+        length = len(word)
+        word_chars = Counter(word)
+        best_ratio = self.threshold
+        best = None
+
+        for _, wrong, correct, wrong_chars in self._candidates(length):
+            total = length + len(wrong)
+            common = sum((word_chars & wrong_chars).values())
+            if 2.0 * common / total <= best_ratio:
+                continue
+
+            ratio = SequenceMatcher(None, word, wrong).ratio()
+            if ratio > best_ratio:
+                best_ratio = ratio
+                best = correct
+
+        return best
+
+
+def linear_best_match(corrections: dict, word, threshold=0.80):
+    """Reference implementation (the original per-word scan)"""
+    best_match = None
+    best_ratio = threshold
+    for wrong, correct in corrections.items():
+        ratio = SequenceMatcher(None, word, wrong).ratio()
+        if ratio > best_ratio:
+            best_ratio = ratio
+            best_match = correct
+    return best_match
+
+
+# ===============================
+# MICRO-BENCHMARK
+# ===============================
+BENCHMARK_PHRASES = [
+    "opn crom and ply some music",
+    "hw is the wether today",
+    "serch for gogle maps",
+    "increse the volum to fifty",
+    "decrese volume please",
+    "creat a ppt on artificial intelligence",
+    "tel me a joke",
+    "send a massege on watsapp",
+    "open youtub and serch lofi",
+    "wats the time",
+    "close krome",
+    "play despacito on spotty",
+    "craete an essay about climate change",
+    "googel search python tutorials",
+    "open vollume mixer",
+    "what is the capital of france",
+    "take a screenshot",
+    "start screen recording",
+    "write a letter to the principal",
+    "who are you",
+]
+
+if __name__ == "__main__":
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+    from Backend.SpeechToText import WORD_CORRECTIONS
+
+    index = FuzzyIndex(WORD_CORRECTIONS)
+    words = [w for phrase in BENCHMARK_PHRASES for w in phrase.split()]
+    rounds = 200
+
+    mismatches = [w for w in set(words) if index.best_match(w) != linear_best_match(WORD_CORRECTIONS, w)]
+    print(f"Words: {len(words)} x {rounds} rounds, dictionary: {len(WORD_CORRECTIONS)} entries")
+    print(f"Mismatches vs linear scan: {len(mismatches)} {mismatches if mismatches else ''}")
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for w in words:
+            linear_best_match(WORD_CORRECTIONS, w)
+    linear = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for w in words:
+            index.best_match(w)
+    indexed = time.perf_counter() - start
+
+    cached_lookup = lru_cache(maxsize=4096)(index.best_match)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for w in words:
+            cached_lookup(w)
+    cached = time.perf_counter() - start
+
+    per_word = 1e6 / (rounds * len(words))
+    print(f"Linear scan      : {linear * per_word:8.2f} µs/word")
+    print(f"FuzzyIndex       : {indexed * per_word:8.2f} µs/word ({linear / indexed:.1f}x)")
+    print(f"FuzzyIndex + LRU : {cached * per_word:8.2f} µs/word ({linear / cached:.1f}x)")
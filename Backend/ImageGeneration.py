@@ -9,8 +9,17 @@ from time import sleep
 from dotenv import get_key
 from pathlib import Path
 import json
+import time
+import threading
+import atexit
+import itertools
+import sys
 from bs4 import BeautifulSoup
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Backend.EventBus import bus, IMAGE_JOB, FileChannel
+
 # ===============================
 # CONFIG
 # ===============================
@@ -40,9 +49,93 @@ HEADERS = {
     "Content-Type": "application/json"
 }
 
+# Inference endpoint (override with HF_INFERENCE_URL, e.g. to point at the local stub)
+HF_BASE_URL = (os.environ.get("HF_INFERENCE_URL") or get_key('.env', 'HF_INFERENCE_URL')
+               or "https://router.huggingface.co/hf-inference/models").rstrip("/")
+# Seconds to wait on the leading model before starting the next one as well
+HEDGE_DELAY = float(os.environ.get("IMAGE_HEDGE_DELAY") or get_key('.env', 'ImageHedgeDelay') or 15)
+MODEL_STATS_PATH = "Data/image_model_stats.json"
+PROMPT_CACHE_PATH = "Data/image_prompt_cache.json"
+PROMPT_CACHE_TTL = 7 * 24 * 3600
+# Overall time allowed for the Wikipedia/DuckDuckGo reference lookups
+REFERENCE_BUDGET = float(os.environ.get("IMAGE_REFERENCE_BUDGET") or get_key('.env', 'ImageReferenceBudget') or 4)
+# Images generated at the same time; further jobs wait in the queue
+IMAGE_WORKERS = int(os.environ.get("IMAGE_WORKERS") or get_key('.env', 'ImageWorkers') or 2)
+MAX_QUEUED_IMAGES = 8
+
 # Create directories
 Path("Data/Images").mkdir(parents=True, exist_ok=True)
 
+# ===============================
+# LONG-LIVED ASYNC RUNTIME
+# ===============================
+class ImageRuntime:
+    """
+    One event loop on a background thread with a shared keep-alive
+    ClientSession. Coroutines are handed over with submit(), so repeated
+    generations reuse the loop and the pooled HTTPS connections instead of
+    building both with asyncio.run() every time.
+    """
+    def __init__(self, connection_limit=16, keepalive_timeout=60):
+        self.connection_limit = connection_limit
+        self.keepalive_timeout = keepalive_timeout
+        self.loop = None
+        self._session = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self.loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=loop.run_forever, daemon=True, name="image-runtime")
+            self._thread.start()
+            self._session = asyncio.run_coroutine_threadsafe(self._open_session(), loop).result()
+            self.loop = loop
+            atexit.register(self.stop)
+
+    async def _open_session(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.connection_limit,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=300
+        )
+        return aiohttp.ClientSession(connector=connector)
+
+    @property
+    def session(self):
+        """Shared session; only usable from coroutines running on this runtime's loop"""
+        if self._session is None:
+            raise RuntimeError("ImageRuntime is not started")
+        return self._session
+
+    def submit(self, coro):
+        """Schedule coro on the runtime loop (thread-safe); returns a concurrent.futures.Future"""
+        if self.loop is None:
+            self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout=None):
+        """submit() and wait for the result"""
+        return self.submit(coro).result(timeout)
+
+    def stop(self):
+        with self._lock:
+            loop, self.loop = self.loop, None
+            if loop is None:
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(self._session.close(), loop).result(5)
+            except Exception:
+                pass
+            self._session = None
+            loop.call_soon_threadsafe(loop.stop)
+            self._thread.join(timeout=5)
+
+
+runtime = ImageRuntime()
+
 # ===============================
 # WEB SEARCH FOR VISUAL REFERENCES
 # ===============================
@@ -56,18 +149,30 @@ async def search_visual_references(prompt: str) -> dict:
     references = {
         "description": "",
         "appearance": [],
-        "details": []
+        "details": [],
+        "complete": False
     }
     
     try:
-        # Method 1: Wikipedia search (Free, no API key needed)
-        wiki_info = await search_wikipedia(prompt)
+        # Wikipedia and DuckDuckGo (both free, no API key) run side by side;
+        # whatever has not answered within REFERENCE_BUDGET is dropped
+        wiki_task = asyncio.create_task(search_wikipedia(prompt))
+        ddg_task = asyncio.create_task(search_duckduckgo(prompt))
+        done, pending = await asyncio.wait({wiki_task, ddg_task}, timeout=REFERENCE_BUDGET)
+        for task in pending:
+            task.cancel()
+        if pending:
+            print(f"⏱️ Reference lookup budget ({REFERENCE_BUDGET:.0f}s) reached, continuing without {len(pending)} source(s)")
+        
+        # None = the source did not answer (offline, HTTP error); "" / [] = it found nothing
+        wiki_info = wiki_task.result() if wiki_task in done else None
+        ddg_info = ddg_task.result() if ddg_task in done else None
+        references["complete"] = wiki_info is not None and ddg_info is not None
+        
         if wiki_info:
             references["description"] = wiki_info
             print(f"✓ Found Wikipedia info")
         
-        # Method 2: DuckDuckGo Instant Answer (Free, no API key)
-        ddg_info = await search_duckduckgo(prompt)
         if ddg_info:
             references["appearance"].extend(ddg_info)
             print(f"✓ Found DuckDuckGo details")
@@ -83,70 +188,71 @@ async def search_visual_references(prompt: str) -> dict:
     
     return references
 
-async def search_wikipedia(query: str) -> str:
+async def search_wikipedia(query: str):
     """
-    Search Wikipedia for character/object descriptions
+    Search Wikipedia for character/object descriptions ("" if there is no
+    page, None if Wikipedia could not be reached)
     """
     try:
-        async with aiohttp.ClientSession() as session:
-            # Wikipedia API - completely free
-            url = "https://en.wikipedia.org/w/api.php"
-            params = {
-                "action": "query",
-                "format": "json",
-                "titles": query,
-                "prop": "extracts",
-                "exintro": True,
-                "explaintext": True
-            }
-            
-            async with session.get(url, params=params, timeout=10) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    pages = data.get("query", {}).get("pages", {})
-                    
-                    for page_id, page_data in pages.items():
-                        if page_id != "-1":  # Page exists
-                            extract = page_data.get("extract", "")
-                            # Get first 500 chars for context
-                            return extract[:500] if extract else ""
-    except:
-        pass
+        # Wikipedia API - completely free
+        url = "https://en.wikipedia.org/w/api.php"
+        params = {
+            "action": "query",
+            "format": "json",
+            "titles": query,
+            "prop": "extracts",
+            "exintro": "true",
+            "explaintext": "true"
+        }
+        
+        async with runtime.session.get(url, params=params, timeout=10) as response:
+            if response.status == 200:
+                data = await response.json()
+                pages = data.get("query", {}).get("pages", {})
+                
+                for page_id, page_data in pages.items():
+                    if page_id != "-1":  # Page exists
+                        extract = page_data.get("extract", "")
+                        # Get first 500 chars for context
+                        return extract[:500] if extract else ""
+                return ""
+    except Exception as e:
+        print(f"⚠️ Wikipedia lookup failed: {e}")
     
-    return ""
+    return None
 
-async def search_duckduckgo(query: str) -> list:
+async def search_duckduckgo(query: str):
     """
-    Search DuckDuckGo for instant answers (100% free)
+    Search DuckDuckGo for instant answers (100% free); None if it could not
+    be reached
     """
     try:
-        async with aiohttp.ClientSession() as session:
-            url = f"https://api.duckduckgo.com/"
-            params = {
-                "q": query,
-                "format": "json",
-                "no_html": 1
-            }
-            
-            async with session.get(url, params=params, timeout=10) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    details = []
-                    
-                    # Get abstract
-                    if data.get("Abstract"):
-                        details.append(data["Abstract"][:300])
-                    
-                    # Get related topics
-                    for topic in data.get("RelatedTopics", [])[:3]:
-                        if isinstance(topic, dict) and topic.get("Text"):
-                            details.append(topic["Text"][:200])
-                    
-                    return details
-    except:
-        pass
+        url = f"https://api.duckduckgo.com/"
+        params = {
+            "q": query,
+            "format": "json",
+            "no_html": 1
+        }
+        
+        async with runtime.session.get(url, params=params, timeout=10) as response:
+            if response.status == 200:
+                data = await response.json(content_type=None)
+                details = []
+                
+                # Get abstract
+                if data.get("Abstract"):
+                    details.append(data["Abstract"][:300])
+                
+                # Get related topics
+                for topic in data.get("RelatedTopics", [])[:3]:
+                    if isinstance(topic, dict) and topic.get("Text"):
+                        details.append(topic["Text"][:200])
+                
+                return details
+    except Exception as e:
+        print(f"⚠️ DuckDuckGo lookup failed: {e}")
     
-    return []
+    return None
 
 # ===============================
 # EXTRACT KEY VISUAL FEATURES
@@ -284,13 +390,63 @@ def analyze_prompt_intelligently(prompt: str) -> list:
     
     return enhancements
 
+# ===============================
+# ENHANCED PROMPT CACHE
+# ===============================
+class PromptCache:
+    """normalized prompt -> (positive, negative) enhanced prompt pair, persisted with a TTL"""
+    def __init__(self, path=PROMPT_CACHE_PATH, ttl=PROMPT_CACHE_TTL):
+        self.path = Path(path)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    @staticmethod
+    def normalize(prompt: str) -> str:
+        return " ".join(prompt.lower().split()).strip(" .,!?")
+
+    def get(self, prompt: str):
+        with self._lock:
+            entry = self._entries.get(self.normalize(prompt))
+        if not entry or time.time() - entry.get("time", 0) > self.ttl:
+            return None
+        return entry["positive"], entry["negative"]
+
+    def put(self, prompt: str, positive: str, negative: str):
+        now = time.time()
+        with self._lock:
+            self._entries[self.normalize(prompt)] = {"positive": positive, "negative": negative, "time": now}
+            # Drop expired entries while we are rewriting the file anyway
+            self._entries = {k: v for k, v in self._entries.items() if now - v.get("time", 0) <= self.ttl}
+            snapshot = json.dumps(self._entries, ensure_ascii=False, indent=2)
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            tmp_path.write_text(snapshot, encoding="utf-8")
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ Could not save prompt cache: {e}")
+
+
+prompt_cache = PromptCache()
+
 # ===============================
 # ULTRA QUALITY PROMPT ENGINEERING WITH WEB SEARCH
 # ===============================
 async def create_web_enhanced_prompt(prompt: str) -> tuple:
     """
-    Search web for references and create enhanced prompt
+    Search web for references and create enhanced prompt (cached per prompt)
     """
+    cached = prompt_cache.get(prompt)
+    if cached:
+        print("⚡ Using cached enhanced prompt")
+        return cached
+    
     # Search for visual references
     references = await search_visual_references(prompt)
     
@@ -346,16 +502,84 @@ async def create_web_enhanced_prompt(prompt: str) -> tuple:
         "duplicate", "cloned", "gross", "weird", "bad proportions"
     ]
     
-    return final_prompt, ", ".join(negative_prompt)
+    negative = ", ".join(negative_prompt)
+    # Cached only when every source answered: a lookup cut short by the budget
+    # or made while offline is retried on the next request
+    if references.get("complete"):
+        prompt_cache.put(prompt, final_prompt, negative)
+    return final_prompt, negative
+
+# ===============================
+# PER-MODEL STATISTICS
+# ===============================
+class ModelStats:
+    """Success rate and latency per model, persisted so the race order adapts over time"""
+    PRIOR_LATENCY = 30.0   # seconds assumed for a model with no history
+    EWMA_WEIGHT = 0.3
+
+    def __init__(self, path=MODEL_STATS_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._stats = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._stats = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def record(self, model_name: str, success: bool, latency: float):
+        """Update the stats in memory; save() writes them (call it off the event loop)"""
+        with self._lock:
+            entry = self._stats.setdefault(model_name, {"attempts": 0, "successes": 0, "latency": None})
+            entry["attempts"] += 1
+            if success:
+                entry["successes"] += 1
+                previous = entry["latency"]
+                entry["latency"] = latency if previous is None else (
+                    self.EWMA_WEIGHT * latency + (1 - self.EWMA_WEIGHT) * previous)
+
+    def save(self):
+        # One writer at a time: saves from executor threads share the .tmp file
+        with self._save_lock:
+            with self._lock:
+                snapshot = json.dumps(self._stats, indent=2)
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path.with_name(self.path.name + ".tmp")
+                tmp_path.write_text(snapshot, encoding="utf-8")
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"⚠️ Could not save model stats: {e}")
+
+    def expected_time(self, model_name: str) -> float:
+        """Average latency divided by (smoothed) success rate: lower is better"""
+        with self._lock:
+            entry = self._stats.get(model_name, {})
+        success_rate = (entry.get("successes", 0) + 1) / (entry.get("attempts", 0) + 2)
+        latency = entry.get("latency") or self.PRIOR_LATENCY
+        return latency / success_rate
+
+    def ordered(self, models: list) -> list:
+        # Stable sort: models without history keep their configured order
+        return sorted(models, key=lambda m: self.expected_time(m["name"]))
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return json.loads(json.dumps(self._stats))
+
+
+model_stats = ModelStats()
 
 # ===============================
 # SMART API CALL WITH RETRY
 # ===============================
-async def smart_query(session, model_config: dict, payload: dict) -> bytes:
+async def smart_query(session, model_config: dict, payload: dict, overloaded: asyncio.Event = None) -> bytes:
     """
-    Query with intelligent retry and error handling
+    Query with intelligent retry and error handling.
+    Sets overloaded on a 503 so the race can start the next model right away.
     """
-    model_url = f"https://router.huggingface.co/hf-inference/models/{model_config['name']}"
+    model_url = f"{HF_BASE_URL}/{model_config['name']}"
     
     for attempt in range(3):
         try:
@@ -370,8 +594,15 @@ async def smart_query(session, model_config: dict, payload: dict) -> bytes:
                     return await response.read()
                 
                 elif response.status == 503:
-                    print(f"  Model loading... waiting (attempt {attempt + 1}/3)")
-                    await asyncio.sleep(20)
+                    if overloaded is not None:
+                        overloaded.set()
+                    wait = 20
+                    try:
+                        wait = min(20, float((await response.json()).get("estimated_time", 20)))
+                    except Exception:
+                        pass
+                    print(f"  {model_config['name']} loading... waiting {wait:.0f}s (attempt {attempt + 1}/3)")
+                    await asyncio.sleep(wait)
                     continue
                 
                 else:
@@ -392,45 +623,98 @@ async def smart_query(session, model_config: dict, payload: dict) -> bytes:
     
     return None
 
+# ===============================
+# HEDGED MULTI-MODEL RACE
+# ===============================
+async def _timed_query(session, model_config: dict, payload: dict, overloaded: asyncio.Event):
+    start = time.perf_counter()
+    image_bytes = await smart_query(session, model_config, payload, overloaded)
+    latency = time.perf_counter() - start
+    model_stats.record(model_config['name'], bool(image_bytes), latency)
+    # The file write runs on the default executor, not on the runtime loop
+    await asyncio.get_running_loop().run_in_executor(None, model_stats.save)
+    return image_bytes
+
+async def race_models(session, final_prompt: str, negative: str, models: list = None,
+                      hedge_delay: float = None) -> bytes:
+    """
+    Start the best-ranked model; start the next one after hedge_delay seconds,
+    as soon as a running model answers 503, or when one fails. The first valid
+    image wins and the remaining requests are cancelled.
+    """
+    hedge_delay = HEDGE_DELAY if hedge_delay is None else hedge_delay
+    waiting = model_stats.ordered(models or MODELS)
+    overloaded = asyncio.Event()
+    running = {}
+
+    def launch():
+        model_config = waiting.pop(0)
+        print(f"\n🎨 Attempting: {model_config['name']}")
+        payload = {
+            "inputs": final_prompt,
+            "parameters": {
+                "negative_prompt": negative,
+                "num_inference_steps": model_config['steps'],
+                "guidance_scale": model_config['guidance'],
+                "seed": randint(100000, 999999)
+            }
+        }
+        task = asyncio.create_task(_timed_query(session, model_config, payload, overloaded))
+        running[task] = model_config['name']
+
+    launch()
+    try:
+        while running:
+            overload_wait = asyncio.create_task(overloaded.wait()) if waiting else None
+            watch = set(running) | ({overload_wait} if overload_wait else set())
+            done, _ = await asyncio.wait(
+                watch, timeout=hedge_delay if waiting else None, return_when=asyncio.FIRST_COMPLETED
+            )
+            if overload_wait is not None:
+                overload_wait.cancel()
+
+            for task in done:
+                if task not in running:
+                    continue
+                model_name = running.pop(task)
+                image_bytes = None if task.cancelled() or task.exception() else task.result()
+                if image_bytes:
+                    print(f"✅ Success with {model_name}!")
+                    return image_bytes
+                print(f"❌ Failed with {model_name}")
+
+            # Hedge timer expired, a model is overloaded, or one failed: bring in the next
+            if waiting:
+                overloaded.clear()
+                launch()
+    finally:
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+
+    return None
+
 # ===============================
 # MULTI-MODEL GENERATION WITH WEB SEARCH
 # ===============================
-async def generate_best_quality(prompt: str) -> bytes:
+def _no_progress(stage: str, fraction: float):
+    pass
+
+async def generate_best_quality(prompt: str, progress=_no_progress) -> bytes:
     """
     Generate using web-enhanced prompt
     """
     # Create web-enhanced prompt
+    progress("Researching prompt", 0.1)
     final_prompt, negative = await create_web_enhanced_prompt(prompt)
     
     print(f"\n📝 Original: {prompt}")
     print(f"✨ Enhanced: {final_prompt[:150]}...")
     print(f"🚫 Negative: {negative[:120]}...")
     
-    async with aiohttp.ClientSession() as session:
-        for model_config in MODELS:
-            model_name = model_config['name']
-            print(f"\n🎨 Attempting: {model_name}")
-            
-            payload = {
-                "inputs": final_prompt,
-                "parameters": {
-                    "negative_prompt": negative,
-                    "num_inference_steps": model_config['steps'],
-                    "guidance_scale": model_config['guidance'],
-                    "seed": randint(100000, 999999)
-                }
-            }
-            
-            image_bytes = await smart_query(session, model_config, payload)
-            
-            if image_bytes:
-                print(f"✅ Success with {model_name}!")
-                return image_bytes
-            
-            print(f"❌ Failed with {model_name}")
-            await asyncio.sleep(3)
-    
-    return None
+    progress("Generating", 0.3)
+    return await race_models(runtime.session, final_prompt, negative)
 
 # ===============================
 # ADVANCED POST-PROCESSING
@@ -488,85 +772,237 @@ def save_and_display(image: Image.Image, prompt: str):
         sleep(3)
     except Exception as e:
         print(f"⚠️  Display error: {e}")
+    
+    return save_path
 
 # ===============================
 # MAIN PIPELINE
 # ===============================
-async def generate_image(prompt: str):
+async def generate_image(prompt: str, progress=_no_progress):
     """
-    Complete generation pipeline with web search
+    Complete generation pipeline with web search; returns the saved path or False
     """
     print(f"\n{'='*70}")
     print(f"🎨 GENERATING: '{prompt}'")
     print(f"{'='*70}")
     
     # Generate with web-enhanced prompt
-    image_bytes = await generate_best_quality(prompt)
+    image_bytes = await generate_best_quality(prompt, progress)
     
     if not image_bytes:
         print("\n❌ All generation attempts failed")
         return False
     
-    # Enhance
+    # Enhance, save and show off the runtime loop so other jobs keep their connections busy
     print("\n✨ Enhancing image...")
-    image = enhance_image(image_bytes)
+    progress("Enhancing", 0.8)
+    image = await asyncio.to_thread(enhance_image, image_bytes)
     
     # Save and show
-    save_and_display(image, prompt)
+    progress("Saving", 0.9)
+    save_path = await asyncio.to_thread(save_and_display, image, prompt)
     
     print(f"\n{'='*70}")
     print("✅ GENERATION COMPLETE!")
     print(f"{'='*70}\n")
     
-    return True
+    return save_path
 
 # ===============================
 # WRAPPER (ORIGINAL FUNCTION NAME)
 # ===============================
 def GenerateImages(prompt: str):
     """
-    Main function called by main.py
+    Main function called by main.py; runs on the shared runtime and waits for the result
     """
-    asyncio.run(generate_image(prompt))
+    return runtime.run(generate_image(prompt))
+
+# ===============================
+# IMAGE JOB QUEUE
+# ===============================
+class ImageQueueFull(RuntimeError):
+    """Too many image jobs are already queued or running"""
+
+
+class ImageJobQueue:
+    """
+    Background image jobs on the shared runtime. At most max_workers
+    generate at once; every change of a job is published on the bus as an
+    IMAGE_JOB event, so callers return as soon as the job is queued.
+    """
+    def __init__(self, image_runtime, max_workers=IMAGE_WORKERS, max_queued=MAX_QUEUED_IMAGES, keep_finished=20):
+        self.runtime = image_runtime
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.keep_finished = keep_finished
+        self._jobs = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._slots = None   # asyncio.Semaphore, created on the runtime loop
+
+    def submit(self, prompt: str) -> str:
+        """Queue a generation and return its job id; raises ImageQueueFull when the queue is full"""
+        with self._lock:
+            active = sum(1 for job in self._jobs.values() if job["state"] in ("queued", "running"))
+            if active >= self.max_workers + self.max_queued:
+                raise ImageQueueFull("Image queue is full")
+            job_id = f"img-{next(self._ids)}"
+            self._jobs[job_id] = {"id": job_id, "prompt": prompt, "state": "queued",
+                                  "stage": "Queued", "progress": 0.0, "path": "", "error": ""}
+        self._publish(job_id)
+        self.runtime.submit(self._run(job_id, prompt))
+        return job_id
+
+    async def _run(self, job_id: str, prompt: str):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+        async with self._slots:
+            self._update(job_id, state="running", stage="Starting", progress=0.05)
+            try:
+                path = await generate_image(
+                    prompt, progress=lambda stage, fraction: self._update(job_id, stage=stage, progress=fraction)
+                )
+            except Exception as e:
+                print(f"❌ Image job {job_id} failed: {e}")
+                self._update(job_id, state="failed", stage="Failed", error=str(e))
+                return
+        if path:
+            self._update(job_id, state="done", stage="Saved", progress=1.0, path=path)
+        else:
+            self._update(job_id, state="failed", stage="Failed", error="All models failed")
+
+    def _update(self, job_id: str, **changes):
+        with self._lock:
+            self._jobs[job_id].update(changes)
+            if changes.get("state") in ("done", "failed"):
+                self._forget_old()
+        self._publish(job_id)
+
+    def _forget_old(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job["state"] in ("done", "failed")]
+        for job_id in finished[:-self.keep_finished]:
+            del self._jobs[job_id]
+
+    def _publish(self, job_id: str):
+        job = self.status(job_id)
+        if job:
+            bus.publish(IMAGE_JOB, job)
+
+    def status(self, job_id: str) -> dict:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def active(self) -> list:
+        with self._lock:
+            return [dict(job) for job in self._jobs.values() if job["state"] in ("queued", "running")]
+
+
+image_jobs = ImageJobQueue(runtime)
+
+def SubmitImageJob(prompt: str):
+    """
+    Non-blocking entry point for main.py: queue the image and return the job id,
+    or None when the queue is full (other errors propagate)
+    """
+    try:
+        return image_jobs.submit(prompt)
+    except ImageQueueFull:
+        return None
+
+# ===============================
+# LOCAL STUB OF THE INFERENCE ENDPOINT
+# ===============================
+# model name -> (behaviour, delay seconds); behaviour is "ok", "503" or "error"
+STUB_BEHAVIOURS = {
+    MODELS[0]["name"]: ("503", 0.2),
+    MODELS[1]["name"]: ("ok", 2.0),
+    MODELS[2]["name"]: ("error", 0.5),
+}
+
+def make_stub_app(behaviours: dict = None, requests_seen: list = None):
+    """aiohttp app serving POST /models/<name> like the HF endpoint; appends (name, time) to requests_seen"""
+    from aiohttp import web
+
+    behaviours = behaviours or STUB_BEHAVIOURS
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 64), (90, 140, 200)).save(buffer, "PNG")
+    png = buffer.getvalue()
+
+    async def handle(request):
+        name = request.match_info["name"]
+        if requests_seen is not None:
+            requests_seen.append((name, time.perf_counter()))
+        kind, delay = behaviours.get(name, ("ok", 1.0))
+        await asyncio.sleep(delay)
+        if kind == "503":
+            return web.json_response({"error": "Model is loading", "estimated_time": 1.0}, status=503)
+        if kind == "error":
+            return web.json_response({"error": "Internal error"}, status=500)
+        return web.Response(body=png, content_type="image/png")
+
+    app = web.Application()
+    app.router.add_post("/models/{name:.+}", handle)
+    return app
+
+def run_stub_server(port: int = 8765, behaviours: dict = None):
+    """Serve the stub on a port; use HF_INFERENCE_URL=http://127.0.0.1:<port>/models"""
+    from aiohttp import web
+
+    print(f"🧪 Stub inference server on http://127.0.0.1:{port}/models")
+    web.run_app(make_stub_app(behaviours), host="127.0.0.1", port=port, print=None)
+
+async def _race_once(prompt: str, hedge_delay: float):
+    start = time.perf_counter()
+    image_bytes = await race_models(runtime.session, prompt, "", hedge_delay=hedge_delay)
+    return image_bytes, time.perf_counter() - start
 
 # ===============================
 # FILE WATCHER
 # ===============================
 if __name__ == "__main__":
-    data_file = "Frontend/Files/ImageGeneration.data"
-    
-    Path("Frontend/Files").mkdir(parents=True, exist_ok=True)
-    if not os.path.exists(data_file):
-        with open(data_file, "w") as f:
-            f.write("False,False")
+    # python -m Backend.ImageGeneration stub [port]
+    if len(sys.argv) > 1 and sys.argv[1] == "stub":
+        run_stub_server(int(sys.argv[2]) if len(sys.argv) > 2 else 8765)
+        sys.exit(0)
+
+    # python -m Backend.ImageGeneration race "prompt" [runs] [hedge_delay]
+    if len(sys.argv) > 1 and sys.argv[1] == "race":
+        race_prompt = sys.argv[2] if len(sys.argv) > 2 else "a red fox in the snow"
+        runs = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+        hedge = float(sys.argv[4]) if len(sys.argv) > 4 else HEDGE_DELAY
+        print(f"Racing against {HF_BASE_URL} (hedge {hedge}s)")
+        for run in range(runs):
+            image_bytes, elapsed = runtime.run(_race_once(race_prompt, hedge))
+            print(f"Run {run + 1}: {'image' if image_bytes else 'no image'} in {elapsed:.2f}s")
+        print(json.dumps(model_stats.snapshot(), indent=2))
+        sys.exit(0)
+
+    channel = FileChannel("Frontend/Files/ImageGeneration.data", default="False,False")
+    bus.subscribe(IMAGE_JOB, lambda job: print(f"🎨 [{job['id']}] {job['stage']} ({job['progress']:.0%})"))
     
     print("🚀 Image Generation Service Started (Web-Enhanced)")
     print("👀 Watching for requests...\n")
     
     while True:
         try:
-            with open(data_file, "r") as f:
-                data = f.read().strip()
+            # An idle poll is a single stat(), so the file can be checked often
+            data = channel.poll()
+            if data is None:
+                sleep(0.2)
+                continue
 
-            parts = data.split(",")
+            parts = data.strip().split(",")
             if len(parts) != 2:
-                sleep(1)
                 continue
 
             prompt, status = parts[0].strip(), parts[1].strip()
 
             if status == "True":
-                with open(data_file, "w") as f:
-                    f.write("False,False")
-
-                GenerateImages(prompt)
-            else:
-                sleep(1)
-
-        except FileNotFoundError:
-            with open(data_file, "w") as f:
-                f.write("False,False")
-            sleep(1)
+                channel.write("False,False")
+                # Queued, so the next request is picked up while this one generates
+                job_id = SubmitImageJob(prompt)
+                print(f"📥 Queued {job_id}: {prompt}" if job_id else f"⏳ Image queue full, skipped: {prompt}")
             
         except Exception as e:
             print(f"❌ Error: {e}")
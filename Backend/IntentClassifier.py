@@ -0,0 +1,368 @@
+"""
+Offline intent classifier used before the Cohere fallback in Model.FirstLayerDMM.
+
+When the rules in Backend/IntentEngine.py leave a command as 'general', this
+picks one of the Model.funcs labels locally instead of calling Cohere:
+- features: character 3-5 grams inside word boundaries, plus words and word pairs
+- TF-IDF weights (sublinear tf), L2-normalized
+- one centroid per label, trained from Backend/Corpus/intent_examples.json
+- prediction = best cosine score; margin = best minus runner-up
+
+Cohere is only asked when the margin is below IntentMargin (.env, default 0.04).
+Short phatic replies ("thanks", "never mind", "ok cool") are always 'general'.
+tasks_for_label() turns a label into task strings for both the local and the
+Cohere label: open/close/play/search keep only the target after an
+unambiguous verb ("shut down chrome" -> "close chrome"; "shut up" and "end the
+call" stay general), 'close' also needs a running process with exactly that
+name, system paraphrases map to the commands Main executes, and a label with
+no usable target returns None so the prompt stays 'general'.
+'exit' and 'run' are deliberately left out of the corpus: a wrong guess there
+would quit the assistant or execute a shell command, so those stay with the
+explicit rules and Cohere.
+
+Backend/Corpus/intent_eval.json only holds prompts the rules leave as
+'general' (the only ones FirstLayerDMM hands to this classifier). The shipped
+labels are hand-assigned ("hand"); --relabel adds the label Cohere picks for
+each prompt ("cohere", needs CohereAPIKey), and accuracy is then reported
+against both.
+
+Usage:
+    python -m Backend.IntentClassifier                   # accuracy on Backend/Corpus/intent_eval.json
+    python -m Backend.IntentClassifier "fire up spotify"      # label, margin and tasks
+    python -m Backend.IntentClassifier --relabel         # fill in the Cohere labels
+"""
+import json
+import math
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+
+from dotenv import dotenv_values
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Backend.IntentEngine import classify as classify_command
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "Corpus")
+EXAMPLES_PATH = os.path.join(CORPUS_DIR, "intent_examples.json")
+EVAL_PATH = os.path.join(CORPUS_DIR, "intent_eval.json")
+
+MIN_MARGIN = float(dotenv_values('.env').get('IntentMargin') or 0.04)
+NGRAM_SIZES = (3, 4, 5)
+TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+# Whole replies made only of these words never leave 'general'
+PHATIC_WORDS = {
+    "ok", "okay", "cool", "nice", "great", "fine", "alright", "thanks", "thank", "you",
+    "never", "mind", "nevermind", "forget", "it", "nothing", "no", "yes", "yeah", "yep",
+    "nope", "sure", "got", "hmm", "wow", "cancel", "that's", "all", "sara",
+}
+PHATIC_MAX_WORDS = 4
+
+# ===============================
+# FEATURES
+# ===============================
+def features(text: str) -> Counter:
+    """Counts of char n-grams (per padded word), words ('w:') and word pairs ('b:')"""
+    words = TOKEN_RE.findall(text.lower())
+    counts = Counter()
+    for word in words:
+        counts["w:" + word] += 1
+        padded = f" {word} "
+        for n in NGRAM_SIZES:
+            for i in range(len(padded) - n + 1):
+                counts[padded[i:i + n]] += 1
+    for first, second in zip(words, words[1:]):
+        counts[f"b:{first} {second}"] += 1
+    return counts
+
+
+def _normalize(vector: dict) -> dict:
+    norm = math.sqrt(sum(w * w for w in vector.values()))
+    return {f: w / norm for f, w in vector.items()} if norm else {}
+
+
+class IntentClassifier:
+    def __init__(self, examples_path=EXAMPLES_PATH, min_margin=MIN_MARGIN):
+        self.examples_path = examples_path
+        self.min_margin = min_margin
+        self.labels = []
+        self._idf = {}
+        self._index = {}                # feature -> [(label index, centroid weight)]
+        self._lock = threading.Lock()
+
+    # ===============================
+    # TRAINING
+    # ===============================
+    def train(self, examples: dict):
+        """examples: {label: [utterance, ...]}"""
+        samples = [(label, features(text)) for label, texts in examples.items() for text in texts]
+        df = Counter(f for _, counts in samples for f in counts)
+        total = len(samples)
+        idf = {f: math.log((1 + total) / (1 + n)) + 1 for f, n in df.items()}
+
+        labels = list(examples)
+        sums = [defaultdict(float) for _ in labels]
+        for label, counts in samples:
+            target = sums[labels.index(label)]
+            for f, w in self._weigh(counts, idf).items():
+                target[f] += w
+
+        index = defaultdict(list)
+        for i, centroid in enumerate(sums):
+            for f, w in _normalize(centroid).items():
+                index[f].append((i, w))
+
+        self.labels, self._idf, self._index = labels, idf, dict(index)
+
+    def _ensure_trained(self):
+        if self._index:
+            return
+        with self._lock:
+            if not self._index:
+                with open(self.examples_path, "r", encoding="utf-8") as f:
+                    self.train(json.load(f))
+
+    @staticmethod
+    def _weigh(counts: Counter, idf: dict) -> dict:
+        return _normalize({f: (1 + math.log(n)) * idf[f] for f, n in counts.items() if f in idf})
+
+    # ===============================
+    # PREDICTION
+    # ===============================
+    def scores(self, text: str) -> list:
+        """[(label, cosine)] best first"""
+        self._ensure_trained()
+        totals = [0.0] * len(self.labels)
+        for f, w in self._weigh(features(text), self._idf).items():
+            for i, cw in self._index.get(f, ()):
+                totals[i] += w * cw
+        return sorted(zip(self.labels, totals), key=lambda item: item[1], reverse=True)
+
+    def predict(self, text: str) -> tuple:
+        """(label, margin over the runner-up)"""
+        if is_phatic(text):
+            return "general", 1.0
+        ranked = self.scores(text)
+        if not ranked or ranked[0][1] == 0.0:
+            return None, 0.0
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        return ranked[0][0], ranked[0][1] - runner_up
+
+    def classify(self, text: str):
+        """Label when the margin clears min_margin, else None (ask Cohere)"""
+        label, margin = self.predict(text)
+        return label if margin >= self.min_margin else None
+
+
+def is_phatic(text: str) -> bool:
+    words = TOKEN_RE.findall(text.lower())
+    return 0 < len(words) <= PHATIC_MAX_WORDS and all(w in PHATIC_WORDS for w in words)
+
+
+# Process-wide classifier; trained on first use
+intent_classifier = IntentClassifier()
+
+# ===============================
+# TASK STRINGS
+# ===============================
+# Phrases around the target of an open/close/play/search prompt. Only verbs
+# that mean the label on their own: "make", "get", "end", "put on" and the like
+# are ordinary chat far more often than commands, so those prompts stay general.
+POLITE_PHRASES = [
+    "can you", "could you", "would you", "will you", "please", "just", "i want to",
+    "i'd like to", "i need to", "let's",
+]
+TARGET_VERBS = {
+    "open": [
+        "open", "launch", "start", "start up", "fire up", "boot up", "load up", "bring up", "pull up",
+    ],
+    "close": [
+        "close", "force close", "shut down", "kill", "exit", "quit", "terminate",
+    ],
+    "play": [
+        "play", "start playing", "queue up", "listen to",
+    ],
+    "google search": [
+        "google", "google search", "search", "search for", "search about", "search google for",
+        "search the web for", "search online for", "search wikipedia for", "do a web search for",
+        "check google for", "look up", "browse for",
+    ],
+    "youtube search": [
+        "youtube", "youtube search", "youtube videos about", "search", "search for",
+        "search youtube for", "search yt for", "search on yt for", "search on youtube for",
+        "browse youtube for", "show me youtube results for", "look up", "play",
+    ],
+}
+TRAILING_PHRASES = [
+    "please", "for me", "now", "app", "window", "on", "on youtube", "on yt", "on google",
+]
+NO_TARGET = {"it", "this", "that", "everything", "something", "this window", "this program"}
+MIN_TARGET_LENGTH = 3
+
+
+def _alternation(phrases):
+    # Longest first so "shut down" wins over "shut"
+    return "|".join(re.escape(p) for p in sorted(phrases, key=len, reverse=True))
+
+
+POLITE_RE = re.compile(rf"^(?:(?:{_alternation(POLITE_PHRASES)})\s+)*")
+TARGET_VERB_RES = {
+    label: re.compile(rf"^(?:{_alternation(verbs)})\b\s*") for label, verbs in TARGET_VERBS.items()
+}
+TRAILING_RE = re.compile(rf"(?:(?:^|[\s,]+)(?:{_alternation(TRAILING_PHRASES)}))+$")
+DETERMINER_RE = re.compile(r"^(?:the|a|an|my)\s+")
+
+# (pattern, task) in priority order; only commands Main's system branch executes
+SYSTEM_TASKS = [
+    (re.compile(r"\brecord"), lambda m: "system start screen recording"),
+    (re.compile(r"\bscreen ?shot|\bscreen capture|\b(?:capture|snap|grab)\b.*\bscreen"), lambda m: "system screenshot"),
+    (re.compile(r"\b(\d{1,3})\b"), lambda m: f"system set to {min(int(m.group(1)), 100)}"),
+    (re.compile(r"\bmax(?:imum)? (?:volume|sound)\b"), lambda m: "system set to 100"),
+    (re.compile(r"\bunmute\b|\bsound on\b"), lambda m: "system unmute"),
+    (re.compile(r"\bmute\b|\bsilence\b|\bsound off\b"), lambda m: "system mute"),
+]
+
+
+def extract_target(label: str, prompt: str) -> str:
+    """
+    The app, song or query after the label's verb phrase, or "" when the
+    prompt does not start with one of the label's verbs (after polite words)
+    or what is left is too short to name anything
+    """
+    text = prompt.lower().strip().rstrip("?.!")
+    text = POLITE_RE.sub("", text, count=1)
+    verb = TARGET_VERB_RES[label].match(text)
+    if not verb:
+        return ""
+    text = TRAILING_RE.sub("", text[verb.end():])
+    text = DETERMINER_RE.sub("", text.strip(" ,"), count=1).strip(" ,")
+    return "" if text in NO_TARGET or len(text) < MIN_TARGET_LENGTH else text
+
+
+def tasks_for_label(label: str, prompt: str, is_running=None):
+    """
+    Task strings for a classifier or Cohere label, or None when the label has
+    nothing to act on. close_app matches its argument as a substring of every
+    process name and path, so 'close' is only returned when is_running(target)
+    confirms a process with exactly that name.
+    """
+    if label in TARGET_VERBS:
+        target = extract_target(label, prompt)
+        if label == "close" and target and not (is_running and is_running(target)):
+            return None
+        return [f"{label} {target}"] if target else None
+    if label == "system":
+        text = prompt.lower()
+        for pattern, task in SYSTEM_TASKS:
+            match = pattern.search(text)
+            if match:
+                return [task(match)]
+        return None
+    return [f"{label} {prompt}"]
+
+# ===============================
+# EVALUATION
+# ===============================
+def reaches_classifier(prompt: str) -> bool:
+    """True when the IntentEngine rules leave prompt as 'general'"""
+    return classify_command(prompt) == [f"general {prompt}"]
+
+
+def load_eval(path=EVAL_PATH) -> dict:
+    """{prompt: {"hand": label, "cohere": label (after --relabel)}}, minus prompts the rules route first"""
+    with open(path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    routed = [prompt for prompt in entries if not reaches_classifier(prompt)]
+    if routed:
+        print(f"⚠️ Skipping {len(routed)} eval prompts the rules already route: {routed[:5]}")
+    return {prompt: labels for prompt, labels in entries.items() if prompt not in routed}
+
+
+def labels_from(entries: dict, source: str) -> dict:
+    """{prompt: label} for one label source ('hand' or 'cohere'), skipping missing labels"""
+    return {prompt: labels[source] for prompt, labels in entries.items() if labels.get(source)}
+
+
+def evaluate(classifier: IntentClassifier, labelled: dict) -> dict:
+    """Accuracy of every prediction and of the confident ones, against {prompt: label}"""
+    correct = confident = confident_correct = 0
+    mistakes = []
+    for prompt, expected in labelled.items():
+        label, margin = classifier.predict(prompt)
+        sure = margin >= classifier.min_margin
+        correct += label == expected
+        confident += sure
+        confident_correct += sure and label == expected
+        if label != expected:
+            mistakes.append((prompt, expected, label, margin, sure))
+    total = len(labelled)
+    return {
+        "total": total,
+        "accuracy": correct / total if total else 0.0,
+        "coverage": confident / total if total else 0.0,
+        "confident_accuracy": confident_correct / confident if confident else 0.0,
+        "mistakes": mistakes,
+    }
+
+
+def relabel(entries: dict) -> dict:
+    """Fill in every prompt's Cohere label, as APIDecisionMaker would ask for it (needs CohereAPIKey)"""
+    from Backend.Model import co, cohere_label
+    from Backend.RateLimiter import limits
+    if not co:
+        raise RuntimeError("CohereAPIKey is not set")
+    fresh = {}
+    for prompt, labels in entries.items():
+        limits.acquire("cohere")
+        fresh[prompt] = dict(labels, cohere=cohere_label(prompt) or "general")
+        if fresh[prompt]["cohere"] != labels["hand"]:
+            print(f"  🔁 {prompt!r}: hand {labels['hand']}, Cohere {fresh[prompt]['cohere']}")
+    return fresh
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if args:
+        for prompt in args:
+            label, margin = intent_classifier.predict(prompt)
+            verdict = "local" if margin >= intent_classifier.min_margin else "ask Cohere"
+            tasks = tasks_for_label(label, prompt) if label and label != "general" else None
+            print(f"{prompt!r} -> {label} (margin {margin:.3f}, {verdict}) -> {tasks or 'general'}")
+        sys.exit(0)
+
+    entries = load_eval()
+    if "--relabel" in sys.argv:
+        entries = relabel(entries)
+        with open(EVAL_PATH, "w", encoding="utf-8") as f:
+            json.dump(entries, f, indent=2, ensure_ascii=False)
+        print(f"💾 Saved {len(entries)} Cohere labels to {EVAL_PATH}")
+
+    start = time.perf_counter()
+    intent_classifier._ensure_trained()
+    print(f"Trained on {EXAMPLES_PATH} in {(time.perf_counter() - start) * 1000:.1f} ms")
+    print(f"Eval set: {len(entries)} prompts that reach the classifier")
+
+    for source in ("hand", "cohere"):
+        labelled = labels_from(entries, source)
+        if not labelled:
+            print(f"\n{source} labels: not in {EVAL_PATH} (run --relabel with CohereAPIKey set)")
+            continue
+        report = evaluate(intent_classifier, labelled)
+        print(f"\n{source} labels - accuracy: {report['accuracy']:.1%} of {report['total']}")
+        print(f"Confident (margin >= {intent_classifier.min_margin}): {report['coverage']:.1%} of prompts, "
+              f"{report['confident_accuracy']:.1%} correct; the rest go to Cohere")
+        for prompt, expected, label, margin, sure in report["mistakes"]:
+            print(f"  {'❌' if sure else '↪️'} {prompt!r}: expected {expected}, got {label} (margin {margin:.3f})")
+
+    prompts = list(entries)
+    rounds = 50
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for prompt in prompts:
+            intent_classifier.predict(prompt)
+    elapsed = time.perf_counter() - start
+    print(f"Latency: {elapsed / (rounds * len(prompts)) * 1e6:.0f} µs per prediction")
@@ -0,0 +1,311 @@
+"""
+Compiled rule table behind Model.LocalDecisionMaker.
+
+All keyword and phrase rules are compiled once into a single alternation
+regex. One scan of the command collects the features it contains
+(screenshot, volume, search, realtime keyword, ...). The rules are
+then tried in priority order against that feature set and the leading word,
+and only the winning rule runs its extraction. Task strings are identical to
+the original if-chain; Backend/Corpus/local_decision_golden.json pins them.
+
+Usage:
+    python -m Backend.IntentEngine            # golden check + throughput benchmark
+    python -m Backend.IntentEngine "play despacito on youtube"
+"""
+import json
+import os
+import re
+import sys
+import time
+
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), "Corpus", "local_decision_golden.json")
+
+# ===============================
+# FEATURES
+# ===============================
+SCREENSHOT = "screenshot"
+RECORD = "record"                  # "record" anywhere (also "recording")
+RECORD_PHRASE = "record_phrase"    # start/begin (screen) recording, record(ing) screen
+MUTE = "mute"                      # also matches "unmute"
+VOLUME = "volume"
+VOLUME_PHRASE = "volume_phrase"    # set/turn volume to, increase/decrease/raise/lower volume
+RUN = "run"
+REMIND = "remind"
+REALTIME = "realtime"
+SEARCH = "search"
+
+# (pattern, features) in priority order: where two patterns match at the same
+# position only the first is reported, so it must carry the other's features
+# (checked for literals when the scanner is compiled, by hand for phrases)
+SCAN_PATTERNS = [
+    (r"set\s+volume\s+to", {VOLUME_PHRASE, VOLUME}),
+    (r"turn\s+(?:the\s+)?volume\s+to", {VOLUME_PHRASE, VOLUME}),
+    (r"(?:increase|decrease|raise|lower)\s+volume", {VOLUME_PHRASE, VOLUME}),
+    (r"(?:start|begin)\s+(?:screen\s+)?recording", {RECORD_PHRASE, RECORD}),
+    (r"(?:record|recording)\s+screen", {RECORD_PHRASE, RECORD}),
+    (r"\brun\s", {RUN}),
+    ("screenshot", {SCREENSHOT}),
+    ("record", {RECORD}),
+    ("mute", {MUTE}),
+    ("volume", {VOLUME}),
+    ("remind", {REMIND}),
+    ("update on", {REALTIME}),
+    ("weather", {REALTIME}), ("news", {REALTIME}), ("latest", {REALTIME}), ("current", {REALTIME}),
+    ("stock", {REALTIME}), ("price", {REALTIME}), ("currency", {REALTIME}), ("crypto", {REALTIME}),
+    ("bitcoin", {REALTIME}), ("time", {REALTIME}), ("date", {REALTIME}), ("day", {REALTIME}),
+    ("month", {REALTIME}), ("year", {REALTIME}), ("clock", {REALTIME}),
+    ("search", {SEARCH}), ("find", {SEARCH}), ("look for", {SEARCH}),
+]
+
+SYSTEM_TRIGGERS = {VOLUME_PHRASE, RECORD_PHRASE, MUTE, SCREENSHOT}
+
+# ===============================
+# LEADING-WORD TABLES
+# ===============================
+EXIT_WORDS = {"exit", "quit", "bye", "goodbye", "stop"}
+OPEN_VERBS = {"open", "launch", "start"}
+CLOSE_VERBS = {"close", "kill", "exit"}
+CONTENT_STARTERS = {"write", "create", "make", "draft", "prepare", "compose"}
+QUESTION_STARTERS = {"who", "what", "where", "when", "why", "how"}
+PPT_MARKERS = ("ppt", "powerpoint", "presentation", "slide show", "slides")
+CONTENT_TYPES = {"song", "letter", "poem", "story", "email", "message",
+                 "note", "essay", "article", "report", "document", "paper"}
+
+# Highest priority first (the original sorted these by length on every call)
+PLATFORM_MARKERS = (
+    ("on youtube", "youtube"), ("in youtube", "youtube"),
+    ("on google", "google"), ("in google", "google"),
+    ("youtube", "youtube"), ("google", "google"),
+    ("on yt", "youtube"), ("yt", "youtube"),
+)
+
+# ===============================
+# COMPILED PATTERNS
+# ===============================
+VERB_RE = re.compile(r"^(open|launch|start|close|kill|exit)\s+")
+ARTICLE_RE = re.compile(r"^(a|an|the)\s+")
+PPT_CONNECTOR_RE = re.compile(r"\b(on|about|for|regarding|of)\b")
+TOPIC_CONNECTOR_RE = re.compile(r"^\b(on|about|for|regarding|of|to)\b\s*")
+SPACES_RE = re.compile(r"\s+")
+VOLUME_LEVEL_RE = re.compile(r"(to|set to|at)\s*(\d+)")
+IMAGE_RE = re.compile(r"^(generate|create|make|draw)\s+(an?\s+)?(image|picture|photo|art|drawing)\b")
+IMAGE_PREFIX_RE = re.compile(
+    r"^(generate|create|make|draw)\s+(an?\s+)?(image|picture|photo|art|drawing)\s*(of|for|about)?\s*"
+)
+RUN_RE = re.compile(r"\brun\s+")
+SEARCH_PREFIX_RE = re.compile(r"^(youtube search|google search|search for|look for|play on|search|find|play)")
+
+
+def _compile_scanner(patterns):
+    """
+    One alternation without groups, so re can use its literal-prefix search;
+    returns (scanner, literal text -> features, [(phrase regex, features)])
+    """
+    literals = {p: frozenset(f) for p, f in patterns if re.escape(p) == p.replace(" ", r"\ ")}
+    order = list(literals)
+    for i, a in enumerate(order):
+        for b in order[i + 1:]:
+            if (a.startswith(b) or b.startswith(a)) and not literals[b] <= literals[a]:
+                raise ValueError(f"'{a}' hides '{b}' without carrying its features")
+    phrases = [(re.compile(p), frozenset(f)) for p, f in patterns if p not in literals]
+    scanner = re.compile("|".join(f"(?:{p})" for p, _ in patterns))
+    return scanner, literals, phrases
+
+
+SCANNER, LITERAL_FEATURES, PHRASE_FEATURES = _compile_scanner(SCAN_PATTERNS)
+
+
+def scan(text: str) -> set:
+    """Features of every pattern occurrence, overlapping ones included ("update" also gives "date")"""
+    features = set()
+    match = SCANNER.search(text)
+    while match:
+        found = match.group()
+        known = LITERAL_FEATURES.get(found)
+        if known is None:
+            known = next(f for phrase, f in PHRASE_FEATURES if phrase.fullmatch(found))
+        features |= known
+        match = SCANNER.search(text, match.start() + 1)
+    return features
+
+# ===============================
+# EXTRACTION
+# ===============================
+def extract_query_and_platform(text: str, default_platform: str = None) -> tuple[str, str]:
+    clean_text = text.lower().strip()
+    detected_platform = None
+
+    for marker, platform in PLATFORM_MARKERS:
+        if marker in clean_text:
+            clean_text = clean_text.replace(marker, "").strip()
+            detected_platform = platform
+            break
+
+    prefix = SEARCH_PREFIX_RE.match(clean_text)
+    if prefix:
+        clean_text = clean_text[prefix.end():].strip()
+
+    if default_platform and not detected_platform:
+        detected_platform = default_platform
+
+    return clean_text.strip().rstrip("?.!,"), detected_platform
+
+
+def _system(prompt, text, features):
+    if SCREENSHOT in features:
+        return ["system screenshot"]
+    if RECORD in features:
+        return ["system start screen recording"]
+    if MUTE in features:
+        return [f"system {text}"]
+    level = VOLUME_LEVEL_RE.search(text)
+    if level:
+        return [f"system set to {level.group(2)}"]
+    return [f"system {text}"]
+
+
+def _open(prompt, text, features):
+    return [f"open {VERB_RE.sub('', text, count=1).strip(' .')}"]
+
+
+def _close(prompt, text, features):
+    return [f"close {VERB_RE.sub('', text, count=1).strip(' .')}"]
+
+
+def _content(prompt, text, features):
+    remaining = text.split(" ", 1)[1].strip()
+    if remaining.startswith(("a ", "an ", "the ")):
+        remaining = ARTICLE_RE.sub("", remaining, count=1).strip()
+
+    # Presentations first
+    if any(marker in remaining for marker in PPT_MARKERS):
+        # Removed one marker at a time, like the original ("slipptdes" -> "slides" -> "")
+        topic = remaining
+        for marker in PPT_MARKERS:
+            topic = topic.replace(marker, "")
+        topic = PPT_CONNECTOR_RE.sub("", topic)
+        topic = SPACES_RE.sub(" ", topic).strip()
+        return [f"content presentation {topic or 'Untitled'}"]
+
+    words = remaining.split()
+    first_word = words[0] if words else ""
+    if first_word in CONTENT_TYPES:
+        detected_type = first_word
+        topic_text = remaining[len(first_word):].strip()
+    else:
+        detected_type = "document"
+        topic_text = remaining
+
+    topic_text = TOPIC_CONNECTOR_RE.sub("", topic_text, count=1)
+    topic_text = SPACES_RE.sub(" ", topic_text).strip()
+    if len(topic_text) < 2:
+        topic_text = "Untitled"
+    return [f"content {detected_type} {topic_text}"]
+
+
+def _image(prompt, text, features):
+    img_prompt = IMAGE_PREFIX_RE.sub("", text, count=1).strip(" .")
+    return [f"generate image {img_prompt or 'Untitled'}"]
+
+
+def _run(prompt, text, features):
+    cmd = RUN_RE.sub("", text).strip().rstrip(".,!?")
+    return [f"run {cmd}"] if cmd else None
+
+
+def _search(prompt, text, features):
+    query_part, platform = extract_query_and_platform(prompt, default_platform="google")
+    if platform == "youtube":
+        return [f"youtube search {query_part}"]
+    return [f"google search {query_part}"]
+
+
+def _play(prompt, text, features):
+    query_part, _ = extract_query_and_platform(prompt)
+    return [f"play {query_part}"]
+
+# ===============================
+# RULE TABLE
+# ===============================
+# (name, condition(text, head, features), build(prompt, text, features)) in
+# priority order; head is the first word when it is followed by a space.
+# A build that returns None passes the command on to the next rule.
+RULES = [
+    ("exit", lambda text, head, f: text in EXIT_WORDS, lambda p, t, f: ["exit"]),
+    ("system", lambda text, head, f: not SYSTEM_TRIGGERS.isdisjoint(f), _system),
+    ("open", lambda text, head, f: head in OPEN_VERBS, _open),
+    ("close", lambda text, head, f: head in CLOSE_VERBS, _close),
+    ("content", lambda text, head, f: head in CONTENT_STARTERS, _content),
+    ("image", lambda text, head, f: IMAGE_RE.match(text) is not None, _image),
+    ("run", lambda text, head, f: RUN in f, _run),
+    ("reminder", lambda text, head, f: REMIND in f, lambda p, t, f: [f"reminder {p}"]),
+    ("realtime", lambda text, head, f: head in QUESTION_STARTERS or REALTIME in f, lambda p, t, f: [f"realtime {p}"]),
+    ("search", lambda text, head, f: SEARCH in f, _search),
+    ("play", lambda text, head, f: head == "play" or "play" in text.split()[:3], _play),
+]
+
+
+def classify(prompt: str) -> list:
+    """Task strings for one command, e.g. ['open chrome'] or ['general what is love']"""
+    if not prompt or not prompt.strip():
+        return ["general hello"]
+
+    text = prompt.lower().strip()
+    word, space, _ = text.partition(" ")
+    head = word if space else None
+    features = scan(text)
+
+    for _, condition, build in RULES:
+        if condition(text, head, features):
+            tasks = build(prompt, text, features)
+            if tasks is not None:
+                return tasks
+    return [f"general {prompt}"]
+
+
+def rule_for(prompt: str) -> str:
+    """Name of the rule that handles prompt ('general' when none does)"""
+    text = prompt.lower().strip()
+    word, space, _ = text.partition(" ")
+    head = word if space else None
+    features = scan(text)
+    for name, condition, build in RULES:
+        if condition(text, head, features) and build(prompt, text, features) is not None:
+            return name
+    return "general"
+
+# ===============================
+# GOLDEN CORPUS + BENCHMARK
+# ===============================
+def load_golden(path=GOLDEN_PATH) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def check_golden(golden: dict) -> list:
+    """[(prompt, expected, got)] for every mismatch"""
+    return [(p, expected, classify(p)) for p, expected in golden.items() if classify(p) != expected]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        for prompt in sys.argv[1:]:
+            print(f"{prompt!r} -> {classify(prompt)} ({rule_for(prompt)})")
+        sys.exit(0)
+
+    golden = load_golden()
+    failures = check_golden(golden)
+    print(f"Golden corpus: {len(golden) - len(failures)}/{len(golden)} match")
+    for prompt, expected, got in failures:
+        print(f"  ❌ {prompt!r}: expected {expected}, got {got}")
+
+    prompts = list(golden)
+    rounds = 200
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for prompt in prompts:
+            classify(prompt)
+    elapsed = time.perf_counter() - start
+    total = rounds * len(prompts)
+    print(f"Throughput: {total / elapsed:,.0f} commands/s ({elapsed / total * 1e6:.1f} µs per command)")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,132 @@
+"""
+Deferred imports for the startup path.
+
+lazy_callable("Backend.Model", "FirstLayerDMM") returns a stand-in that
+imports the module on its first call, so call sites stay unchanged while
+heavy stacks (pygame, cohere, groq, cv2, PIL...) load only when needed.
+preload() imports modules on a background thread once the window is up.
+
+The startup benchmark imports Main with Frontend.GUI replaced by a no-op
+module (PyQt5/win32 are not needed to see what Main itself pulls in), so it
+also runs on Linux and in CI; --with-gui measures the real window import.
+
+Usage:
+    python -m Backend.LazyImport                 # import-time report for Main
+    python -m Backend.LazyImport --budget 800    # fail if Main takes longer (ms)
+    python -m Backend.LazyImport --with-gui
+"""
+import importlib
+import os
+import subprocess
+import sys
+import threading
+
+DEFAULT_BUDGET_MS = 1500
+
+# Modules that must not be imported while Main starts up
+EAGER_FORBIDDEN = (
+    "Backend.Model", "Backend.Chatbot", "Backend.RealtimeSearchEngine",
+    "Backend.SpeechToText", "Backend.TextToSpeech", "Backend.System_Automation",
+    "Backend.ImageGeneration", "pygame", "cohere", "groq", "cv2", "PIL",
+)
+
+# Stand-in for Frontend.GUI: every attribute is a no-op callable
+GUI_STUB = """
+import sys, types
+class _Stub(types.ModuleType):
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+sys.modules["Frontend.GUI"] = _Stub("Frontend.GUI")
+"""
+
+
+class LazyCallable:
+    def __init__(self, module, name):
+        self._module = module
+        self._name = name
+        self._target = None
+        self._lock = threading.Lock()
+
+    def resolve(self):
+        if self._target is None:
+            with self._lock:
+                if self._target is None:
+                    self._target = getattr(importlib.import_module(self._module), self._name)
+        return self._target
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __repr__(self):
+        state = "loaded" if self._target is not None else "deferred"
+        return f"<lazy {self._module}.{self._name} ({state})>"
+
+
+def lazy_callable(module, name):
+    return LazyCallable(module, name)
+
+
+def preload(*modules, then=None):
+    """Import modules in the background (in order), then call then() if given"""
+    def _load():
+        for module in modules:
+            try:
+                importlib.import_module(module)
+            except Exception as e:
+                print(f"⚠️ Preload of {module} failed: {e}")
+        if then is not None:
+            then()
+
+    thread = threading.Thread(target=_load, daemon=True, name="preload")
+    thread.start()
+    return thread
+
+
+# ===============================
+# STARTUP BENCHMARK
+# ===============================
+def measure_import(module="Main", cwd=None, stub_gui=True, env=None):
+    """Run `python -X importtime -c "import <module>"`; returns (cumulative_us, [(self_us, name)])"""
+    code = (GUI_STUB if stub_gui else "") + f"import {module}"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=cwd, env=env, capture_output=True, text=True
+    )
+    total = None
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            rows.append((int(self_us), name.strip()))
+            if name.strip() == module:
+                total = int(cumulative_us)
+        except ValueError:
+            continue
+    if total is None:
+        raise RuntimeError(f"Could not import {module}:\n{result.stderr[-2000:]}")
+    return total, rows
+
+
+if __name__ == "__main__":
+    budget_ms = DEFAULT_BUDGET_MS
+    if "--budget" in sys.argv:
+        budget_ms = float(sys.argv[sys.argv.index("--budget") + 1])
+    module = sys.argv[sys.argv.index("--module") + 1] if "--module" in sys.argv else "Main"
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+    total_us, rows = measure_import(module, cwd=root, stub_gui="--with-gui" not in sys.argv)
+    print(f"Import of {module}: {total_us / 1000:.1f} ms (budget {budget_ms:.0f} ms)")
+    print("Slowest modules (self time):")
+    for self_us, name in sorted(rows, reverse=True)[:15]:
+        print(f"  {self_us / 1000:8.1f} ms  {name}")
+
+    eager = sorted({name for _, name in rows if name in EAGER_FORBIDDEN})
+    if eager:
+        print(f"❌ Imported eagerly: {', '.join(eager)}")
+        sys.exit(1)
+    if total_us / 1000 > budget_ms:
+        print("❌ Over startup budget")
+        sys.exit(1)
+    print("✅ Within startup budget")
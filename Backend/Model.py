@@ -1,13 +1,21 @@
 import cohere
 from rich import print
 from dotenv import dotenv_values
-from cohere.errors import TooManyRequestsError
-import time
 import re
 from functools import lru_cache
-import threading
 from groq import Groq
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Backend.IntentEngine import classify as classify_command
+from Backend.IntentClassifier import intent_classifier, tasks_for_label
+from Backend.RoutingCache import routing_cache, NEGATIVE_TTL
+from Backend.RateLimiter import limits
+from Backend.ProcessTable import processes
 
 # Load environment variables
 env_vars = dotenv_values('.env')
@@ -28,12 +36,26 @@ funcs = [
     'google search', 'youtube search', 'run', 'reminder', 'generate image'
 ]
 
-# RATE LIMITING WITH CACHE
-last_api_call = 0
-MIN_API_INTERVAL = 0.8
-api_cache = {}
-cache_lock = threading.Lock()
-MAX_CACHE_SIZE = 200
+# RATE LIMITING
+# Calls take a token from Backend/RateLimiter.py; answers are cached in
+# Backend/RoutingCache.py, keyed by normalize_query
+# Longest the Cohere fallback may wait for a token before local routing is kept
+CLASSIFY_MAX_WAIT = 0.8
+
+# SPECULATIVE PREPROCESSING
+# Groq only runs when local routing looks unsure, and its answer is used only
+# if it arrives within the budget and routes differently
+PREPROCESS_CONFIDENCE = 0.7
+PREPROCESS_BUDGET = float(env_vars.get('PreprocessBudget') or 1.5)
+preprocess_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="preprocess")
+
+ACTION_VERBS = {
+    'open', 'close', 'play', 'search', 'create', 'make',
+    'write', 'generate image', 'generate', 'set', 'increase', 'decrease',
+    'mute', 'unmute', 'run', 'execute', 'start', 'stop', 'turn',
+    'take', 'record'
+}
+FILLER_WORDS = {'and', 'then', 'also', 'please', 'now', 'it', 'the', 'a', 'to'}
 
 @lru_cache(maxsize=512)
 def normalize_query(query):
@@ -45,6 +67,15 @@ def preprocess_query(raw_prompt: str):
         return None
     if len(raw_prompt.split()) < 10:
         return None
+    normalized = normalize_query(raw_prompt)
+    found, cached = routing_cache.get("preprocess", normalized)
+    if found:
+        print("💾 Using cached preprocess result")
+        return cached
+    # Optional call: skip it rather than queue behind the chat requests
+    if not limits.try_acquire("groq"):
+        print("⏳ Groq budget exhausted, skipping preprocess")
+        return None
     try:
         system_prompt = """
         You are a query preprocessor. Tasks:
@@ -70,6 +101,7 @@ def preprocess_query(raw_prompt: str):
         try:
             commands = json.loads(response)
             if isinstance(commands, list) and all(isinstance(c, str) for c in commands):
+                routing_cache.put("preprocess", normalized, commands)
                 return commands
         except json.JSONDecodeError:
             pass
@@ -80,14 +112,6 @@ def preprocess_query(raw_prompt: str):
 # SMART MULTI-COMMAND SPLITTER
 def split_multi_commands(prompt: str):
     prompt = prompt.strip().replace('\n', ' ')
-    prompt_lower = prompt.lower()
-    action_verbs = [
-        'open', 'close', 'play', 'search', 'create', 'make',
-        'write', 'generate image', 'generate', 'set', 'increase', 'decrease',
-        'mute', 'unmute', 'run', 'execute', 'start', 'stop', 'turn',
-        'take', 'record'
-    ]
-    
     conjunction_parts = re.split(r'\s+(and|then)\s+', prompt, flags=re.IGNORECASE)
     commands = []
     
@@ -97,7 +121,7 @@ def split_multi_commands(prompt: str):
         words = conj_part.split()
         current_cmd = []
         for word in words:
-            if word.lower() in action_verbs and current_cmd:
+            if word.lower() in ACTION_VERBS and current_cmd:
                 commands.append(' '.join(current_cmd).strip())
                 current_cmd = [word]
             else:
@@ -110,7 +134,7 @@ def split_multi_commands(prompt: str):
     for cmd in commands:
         if not cmd: continue
         first_word = cmd.split()[0].lower() if cmd.split() else ''
-        if first_word in action_verbs:
+        if first_word in ACTION_VERBS:
             last_action = first_word if first_word in ['open', 'close'] else None
             final_commands.append(cmd)
         elif last_action:
@@ -121,275 +145,113 @@ def split_multi_commands(prompt: str):
     return final_commands if len(final_commands) > 1 else [prompt]
 
 # ────────────────────────────────────────────────
-# HELPER: better extraction for search & play
-# ────────────────────────────────────────────────
-def extract_query_and_platform(text: str, default_platform: str = None) -> tuple[str, str]:
-    text_lower = text.lower().strip()
-    
-    platform_markers = {
-        "on google": "google",
-        "in google": "google",
-        "google": "google",
-        "on youtube": "youtube",
-        "in youtube": "youtube",
-        "youtube": "youtube",
-        "on yt": "youtube",
-        "yt": "youtube"
-    }
-    
-    detected_platform = None
-    clean_text = text_lower
-    
-    for marker in sorted(platform_markers, key=len, reverse=True):
-        if marker in clean_text:
-            clean_text = clean_text.replace(marker, "").strip()
-            detected_platform = platform_markers[marker]
-            break
-    
-    prefixes = [
-        "search for", "search", "find", "look for",
-        "google search", "youtube search",
-        "play on", "play"
-    ]
-    for prefix in sorted(prefixes, key=len, reverse=True):
-        if clean_text.startswith(prefix):
-            clean_text = clean_text[len(prefix):].strip()
-            break
-    
-    if default_platform and not detected_platform:
-        detected_platform = default_platform
-    
-    clean_query = clean_text.strip().rstrip("?.!,")
-    
-    return clean_query, detected_platform
-
-# ────────────────────────────────────────────────
-# LOCAL DECISION MAKER (FAST RULES) ── IMPROVED VERSION
+# LOCAL DECISION MAKER (FAST RULES)
 # ────────────────────────────────────────────────
+# Rules are compiled once in Backend/IntentEngine.py (one scan per command)
 def LocalDecisionMaker(prompt: str):
-    if not prompt or not prompt.strip():
-        return ['general hello']
-    
-    prompt_lower = prompt.lower().strip()
-    
-    # EXIT
-    if prompt_lower in ['exit', 'quit', 'bye', 'goodbye', 'stop']:
-        return ['exit']
-    
-    # SYSTEM COMMANDS
-    system_patterns = [
-        r'set\s+volume\s+to', r'turn\s+(the\s+)?volume\s+to',
-        r'(increase|decrease|raise|lower)\s+volume',
-        r'mute(\s+volume|\s+sound|\s+the\s+volume)?',
-        r'unmute(\s+volume|\s+sound|\s+the\s+volume)?',
-        r'take\s+(a\s+)?screenshot',
-        r'screenshot',
-        r'(start|begin)\s+(screen\s+)?recording',
-        r'(record|recording)\s+screen'
-    ]
-    for pattern in system_patterns:
-        if re.search(pattern, prompt_lower, re.I):
-            if 'screenshot' in prompt_lower:
-                return ['system screenshot']
-            if any(w in prompt_lower for w in ['record', 'recording']):
-                return ['system start screen recording']
-            if any(w in prompt_lower for w in ['mute', 'unmute']):
-                return [f'system {prompt_lower}']
-            if 'volume' in prompt_lower:
-                level_match = re.search(r'(to|set to|at)\s*(\d+)', prompt_lower, re.I)
-                if level_match:
-                    return [f'system set to {level_match.group(2)}']
-                return [f'system {prompt_lower}']
+    return classify_command(prompt)
 
-    # OPEN / CLOSE ── clean version without duplication
-    if prompt_lower.startswith(('open ', 'launch ', 'start ')):
-        app = re.sub(r'^(open|launch|start)\s+', '', prompt_lower, flags=re.I).strip(' .')
-        return [f'open {app}']
-    
-    if prompt_lower.startswith(('close ', 'kill ', 'exit ')):
-        app = re.sub(r'^(close|kill|exit)\s+', '', prompt_lower, flags=re.I).strip(' .')
-        return [f'close {app}']
-    
-    # ══════════════════════════════════════════════════════════════
-    # CONTENT / PPT / SONG / LETTER / ESSAY ── FIXED VERSION
-    # ══════════════════════════════════════════════════════════════
-    content_starters = ['write', 'create', 'make', 'draft', 'prepare', 'compose']
-    if any(prompt_lower.startswith(s + ' ') for s in content_starters):
-        
-        # Step 1: Remove the starter verb
-        remaining = prompt_lower
-        for starter in content_starters:
-            if remaining.startswith(starter + ' '):
-                remaining = remaining[len(starter):].strip()
-                break
-        
-        # Step 2: Remove optional articles (a, an, the)
-        if remaining.startswith(('a ', 'an ', 'the ')):
-            remaining = re.sub(r'^(a|an|the)\s+', '', remaining, flags=re.I).strip()
-        
-        # Step 3: Check for presentation first (highest priority)
-        ppt_markers = ['ppt', 'powerpoint', 'presentation', 'slide show', 'slides']
-        if any(marker in remaining for marker in ppt_markers):
-            # Remove PPT markers and extract topic
-            topic = remaining
-            for marker in ppt_markers:
-                topic = topic.replace(marker, '')
-            # Remove connector words
-            topic = re.sub(r'\b(on|about|for|regarding|of)\b', '', topic, flags=re.I)
-            topic = re.sub(r'\s+', ' ', topic).strip()
-            if not topic:
-                topic = "Untitled"
-            return [f'content presentation {topic}']
-        
-        # Step 4: Detect content type (song, letter, essay, etc.)
-        content_types = ['song', 'letter', 'poem', 'story', 'email', 'message', 
-                        'note', 'essay', 'article', 'report', 'document', 'paper']
-        
-        detected_type = None
-        topic_text = remaining
-        
-        # Check if first word is a content type
-        first_word = remaining.split()[0] if remaining.split() else ''
-        if first_word in content_types:
-            detected_type = first_word
-            # Remove the content type from remaining text
-            topic_text = remaining[len(first_word):].strip()
-        else:
-            # Default to generic content
-            detected_type = "document"
-            topic_text = remaining
-        
-        # Step 5: Clean up topic text - remove connector words
-        topic_text = re.sub(r'^\b(on|about|for|regarding|of|to)\b\s*', '', topic_text, flags=re.I)
-        topic_text = re.sub(r'\s+', ' ', topic_text).strip()
-        
-        # Step 6: If no topic, use default
-        if not topic_text or len(topic_text) < 2:
-            topic_text = "Untitled"
-        
-        # Return proper format
-        return [f'content {detected_type} {topic_text}']
-    
-    # ══════════════════════════════════════════════════════════════
-    # GENERATE IMAGE ── HIGH PRIORITY
-    # ══════════════════════════════════════════════════════════════
-    if re.match(r'^(generate|create|make|draw)\s+(an?\s+)?(image|picture|photo|art|drawing)\b', prompt_lower):
-        img_prompt = re.sub(
-            r'^(generate|create|make|draw)\s+(an?\s+)?(image|picture|photo|art|drawing)\s*(of|for|about)?\s*',
-            '',
-            prompt_lower,
-            flags=re.I
-        ).strip(' .')
-
-        if not img_prompt:
-            img_prompt = "Untitled"
-
-        return [f'generate image {img_prompt}']
-
-    
-    
-    # RUN COMMAND
-    if re.search(r'\brun\s+', prompt_lower):
-        cmd = re.sub(r'\brun\s+', '', prompt_lower).strip().rstrip('.,!?')
-        if cmd:
-            return [f'run {cmd}']
-    
-    # REMINDER stub
-    if 'remind' in prompt_lower or 'reminder' in prompt_lower:
-        return [f'reminder {prompt}']
-    
-    # REALTIME / GENERAL
-    realtime_keywords = [
-        'weather', 'news', 'latest', 'current', 'update on',
-        'stock', 'price', 'currency', 'crypto', 'bitcoin',
-        'time', 'date', 'day', 'month', 'year', 'clock'
-    ]
-    question_starters = ['who', 'what', 'where', 'when', 'why', 'how']
-    if any(prompt_lower.startswith(q + ' ') for q in question_starters) or any(k in prompt_lower for k in realtime_keywords):
-        return [f'realtime {prompt}']
-    
-    # GOOGLE / YOUTUBE SEARCH ── preserved original good logic
-    search_indicators = ["search for", "search", "google search", "find", "look for"]
-    if any(ind in prompt_lower for ind in search_indicators):
-        query_part, platform = extract_query_and_platform(prompt, default_platform="google")
-        if platform == "youtube":
-            return [f'youtube search {query_part}']
-        else:
-            return [f'google search {query_part}']
-    
-    # PLAY ── preserved original good logic
-    if prompt_lower.startswith("play ") or "play" in prompt_lower.split()[:3]:
-        query_part, _ = extract_query_and_platform(prompt)
-        return [f'play {query_part}']
+# API DECISION MAKER (fallback only)
+def cohere_label(prompt: str):
+    """The funcs label Cohere picks for prompt, or None"""
+    response = co.chat(
+        model='command-r-plus-08-2024',
+        message=f"Classify this query into one of these actions: {', '.join(funcs)}. Query: {prompt}",
+        temperature=0.1,
+        max_tokens=30,
+    )
+    text = response.text.lower().strip()
+    # First label mentioned; the longer one wins a tie ('content presentation' over 'content')
+    found = [(text.find(func), -len(func), func) for func in set(funcs) if func in text]
+    return min(found)[2] if found else None
 
-    # TIME / DATE fast path
-    time_keywords = ['time', 'date', 'day', 'month', 'year', 'clock', "what's the time"]
-    if any(word in prompt_lower for word in time_keywords):
-        return [f'general {prompt}']
-    
-    # DEFAULT
-    return [f'general {prompt}']
+def is_running_app(name: str) -> bool:
+    """True when a process is named exactly name (spaces optional, .exe implied)"""
+    return bool(processes.pids_for(name) or processes.pids_for(name.replace(" ", "")))
 
-# API DECISION MAKER (fallback only)
 def APIDecisionMaker(prompt: str):
-    global last_api_call
+    if not co:
+        return None
     normalized = normalize_query(prompt)
-    with cache_lock:
-        if normalized in api_cache:
-            print("💾 Using cached result")
-            return api_cache[normalized]
-            
-    time_since_last = time.time() - last_api_call
-    if time_since_last < MIN_API_INTERVAL:
-        time.sleep(MIN_API_INTERVAL - time_since_last)
+    found, cached = routing_cache.get("classify", normalized)
+    if found:
+        print("💾 Using cached result")
+        return cached
+    
+    if limits.acquire("cohere", timeout=CLASSIFY_MAX_WAIT) is None:
+        print("⏳ Cohere budget exhausted, keeping local routing")
+        return None
         
     try:
-        response = co.chat(
-            model='command-r-plus-08-2024',
-            message=f"Classify this query into one of these actions: {', '.join(funcs)}. Query: {prompt}",
-            temperature=0.1,
-            max_tokens=30,
-        )
-        last_api_call = time.time()
-        text = response.text.lower().strip()
-        tasks = []
-        for func in funcs:
-            if func in text:
-                if func in ['open', 'close', 'play', 'google search', 'youtube search']:
-                    remaining = prompt.lower().replace(func, '').strip()
-                    tasks.append(f'{func} {remaining}' if remaining else func)
-                else:
-                    tasks.append(f'{func} {prompt}')
-                break
-        result = tasks if tasks else None
-        with cache_lock:
-            if len(api_cache) >= MAX_CACHE_SIZE:
-                api_cache.pop(next(iter(api_cache)))
-            api_cache[normalized] = result
+        label = cohere_label(prompt)
+        result = tasks_for_label(label, prompt, is_running=is_running_app) if label else None
+        # No label is worth retrying soon, not remembering for a month
+        routing_cache.put("classify", normalized, result, ttl=None if result else NEGATIVE_TTL)
         return result
     except Exception as e:
         print(f"⚠️ API Error: {e}")
     return None
 
-# FIRST LAYER DECISION MAKER
-# In Model.py -> Find FirstLayerDMM function
+# ROUTING CONFIDENCE
+def routing_confidence(prompt: str, commands: list, tasks: list) -> float:
+    """
+    0..1 estimate that the local split + rules got a long prompt right.
+    Low when sub-commands fall through to 'general', a fragment holds no
+    real words, or a single command still contains further action verbs.
+    """
+    score = 1.0
+    if len(commands) > 1:
+        general = sum(1 for t in tasks if t.startswith("general"))
+        score -= 0.7 * general / len(tasks)
+        # "stars", "open then": nothing left but filler once the verb is gone
+        if any(all(w in FILLER_WORDS for w in c.lower().split()[1:]) for c in commands):
+            score -= 0.4
+    else:
+        words = prompt.lower().split()
+        if any(w in ACTION_VERBS for w in words[1:]):
+            score -= 0.35
+        if tasks and tasks[0].startswith("general"):
+            score -= 0.15
+    return max(0.0, round(score, 2))
 
+def route_commands(commands: list) -> list:
+    tasks = []
+    for cmd in commands:
+        tasks.extend(LocalDecisionMaker(cmd))
+    return tasks
+
+def speculative_preprocess(prompt: str, local_tasks: list, future):
+    """Wait up to PREPROCESS_BUDGET for Groq; return its tasks only if they differ from local_tasks"""
+    try:
+        commands = future.result(timeout=PREPROCESS_BUDGET)
+    except FuturesTimeout:
+        print(f"⏱️ Preprocess over budget ({PREPROCESS_BUDGET:.1f}s), keeping local routing")
+        return None
+    if not commands:
+        return None
+    llm_tasks = route_commands(commands)
+    if llm_tasks == local_tasks:
+        return None
+    print(f"🔀 Preprocessor re-routed: {llm_tasks}")
+    return llm_tasks
+
+# FIRST LAYER DECISION MAKER
 def FirstLayerDMM(prompt: str):
     if not prompt or len(prompt.strip()) < 2:
         return ['general hello']
     
-    preprocessed = preprocess_query(prompt)
-    if preprocessed:
-        commands = preprocessed
-    else:
-        # REMOVED: The 'if re.search' guard that required 'and'/'then'
-        # Now it will always try to split based on action verbs (open, close, etc.)
-        commands = split_multi_commands(prompt)
-
-    all_tasks = []
-    for cmd in commands:
-        local_result = LocalDecisionMaker(cmd)
-        all_tasks.extend(local_result)
+    # Always split on action verbs (open, close, ...), not only on 'and'/'then'
+    commands = split_multi_commands(prompt)
+    all_tasks = route_commands(commands)
+    
+    # Long prompts the local rules are unsure about get a second opinion from Groq
+    if groq_client and len(prompt.split()) >= 10:
+        confidence = routing_confidence(prompt, commands, all_tasks)
+        if confidence < PREPROCESS_CONFIDENCE:
+            print(f"🧭 Local routing confidence {confidence:.2f}, asking preprocessor")
+            llm_tasks = speculative_preprocess(prompt, all_tasks, preprocess_pool.submit(preprocess_query, prompt))
+            if llm_tasks:
+                all_tasks = llm_tasks
         
     # If any task in the list is NOT general, trust the sequence
     if all_tasks and not any(t.startswith("general") for t in all_tasks):
@@ -397,17 +259,22 @@ def FirstLayerDMM(prompt: str):
 
     # Only fallback if the whole thing is just one 'general' task
     if len(all_tasks) == 1 and all_tasks[0].startswith("general"):
-        if time.time() - last_api_call >= MIN_API_INTERVAL:
-            api_result = APIDecisionMaker(prompt)
-            if api_result:
-                return api_result
+        # Offline classifier first; Cohere only when its margin is too small
+        label = intent_classifier.classify(prompt)
+        if label:
+            print(f"🧠 Local intent classifier: {label}")
+            # A label with no target ("close it") keeps the prompt general
+            tasks = tasks_for_label(label, prompt, is_running=is_running_app) if label != "general" else None
+            return tasks or all_tasks
+        api_result = APIDecisionMaker(prompt)
+        if api_result:
+            return api_result
 
     return all_tasks
 
 # UTILITY
 def clear_cache():
-    with cache_lock:
-        api_cache.clear()
+    routing_cache.clear()
     print("🧹 Cache cleared")
 
 if __name__ == "__main__":
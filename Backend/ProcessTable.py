@@ -0,0 +1,143 @@
+"""
+Shared snapshot of running processes.
+
+close_app, _check_app_exists and the GUI's snapped-window monitor all ask
+"is something called X running?". Instead of each walking psutil.process_iter()
+(and fetching name/exe for every process on every call), they query this
+table. It keeps pid -> (name, exe, create_time) plus a name -> pids index and
+refreshes at most once per TTL. A refresh lists the pids and only inspects the
+ones that appeared since the last refresh, so a pid reused by a new process
+keeps its old entry; process(pid) checks create_time before handing out a
+psutil.Process to act on, and drops entries that turn out to be stale.
+"""
+import threading
+import time
+
+import psutil
+
+DEFAULT_TTL = 1.0
+
+
+def _stem(name):
+    name = name.lower()
+    return name[:-4] if name.endswith(".exe") else name
+
+
+class ProcessTable:
+    def __init__(self, ttl=DEFAULT_TTL):
+        self.ttl = ttl
+        self._procs = {}      # pid -> (name, exe, create_time); lowercase, name without .exe
+        self._by_name = {}    # name -> set of pids
+        self._stamp = 0.0
+        self._lock = threading.Lock()
+
+    # ===============================
+    # REFRESH
+    # ===============================
+    def refresh(self, force=False):
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._stamp < self.ttl:
+                return
+            current = set(psutil.pids())
+            known = set(self._procs)
+
+            for pid in known - current:
+                self._remove(pid)
+
+            for pid in current - known:
+                try:
+                    proc = psutil.Process(pid)
+                    name = _stem(proc.name() or "")
+                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                    continue
+                try:
+                    exe = (proc.exe() or "").lower()
+                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess, OSError):
+                    exe = ""
+                try:
+                    created = proc.create_time()
+                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                    created = None
+                self._procs[pid] = (name, exe, created)
+                self._by_name.setdefault(name, set()).add(pid)
+
+            self._stamp = now
+
+    def invalidate(self):
+        """Force the next query to refresh (e.g. right after terminating processes)"""
+        with self._lock:
+            self._stamp = 0.0
+
+    def _remove(self, pid):
+        name = self._procs.pop(pid)[0]
+        pids = self._by_name.get(name)
+        if pids is not None:
+            pids.discard(pid)
+            if not pids:
+                del self._by_name[name]
+
+    # ===============================
+    # QUERIES
+    # ===============================
+    def names(self):
+        """Set of running process names (lowercase, without .exe)"""
+        self.refresh()
+        with self._lock:
+            return set(self._by_name)
+
+    def pids_for(self, name):
+        """Pids whose process name is exactly name (case-insensitive, .exe optional)"""
+        self.refresh()
+        with self._lock:
+            return set(self._by_name.get(_stem(name), ()))
+
+    def find(self, term, exact_names=()):
+        """
+        Pids matching term the way close_app always has: an exact name in
+        exact_names, term inside the process name, or term inside the exe path
+        """
+        term = term.lower()
+        exact = {_stem(n) for n in exact_names}
+        self.refresh()
+        with self._lock:
+            matches = []
+            for name, pids in self._by_name.items():
+                if name in exact or term in name:
+                    matches.extend(pids)
+                    continue
+                for pid in pids:
+                    exe = self._procs[pid][1]
+                    if exe and term in exe:
+                        matches.append(pid)
+            return matches
+
+    def exe(self, pid):
+        with self._lock:
+            entry = self._procs.get(pid)
+        return entry[1] if entry else ""
+
+    def process(self, pid):
+        """
+        psutil.Process for pid if it is still the process this table recorded,
+        else None. Use it before terminating: the pid may have been reused.
+        """
+        with self._lock:
+            entry = self._procs.get(pid)
+        if entry is None or entry[2] is None:
+            return None
+        try:
+            proc = psutil.Process(pid)
+            if proc.create_time() == entry[2]:
+                return proc
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            pass
+        # Gone or reused: forget it so the next refresh inspects the pid again
+        with self._lock:
+            if self._procs.get(pid) is entry:
+                self._remove(pid)
+        return None
+
+
+# Process-wide table shared by automation and the GUI
+processes = ProcessTable()
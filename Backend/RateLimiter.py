@@ -0,0 +1,166 @@
+"""
+Token-bucket limits for outbound LLM calls.
+
+Every Groq and Cohere request takes a token from its provider's bucket first:
+- acquire(provider)              blocks until a token is free
+- acquire(provider, timeout=s)   gives up (returns None) if the wait would be longer;
+                                 chat answers use timeout=CHAT_MAX_WAIT and tell the
+                                 user to try again instead of hanging
+- try_acquire(provider)          never waits (optional calls such as the preprocessor)
+- await acquire_async(provider)  same as acquire for coroutines
+
+Tokens are handed out as reservations, so concurrent callers get consecutive
+slots instead of all waking up together. Each bucket records how many calls
+were throttled and how much delay that added.
+
+Budgets come from .env (requests per minute, burst):
+    GroqRequestsPerMinute=30    GroqBurst=5
+    CohereRequestsPerMinute=20  CohereBurst=2
+    ChatMaxWait=15              # seconds a chat answer may queue for a token
+
+    python -m Backend.RateLimiter     # burst simulation with stats
+"""
+import asyncio
+import threading
+import time
+
+from dotenv import dotenv_values
+
+_env = dotenv_values('.env')
+
+# provider -> (requests per minute, burst)
+PROVIDER_BUDGETS = {
+    "groq": (float(_env.get('GroqRequestsPerMinute') or 30), float(_env.get('GroqBurst') or 5)),
+    "cohere": (float(_env.get('CohereRequestsPerMinute') or 20), float(_env.get('CohereBurst') or 2)),
+}
+CHAT_MAX_WAIT = float(_env.get('ChatMaxWait') or 15)
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        self.rate = rate                # tokens per second
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity         # may go negative: outstanding reservations
+        self._stamp = clock()
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._throttled = 0
+        self._waited = 0.0
+        self._max_wait = 0.0
+        self._rejected = 0
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def _reserve(self, tokens, max_wait=None):
+        """Take tokens now and return how long the caller must wait, or None if over max_wait"""
+        with self._lock:
+            self._refill(self._clock())
+            wait = max(0.0, (tokens - self._tokens) / self.rate)
+            if max_wait is not None and wait > max_wait:
+                self._rejected += 1
+                return None
+            self._tokens -= tokens
+            self._calls += 1
+            if wait > 0:
+                self._throttled += 1
+                self._waited += wait
+                self._max_wait = max(self._max_wait, wait)
+            return wait
+
+    def try_acquire(self, tokens=1):
+        return self._reserve(tokens, max_wait=0.0) is not None
+
+    def acquire(self, tokens=1, timeout=None):
+        """Block until tokens are available; returns the seconds waited, or None after a timeout"""
+        wait = self._reserve(tokens, max_wait=timeout)
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens=1, timeout=None):
+        wait = self._reserve(tokens, max_wait=timeout)
+        if wait:
+            await asyncio.sleep(wait)
+        return wait
+
+    def stats(self):
+        with self._lock:
+            self._refill(self._clock())
+            return {
+                "calls": self._calls,
+                "throttled": self._throttled,
+                "rejected": self._rejected,
+                "added_latency_s": round(self._waited, 3),
+                "max_wait_s": round(self._max_wait, 3),
+                "available": round(max(0.0, self._tokens), 2),
+            }
+
+
+class RateLimiter:
+    """One TokenBucket per provider"""
+    def __init__(self, budgets=None):
+        self.buckets = {
+            provider: TokenBucket(per_minute / 60.0, burst)
+            for provider, (per_minute, burst) in (budgets or PROVIDER_BUDGETS).items()
+        }
+
+    def bucket(self, provider):
+        return self.buckets[provider]
+
+    def acquire(self, provider, tokens=1, timeout=None):
+        wait = self.buckets[provider].acquire(tokens, timeout=timeout)
+        self._report(provider, wait)
+        return wait
+
+    async def acquire_async(self, provider, tokens=1, timeout=None):
+        wait = await self.buckets[provider].acquire_async(tokens, timeout=timeout)
+        self._report(provider, wait)
+        return wait
+
+    @staticmethod
+    def _report(provider, wait):
+        if wait is None:
+            print(f"⏳ {provider} rate limit: gave up waiting")
+        elif wait:
+            print(f"⏳ {provider} rate limit: waited {wait:.2f}s")
+
+    def try_acquire(self, provider, tokens=1):
+        return self.buckets[provider].try_acquire(tokens)
+
+    def stats(self):
+        return {provider: bucket.stats() for provider, bucket in self.buckets.items()}
+
+
+# Process-wide limiter for every LLM call
+limits = RateLimiter()
+
+
+if __name__ == "__main__":
+    # 8 callers hitting a 120/min, burst-3 bucket at once: 3 pass, the rest are spaced 0.5s apart
+    demo = RateLimiter({"demo": (120, 3)})
+    start = time.perf_counter()
+    finished = []
+
+    def caller(i):
+        demo.acquire("demo")
+        finished.append((i, time.perf_counter() - start))
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    print("Threads:", ", ".join(f"{t:.1f}s" for _, t in sorted(finished, key=lambda x: x[1])))
+
+    async def async_callers():
+        begin = time.perf_counter()
+        await asyncio.gather(*(demo.acquire_async("demo") for _ in range(3)))
+        return time.perf_counter() - begin
+
+    print(f"3 async callers after the burst: {asyncio.run(async_callers()):.1f}s")
+    print(f"try_acquire right after: {demo.try_acquire('demo')}")
+    print(f"acquire with 0.2s timeout: {demo.acquire('demo', timeout=0.2)}")
+    print(demo.stats())
@@ -5,13 +5,20 @@ except ImportError:
 
 from datetime import datetime, timezone, timedelta
 from groq import Groq
-from json import load, dump
 import os
 import re
 from functools import lru_cache
 import threading
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeout
 from dotenv import dotenv_values
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Backend.SentenceStream import SentenceSplitter, iter_completion_sentences
+from Backend.ChatHistory import history
+from Backend.RateLimiter import limits, CHAT_MAX_WAIT
+
 # ===============================
 # ENVIRONMENT SETUP
 # ===============================
@@ -23,14 +30,9 @@ GroqAPIKey = env_vars.get('GroqAPIKey')
 
 client = Groq(api_key=GroqAPIKey)
 
-CHATLOG_PATH = 'Data/ChatLog.json'
-os.makedirs('Data', exist_ok=True)
-
-if not os.path.exists(CHATLOG_PATH):
-    with open(CHATLOG_PATH, 'w') as f:
-        dump([], f)
-
-chatlog_lock = threading.Lock()
+HISTORY_WINDOW = 15
+# Spoken when the Groq budget has no token within CHAT_MAX_WAIT
+BUSY_MESSAGE = "I'm experiencing high load. Please try again in a moment."
 
 # ===============================
 # OPTIMIZED SYSTEM PROMPTS
@@ -91,26 +93,34 @@ def Information():
     return _info_cache
 
 # ===============================
-# OPTIMIZED SEARCH WITH THREADING
+# SEARCH WITH PREFETCH + IN-FLIGHT DEDUPLICATION
 # ===============================
 _search_cache = {}
 _search_cache_lock = threading.Lock()
+_inflight_searches = {}
+_search_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="search")
 SEARCH_CACHE_DURATION = 300  # 5 minutes
+SEARCH_TIMEOUT = 8
+
+FALLBACK_SOURCES = [
+    "https://www.un.org/en/climatechange",
+    "https://www.ipcc.ch",
+    "https://www.worldbank.org/en/topic/environment"
+]
 
 @lru_cache(maxsize=128)
 def normalize_search_query(query):
     return ' '.join(query.lower().strip().split())
 
-def GoogleSearch(query, max_results=5):
-    normalized = normalize_search_query(query)
-    
-    with _search_cache_lock:
-        if normalized in _search_cache:
-            cache_time, cached_data = _search_cache[normalized]
-            if datetime.now().timestamp() - cache_time < SEARCH_CACHE_DURATION:
-                print("💾 Using cached search results")
-                return cached_data
-    
+def _get_cached_search(normalized):
+    # Caller holds _search_cache_lock
+    if normalized in _search_cache:
+        cache_time, cached_data = _search_cache[normalized]
+        if datetime.now().timestamp() - cache_time < SEARCH_CACHE_DURATION:
+            return cached_data
+    return None
+
+def _run_search(query, normalized, max_results):
     text_data = ""
     sources = []
     
@@ -130,26 +140,52 @@ def GoogleSearch(query, max_results=5):
         print(f"Search error: {e}")
     
     if not sources:
-        sources = [
-            "https://www.un.org/en/climatechange",
-            "https://www.ipcc.ch",
-            "https://www.worldbank.org/en/topic/environment"
-        ]
+        sources = list(FALLBACK_SOURCES)
     
     result = (text_data.strip(), sources)
     
+    # Publish to the cache and retire the in-flight entry atomically
     with _search_cache_lock:
         _search_cache[normalized] = (datetime.now().timestamp(), result)
         if len(_search_cache) > 50:
             oldest_key = min(_search_cache.keys(), key=lambda k: _search_cache[k][0])
             del _search_cache[oldest_key]
+        _inflight_searches.pop(normalized, None)
     
     return result
 
+def PrefetchSearch(query, max_results=5) -> Future:
+    """
+    Start (or join) a search for query and return a Future of (text, sources).
+    Concurrent callers with the same normalized query share one DDGS request.
+    """
+    normalized = normalize_search_query(query)
+    
+    with _search_cache_lock:
+        cached = _get_cached_search(normalized)
+        if cached is not None:
+            print("💾 Using cached search results")
+            future = Future()
+            future.set_result(cached)
+            return future
+        
+        future = _inflight_searches.get(normalized)
+        if future is None:
+            future = _search_executor.submit(_run_search, query, normalized, max_results)
+            _inflight_searches[normalized] = future
+    
+    return future
+
+def GoogleSearch(query, max_results=5, timeout=None):
+    try:
+        return PrefetchSearch(query, max_results).result(timeout=timeout)
+    except FuturesTimeout:
+        print("⏱️ Search timed out")
+        return "", list(FALLBACK_SOURCES)
+
 # ===============================
 # QUERY CLASSIFICATION (CACHED)
 # ===============================
-@lru_cache(maxsize=256)
 # def is_environment_query(query):
 #     keywords = [
 #         "environment", "climate", "global warming", "pollution",
@@ -161,28 +197,16 @@ def GoogleSearch(query, max_results=5):
 #     return any(k in query.lower() for k in keywords)
 
 # ===============================
-# CHATLOG MANAGEMENT (OPTIMIZED)
+# CHATLOG MANAGEMENT (SHARED STORE)
 # ===============================
 def load_chatlog():
-    with chatlog_lock:
-        try:
-            with open(CHATLOG_PATH, 'r') as f:
-                messages = load(f)
-            if len(messages) > 15:
-                messages = messages[-15:]
-            return messages
-        except:
-            return []
+    return history.recent(HISTORY_WINDOW)
 
-def save_chatlog(messages):
-    with chatlog_lock:
-        try:
-            if len(messages) > 15:
-                messages = messages[-15:]
-            with open(CHATLOG_PATH, 'w') as f:
-                dump(messages, f, indent=2)
-        except Exception as e:
-            print(f"Error saving chatlog: {e}")
+def save_turn(prompt, answer):
+    history.append(
+        {"role": "user", "content": prompt},
+        {"role": "assistant", "content": answer}
+    )
 
 # ===============================
 # RESPONSE CLEANING
@@ -197,16 +221,12 @@ def clean_response(text: str) -> str:
 # ===============================
 def RealtimeSearchEngine(prompt, use_streaming=True):
     try:
+        # Joins a search already started by Main (PrefetchSearch) if there is one
+        PrefetchSearch(prompt, max_results=5)
         messages = load_chatlog()
         # env_query = is_environment_query(prompt)
         
-        search_thread = threading.Thread(
-            target=lambda: GoogleSearch(prompt, max_results=5)
-        )
-        search_thread.start()
-        search_thread.join(timeout=8)
-        
-        realtime_text, source_links = GoogleSearch(prompt, max_results=5)
+        realtime_text, source_links = GoogleSearch(prompt, max_results=5, timeout=SEARCH_TIMEOUT)
         
         system_msgs = [
             {"role": "system", "content": BASE_SYSTEM_PROMPT},
@@ -227,6 +247,8 @@ def RealtimeSearchEngine(prompt, use_streaming=True):
         # # max_tokens = 2048 if env_query else 512
         # # temperature = 0.5 if env_query else 0.3
         
+        if limits.acquire("groq", timeout=CHAT_MAX_WAIT) is None:
+            return BUSY_MESSAGE
         completion = client.chat.completions.create(
             model="llama-3.3-70b-versatile",
             messages=system_msgs + messages,
@@ -245,9 +267,7 @@ def RealtimeSearchEngine(prompt, use_streaming=True):
             answer = completion.choices[0].message.content
         
         answer = clean_response(answer)
-        
-        messages.append({"role": "assistant", "content": answer})
-        save_chatlog(messages)
+        save_turn(prompt, answer)
         
         return answer
     
@@ -256,12 +276,14 @@ def RealtimeSearchEngine(prompt, use_streaming=True):
         
         if "rate" in error_msg or "limit" in error_msg:
             print("⚠️ Rate limit, clearing history...")
-            save_chatlog([])
+            history.clear()
             try:
                 system_msgs = [
                     {"role": "system", "content": BASE_SYSTEM_PROMPT},
                     {"role": "system", "content": Information()}
                 ]
+                if limits.acquire("groq", timeout=CHAT_MAX_WAIT) is None:
+                    return BUSY_MESSAGE
                 completion = client.chat.completions.create(
                     model="llama-3.3-70b-versatile",
                     messages=system_msgs + [{"role": "user", "content": prompt}],
@@ -271,17 +293,71 @@ def RealtimeSearchEngine(prompt, use_streaming=True):
                 )
                 return clean_response(completion.choices[0].message.content)
             except:
-                return "I'm experiencing high load. Please try again in a moment."
+                return BUSY_MESSAGE
         
         elif "context" in error_msg or "token" in error_msg:
             print("⚠️ Context too long, clearing...")
-            save_chatlog([])
+            history.clear()
             return RealtimeSearchEngine(prompt, use_streaming=False)
         
         else:
             print(f"Fatal Error: {e}")
             return "I encountered an error processing your request. Please try rephrasing."
 
+# ===============================
+# STREAMING REALTIME SEARCH (SENTENCE BY SENTENCE)
+# ===============================
+def RealtimeSearchEngineStream(prompt):
+    """
+    Generator version of RealtimeSearchEngine: yields the answer one sentence
+    at a time while the model is still generating.
+    """
+    splitter = SentenceSplitter()
+    try:
+        PrefetchSearch(prompt, max_results=5)
+        messages = load_chatlog()
+        
+        realtime_text, source_links = GoogleSearch(prompt, max_results=5, timeout=SEARCH_TIMEOUT)
+        
+        system_msgs = [
+            {"role": "system", "content": BASE_SYSTEM_PROMPT},
+            {"role": "system", "content": Information()}
+        ]
+        
+        if realtime_text:
+            system_msgs.append({
+                "role": "system",
+                "content": f"Search Results:\n{realtime_text[:1500]}"
+            })
+        
+        messages.append({"role": "user", "content": prompt})
+        
+        if limits.acquire("groq", timeout=CHAT_MAX_WAIT) is None:
+            yield BUSY_MESSAGE
+            return
+        completion = client.chat.completions.create(
+            model="llama-3.3-70b-versatile",
+            messages=system_msgs + messages,
+            temperature=0.7,
+            max_tokens=8192,
+            stream=True,
+            top_p=0.9
+        )
+        
+        for sentence in iter_completion_sentences(completion, splitter):
+            yield sentence
+    
+    except Exception as e:
+        if not splitter.text:
+            yield RealtimeSearchEngine(prompt, use_streaming=False)
+            return
+        print(f"Stream Error: {e}")
+    
+    finally:
+        answer = clean_response(splitter.text)
+        if answer:
+            save_turn(prompt, answer)
+
 # ===============================
 # UTILITY FUNCTIONS
 # ===============================
@@ -294,7 +370,8 @@ def get_cache_stats():
     with _search_cache_lock:
         return {
             'search_cache_size': len(_search_cache),
-            'cached_queries': list(_search_cache.keys())
+            'cached_queries': list(_search_cache.keys()),
+            'inflight_searches': list(_inflight_searches.keys())
         }
 
 if __name__ == "__main__":
@@ -332,7 +409,7 @@ if __name__ == "__main__":
             break
         if q.lower() == 'clear':
             clear_search_cache()
-            save_chatlog([])
+            history.clear()
             continue
         if q:
             print(RealtimeSearchEngine(q))
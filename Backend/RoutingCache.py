@@ -0,0 +1,152 @@
+"""
+Persistent LRU cache for LLM routing answers.
+
+Model.py stores the Groq preprocessor's command split ("preprocess") and the
+Cohere classifier's tasks ("classify") here, keyed by the normalized query,
+so a command that was sent to an LLM once is answered locally afterwards.
+
+- real LRU: an OrderedDict moved to the end on every hit, oldest evicted
+- entries expire after a TTL; put(..., ttl=) sets a shorter one per entry,
+  e.g. for a "no answer" that should be retried soon
+- saved to Data/routing_cache.json (atomic replace), LRU order included
+- hit/miss counters per kind, kept across restarts
+
+    python -m Backend.RoutingCache          # show entries and hit rates
+    python -m Backend.RoutingCache --clear
+"""
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+CACHE_PATH = "Data/routing_cache.json"
+MAX_ENTRIES = 500
+CACHE_TTL = 30 * 24 * 3600
+NEGATIVE_TTL = 10 * 60   # for cached "no answer" results
+
+
+class RoutingCache:
+    def __init__(self, path=CACHE_PATH, max_entries=MAX_ENTRIES, ttl=CACHE_TTL):
+        self.path = Path(path) if path else None
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()   # "kind:query" -> (value, stored_at, ttl)
+        self._counters = {}             # kind -> {"hits": n, "misses": n}
+        self._lock = threading.Lock()
+        self._unsaved = False           # counters changed since the last save
+        self._load()
+        # Entries are saved on every put; lookups only bump counters, saved at exit
+        atexit.register(self._save_counters)
+
+    # ===============================
+    # PERSISTENCE
+    # ===============================
+    def _load(self):
+        if not self.path or not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            now = time.time()
+            # Stored oldest first, so the OrderedDict comes back in LRU order
+            for key, value, stored_at, *ttl in data.get("entries", []):
+                ttl = ttl[0] if ttl else self.ttl
+                if now - stored_at <= ttl:
+                    self._entries[key] = (value, stored_at, ttl)
+            self._counters = data.get("counters", {})
+        except (OSError, ValueError, TypeError) as e:
+            print(f"⚠️ Routing cache unreadable, starting empty: {e}")
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            data = {
+                "entries": [[key, *entry] for key, entry in self._entries.items()],
+                "counters": self._counters,
+            }
+            snapshot = json.dumps(data, ensure_ascii=False)
+            self._unsaved = False
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            tmp_path.write_text(snapshot, encoding="utf-8")
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ Could not save routing cache: {e}")
+
+    def _save_counters(self):
+        if self._unsaved:
+            self.save()
+
+    # ===============================
+    # PUBLIC API
+    # ===============================
+    def _count(self, kind, field):
+        counter = self._counters.setdefault(kind, {"hits": 0, "misses": 0})
+        counter[field] += 1
+        self._unsaved = True
+
+    def get(self, kind, query):
+        """Return (found, value); value may itself be None for a cached 'no answer'"""
+        key = f"{kind}:{query}"
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[1] > entry[2]:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self._count(kind, "misses")
+                return False, None
+            self._entries.move_to_end(key)
+            self._count(kind, "hits")
+            return True, entry[0]
+
+    def put(self, kind, query, value, ttl=None):
+        key = f"{kind}:{query}"
+        with self._lock:
+            self._entries[key] = (value, time.time(), ttl or self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        self.save()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._counters = {}
+        self.save()
+
+    def stats(self):
+        """{kind: {"hits", "misses", "hit_rate"}} plus the entry count"""
+        with self._lock:
+            result = {"entries": len(self._entries)}
+            for kind, counter in self._counters.items():
+                total = counter["hits"] + counter["misses"]
+                result[kind] = dict(counter, hit_rate=round(counter["hits"] / total, 3) if total else 0.0)
+            return result
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Process-wide cache shared by the preprocessor and the classifier
+routing_cache = RoutingCache()
+
+
+if __name__ == "__main__":
+    if "--clear" in sys.argv:
+        routing_cache.clear()
+        print("🧹 Routing cache cleared")
+        sys.exit(0)
+
+    print(json.dumps(routing_cache.stats(), indent=2))
+    with routing_cache._lock:
+        entries = list(routing_cache._entries.items())
+    for key, (value, stored_at, _) in reversed(entries[-20:]):
+        age = (time.time() - stored_at) / 3600
+        print(f"  {key!r:60} -> {value} ({age:.1f}h old)")
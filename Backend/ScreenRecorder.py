@@ -0,0 +1,388 @@
+"""
+Streaming building blocks for screen recording.
+
+- stream_audio_to_wav: writes PCM chunks to the WAV as they arrive, at the
+  device's real sample rate (memory stays constant however long it runs)
+- ScreenGrabber: on Windows, BitBlt straight into a preallocated DIB section
+  (no per-frame screenshot object) and convert into one reused BGR buffer;
+  elsewhere pyautogui screenshots converted into that same buffer
+- pace_frames: fixed-rate frame loop; when a capture runs late the missed
+  slots are filled with the latest frame and counted as dropped, so the
+  video keeps real-time length and stays in sync with the audio
+
+Frame and audio sources are plain callables, so the loops can be driven by
+synthetic data as well as by the screen and PyAudio.
+
+FfmpegRecorder / record_with_ffmpeg are the single-pass mode: one ffmpeg
+process gets raw BGR frames on stdin and PCM over a localhost TCP socket and
+encodes the final file in real time, so there is no temp file and no merge.
+Self-test with synthetic frames and a sine wave (needs ffmpeg on PATH):
+    python -m Backend.ScreenRecorder selftest out.mp4 --seconds 3
+"""
+import math
+import socket
+import subprocess
+import sys
+import threading
+import time
+import wave
+
+DEFAULT_FPS = 20
+AUDIO_CHUNK = 1024
+
+
+def stream_audio_to_wav(read_chunk, path, rate, channels=2, sample_width=2, should_stop=lambda: False):
+    """Append read_chunk() output to a WAV until should_stop(); returns audio frames written"""
+    frame_bytes = channels * sample_width
+    written = 0
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(sample_width)
+        wf.setframerate(int(rate))
+        while not should_stop():
+            data = read_chunk()
+            if not data:
+                continue
+            wf.writeframes(data)
+            written += len(data) // frame_bytes
+    return written
+
+
+class _GdiCapture:
+    """
+    Windows desktop capture into memory allocated once: BitBlt writes into a
+    DIB section whose pixel memory is viewed as a numpy BGRA array.
+    """
+    SRCCOPY = 0x00CC0020
+    CAPTUREBLT = 0x40000000
+
+    def __init__(self, np):
+        import ctypes
+        from ctypes import wintypes
+
+        class BITMAPINFOHEADER(ctypes.Structure):
+            _fields_ = [
+                ("biSize", wintypes.DWORD), ("biWidth", wintypes.LONG), ("biHeight", wintypes.LONG),
+                ("biPlanes", wintypes.WORD), ("biBitCount", wintypes.WORD), ("biCompression", wintypes.DWORD),
+                ("biSizeImage", wintypes.DWORD), ("biXPelsPerMeter", wintypes.LONG),
+                ("biYPelsPerMeter", wintypes.LONG), ("biClrUsed", wintypes.DWORD),
+                ("biClrImportant", wintypes.DWORD),
+            ]
+
+        user32, gdi32 = ctypes.windll.user32, ctypes.windll.gdi32
+        handle = ctypes.c_void_p
+        # Handles are pointer-sized; the default c_int restype would truncate them on 64-bit
+        user32.GetDC.restype = handle
+        user32.GetDC.argtypes = [handle]
+        user32.ReleaseDC.argtypes = [handle, handle]
+        gdi32.CreateCompatibleDC.restype = handle
+        gdi32.CreateCompatibleDC.argtypes = [handle]
+        gdi32.CreateDIBSection.restype = handle
+        gdi32.CreateDIBSection.argtypes = [handle, ctypes.c_void_p, wintypes.UINT,
+                                           ctypes.POINTER(ctypes.c_void_p), handle, wintypes.DWORD]
+        gdi32.SelectObject.restype = handle
+        gdi32.SelectObject.argtypes = [handle, handle]
+        gdi32.BitBlt.argtypes = [handle, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                                 handle, ctypes.c_int, ctypes.c_int, wintypes.DWORD]
+        gdi32.DeleteObject.argtypes = [handle]
+        gdi32.DeleteDC.argtypes = [handle]
+        self._user32, self._gdi32 = user32, gdi32
+
+        # Primary monitor, like pyautogui.screenshot()
+        self.width = user32.GetSystemMetrics(0)
+        self.height = user32.GetSystemMetrics(1)
+
+        header = BITMAPINFOHEADER()
+        header.biSize = ctypes.sizeof(BITMAPINFOHEADER)
+        header.biWidth = self.width
+        header.biHeight = -self.height      # negative: top-down rows
+        header.biPlanes = 1
+        header.biBitCount = 32
+        header.biCompression = 0            # BI_RGB
+
+        bits = ctypes.c_void_p()
+        self._screen_dc = user32.GetDC(None)
+        self._mem_dc = gdi32.CreateCompatibleDC(self._screen_dc)
+        self._bitmap = gdi32.CreateDIBSection(self._screen_dc, ctypes.byref(header), 0, ctypes.byref(bits), None, 0)
+        if not self._bitmap or not bits.value:
+            self.close()
+            raise OSError("CreateDIBSection failed")
+        self._previous = gdi32.SelectObject(self._mem_dc, self._bitmap)
+
+        size = self.width * self.height * 4
+        raw = (ctypes.c_uint8 * size).from_address(bits.value)
+        self.pixels = np.ctypeslib.as_array(raw).reshape(self.height, self.width, 4)
+
+    def grab(self):
+        if not self._gdi32.BitBlt(self._mem_dc, 0, 0, self.width, self.height,
+                                  self._screen_dc, 0, 0, self.SRCCOPY | self.CAPTUREBLT):
+            raise OSError("BitBlt failed")
+        return self.pixels
+
+    def close(self):
+        if getattr(self, "_mem_dc", None):
+            if getattr(self, "_previous", None):
+                self._gdi32.SelectObject(self._mem_dc, self._previous)
+            self._gdi32.DeleteDC(self._mem_dc)
+            self._mem_dc = None
+        if getattr(self, "_bitmap", None):
+            self._gdi32.DeleteObject(self._bitmap)
+            self._bitmap = None
+        if getattr(self, "_screen_dc", None):
+            self._user32.ReleaseDC(None, self._screen_dc)
+            self._screen_dc = None
+
+
+class ScreenGrabber:
+    """Screen frames as BGR in a single preallocated buffer (GDI on Windows, pyautogui elsewhere)"""
+    def __init__(self):
+        import cv2
+        import numpy as np
+
+        self._cv2 = cv2
+        self._np = np
+        self._gdi = None
+        if sys.platform == "win32":
+            try:
+                self._gdi = _GdiCapture(np)
+            except Exception as e:
+                print(f"⚠️ GDI capture unavailable, using screenshots: {e}")
+
+        if self._gdi is not None:
+            self.height, self.width = self._gdi.height, self._gdi.width
+        else:
+            import pyautogui
+            self._screenshot = pyautogui.screenshot
+            # Size from a real capture (pyautogui.size() can differ under DPI scaling)
+            first = np.asarray(self._screenshot())
+            self.height, self.width = first.shape[:2]
+        self.size = (self.width, self.height)
+        self.buffer = np.empty((self.height, self.width, 3), dtype=np.uint8)
+
+    def grab(self):
+        if self._gdi is not None:
+            # BGRA DIB memory -> reused BGR buffer: no allocation per frame
+            self._cv2.cvtColor(self._gdi.grab(), self._cv2.COLOR_BGRA2BGR, dst=self.buffer)
+            return self.buffer
+        rgb = self._np.asarray(self._screenshot())
+        if rgb.shape[:2] != (self.height, self.width):
+            # Resolution changed mid-recording: scale into the existing buffer
+            rgb = self._cv2.resize(rgb, self.size)
+        self._cv2.cvtColor(rgb, self._cv2.COLOR_RGB2BGR, dst=self.buffer)
+        return self.buffer
+
+    def close(self):
+        if self._gdi is not None:
+            self._gdi.close()
+            self._gdi = None
+
+
+def pace_frames(grab, write, should_stop, fps=DEFAULT_FPS, clock=time.perf_counter, sleep=time.sleep):
+    """
+    Call write() once per 1/fps slot until should_stop().
+
+    Returns {"captured", "written", "dropped", "seconds", "fps"}; dropped counts
+    slots that were filled by repeating a frame because capture fell behind.
+    """
+    interval = 1.0 / fps
+    start = clock()
+    slot = 0
+    captured = dropped = 0
+
+    while not should_stop():
+        now = clock()
+        due = int((now - start) / interval) + 1
+        if slot >= due:
+            sleep(max(0.0, start + slot * interval - now))
+            continue
+
+        frame = grab()
+        captured += 1
+        due = int((clock() - start) / interval) + 1
+        repeats = max(1, due - slot)
+        for _ in range(repeats):
+            write(frame)
+        dropped += repeats - 1
+        slot += repeats
+
+    seconds = clock() - start
+    return {
+        "captured": captured,
+        "written": slot,
+        "dropped": dropped,
+        "seconds": round(seconds, 2),
+        "fps": round(captured / seconds, 1) if seconds > 0 else 0.0,
+    }
+
+
+# ===============================
+# SINGLE-PASS FFMPEG MODE
+# ===============================
+class FfmpegRecorder:
+    def __init__(self, output, size, fps=DEFAULT_FPS, audio_rate=44100, audio_channels=2, ffmpeg="ffmpeg"):
+        self.output = str(output)
+        self.size = size
+        self.fps = fps
+        self.audio_rate = int(audio_rate)
+        self.audio_channels = audio_channels
+        self.ffmpeg = ffmpeg
+        self.process = None
+        self.audio_socket = None
+        self.port = None
+
+    def _free_port(self):
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.bind(("127.0.0.1", 0))
+            return s.getsockname()[1]
+
+    def command(self):
+        width, height = self.size
+        return [
+            self.ffmpeg, "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{width}x{height}",
+            "-framerate", str(self.fps), "-i", "pipe:0",
+            "-f", "s16le", "-ar", str(self.audio_rate), "-ac", str(self.audio_channels),
+            "-i", f"tcp://127.0.0.1:{self.port}?listen=1",
+            "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p",
+            "-c:a", "aac", "-b:a", "160k",
+            self.output,
+        ]
+
+    def start(self):
+        self.port = self._free_port()
+        self.process = subprocess.Popen(
+            self.command(), stdin=subprocess.PIPE,
+            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0)
+        )
+
+    def connect_audio(self, timeout=10.0):
+        """ffmpeg opens the audio socket after the video input; retry until it listens"""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                self.audio_socket = socket.create_connection(("127.0.0.1", self.port), timeout=2)
+                return
+            except OSError:
+                if time.monotonic() > deadline or self.process.poll() is not None:
+                    raise
+                time.sleep(0.05)
+
+    def write_video(self, frame):
+        # memoryview avoids copying the reused numpy buffer
+        self.process.stdin.write(memoryview(frame))
+
+    def write_audio(self, data):
+        self.audio_socket.sendall(data)
+
+    def finish(self, timeout=30):
+        """Close both inputs and wait for ffmpeg to write the trailer; returns its exit code"""
+        if self.audio_socket is not None:
+            try:
+                self.audio_socket.shutdown(socket.SHUT_WR)
+            except OSError:
+                pass
+            self.audio_socket.close()
+            self.audio_socket = None
+        if self.process is None:
+            return None
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        try:
+            return self.process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            return self.process.wait()
+
+
+def record_with_ffmpeg(grab, size, read_audio, audio_rate, audio_channels, should_stop,
+                       output, fps=DEFAULT_FPS, ffmpeg="ffmpeg"):
+    """Run the paced video loop and an audio thread into one ffmpeg process; returns pace_frames stats"""
+    recorder = FfmpegRecorder(output, size, fps, audio_rate, audio_channels, ffmpeg)
+    recorder.start()
+    stopped = threading.Event()
+    audio_error = []
+
+    def audio_loop():
+        try:
+            recorder.connect_audio()
+            while not stopped.is_set():
+                data = read_audio()
+                if data:
+                    recorder.write_audio(data)
+        except Exception as e:
+            # Socket errors, but also PortAudio/ValueError from read_audio: any of
+            # them would leave ffmpeg waiting for the audio input forever, so stop
+            # it and let the video side fail fast
+            audio_error.append(e)
+            if recorder.process.poll() is None:
+                recorder.process.kill()
+
+    audio_thread = threading.Thread(target=audio_loop, daemon=True)
+    audio_thread.start()
+    try:
+        stats = pace_frames(grab, recorder.write_video, should_stop, fps=fps)
+    finally:
+        stopped.set()
+        audio_thread.join(timeout=5)
+        exit_code = recorder.finish()
+    if audio_error:
+        print(f"⚠️ Audio input to ffmpeg failed: {audio_error[0]}")
+    if exit_code:
+        raise RuntimeError(f"ffmpeg exited with code {exit_code}")
+    return stats
+
+
+def sine_source(rate=44100, channels=2, frequency=440.0, chunk=AUDIO_CHUNK):
+    """Real-time paced 16-bit sine wave as a read_audio() callable (for tests)"""
+    state = {"n": 0, "next": time.perf_counter()}
+    step = 2 * math.pi * frequency / rate
+
+    def read():
+        state["next"] += chunk / rate
+        delay = state["next"] - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        start = state["n"]
+        state["n"] += chunk
+        samples = bytearray()
+        for i in range(start, start + chunk):
+            value = int(12000 * math.sin(step * i)).to_bytes(2, "little", signed=True)
+            samples += value * channels
+        return bytes(samples)
+
+    return read
+
+
+def synthetic_frames(width=640, height=360):
+    """Moving colour bars as a grab() callable (for tests)"""
+    import numpy as np
+
+    base = (np.arange(width, dtype=np.uint16)[None, :, None] * np.array([1, 2, 3], dtype=np.uint16)) % 256
+    buffer = np.empty((height, width, 3), dtype=np.uint8)
+    state = {"n": 0}
+
+    def grab():
+        state["n"] += 1
+        buffer[:] = ((base + state["n"] * 4) % 256).astype(np.uint8)
+        return buffer
+
+    return grab
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] != "selftest":
+        print("Usage: python -m Backend.ScreenRecorder selftest out.mp4 [--seconds N]")
+        sys.exit(1)
+    output = sys.argv[2]
+    seconds = float(sys.argv[sys.argv.index("--seconds") + 1]) if "--seconds" in sys.argv else 3.0
+
+    began = time.perf_counter()
+    stats = record_with_ffmpeg(
+        synthetic_frames(), (640, 360), sine_source(), 44100, 2,
+        should_stop=lambda: time.perf_counter() - began > seconds, output=output
+    )
+    finished = time.perf_counter() - began - stats["seconds"]
+    print(f"Recorded {stats} -> {output}")
+    print(f"File ready {finished:.2f}s after stop")
@@ -0,0 +1,63 @@
+"""
+Sentence segmentation for streamed LLM output.
+
+Chatbot and RealtimeSearchEngine feed token deltas in and get complete
+sentences out, so TextToSpeech can start speaking while the model is
+still generating.
+"""
+import re
+
+# Sentence end: terminal punctuation (incl. Hindi danda) followed by whitespace, or a blank line
+SENTENCE_END = re.compile(r'(?<=[.!?।])\s+|\n\s*\n')
+
+
+class SentenceSplitter:
+    def __init__(self, min_chars=20):
+        self.min_chars = min_chars
+        self.text = ""
+        self._pending = ""
+
+    def feed(self, delta: str) -> list:
+        """Add a delta and return the sentences completed by it (raw, whitespace kept)"""
+        if not delta:
+            return []
+
+        self.text += delta
+        self._pending += delta
+
+        sentences = []
+        start = 0
+        for match in SENTENCE_END.finditer(self._pending):
+            end = match.end()
+            # Short fragments ("Hi!", "1.") are merged into the next sentence
+            if len(self._pending[start:end].strip()) < self.min_chars:
+                continue
+            sentences.append(self._pending[start:end])
+            start = end
+
+        self._pending = self._pending[start:]
+        return sentences
+
+    def flush(self) -> list:
+        """Return whatever is left once the stream has ended"""
+        rest, self._pending = self._pending, ""
+        return [rest] if rest.strip() else []
+
+
+def iter_completion_sentences(completion, splitter=None):
+    """Yield sentences from a streamed chat completion (Groq/OpenAI chunk format)"""
+    splitter = splitter or SentenceSplitter()
+    try:
+        for chunk in completion:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            for sentence in splitter.feed(delta):
+                yield sentence
+        for sentence in splitter.flush():
+            yield sentence
+    finally:
+        close = getattr(completion, "close", None)
+        if close:
+            try:
+                close()
+            except Exception:
+                pass
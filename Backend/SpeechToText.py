@@ -2,17 +2,25 @@ import speech_recognition as sr
 import mtranslate as mt
 from dotenv import dotenv_values
 import time
+import re
 import sys
 import os
 import threading
 import queue
 from difflib import SequenceMatcher
+from functools import lru_cache
 import numpy as np
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from Frontend.GUI import SetAssistantStatus
-from Backend.TextToSpeech import StopTTS
+from Backend.LazyImport import lazy_callable
+from Backend.WakeWord import get_detector as get_wake_word_detector
+from Backend.FuzzyIndex import FuzzyIndex
+from Backend.AudioCapture import AudioCapture
+
+# TextToSpeech pulls in pygame; only load it once something needs to be stopped
+StopTTS = lazy_callable("Backend.TextToSpeech", "StopTTS")
 
 # Load env
 env = dotenv_values(".env")
@@ -32,15 +40,22 @@ recognizer.pause_threshold = 1.2  # INCREASED: Wait longer before considering sp
 recognizer.phrase_threshold = 0.3  # Quick phrase detection
 recognizer.non_speaking_duration = 1.0  # INCREASED: Wait longer for continuation
 
+# One microphone stream for hotword, command and interrupt listening.
+# The capture thread keeps recognizer.energy_threshold tracking the noise floor
+# (it takes over dynamic_energy_threshold, so listen() no longer adapts it).
+capture = AudioCapture(recognizer, sample_rate=16000)
+
+# Set when the hotword is heard: where its audio ended in the capture stream,
+# and any command spoken in the same breath ("ok sara open chrome")
+hotword_mark = None
+pending_command = None
+
 def calibrate_microphone():
-    """Advanced microphone calibration with multi-pass noise profiling"""
+    """Open the shared capture stream; the noise floor then adapts in the background"""
     try:
-        with sr.Microphone(sample_rate=16000) as source:
-            print("🎚️ Calibrating microphone (this may take a moment)...")
-            # Extended calibration for better noise baseline
-            recognizer.adjust_for_ambient_noise(source, duration=2.0)
-            print(f"🎚️ Microphone calibrated (threshold: {recognizer.energy_threshold:.0f})")
-            print(f"🎚️ Sample rate: {source.SAMPLE_RATE} Hz")
+        capture.start()
+        print(f"🎚️ Microphone ready (threshold: {recognizer.energy_threshold:.0f}, adapting continuously)")
+        print(f"🎚️ Sample rate: {capture.sample_rate} Hz")
     except Exception as e:
         print(f"⚠️ Calibration error: {e}")
         print("Continuing with default settings...")
@@ -137,6 +152,13 @@ WORD_CORRECTIONS = {
     "watsapp": "whatsapp", "watts": "whatsapp",
 }
 
+# Compiled once at import; same results as scanning WORD_CORRECTIONS with SequenceMatcher
+WORD_INDEX = FuzzyIndex(WORD_CORRECTIONS, threshold=0.80)
+
+@lru_cache(maxsize=4096)
+def _fuzzy_word(word):
+    return WORD_INDEX.best_match(word)
+
 def fuzzy_correct(text):
     """Enhanced fuzzy matching with multi-level correction"""
     if not text:
@@ -159,18 +181,8 @@ def fuzzy_correct(text):
         elif word in COMMON_CORRECTIONS:
             corrected_words.append(COMMON_CORRECTIONS[word])
         else:
-            # Level 3: Fuzzy match against known corrections
-            best_match = word
-            best_ratio = 0.80  # Higher threshold for better accuracy
-            
-            # Check word corrections first
-            for wrong, correct in WORD_CORRECTIONS.items():
-                ratio = SequenceMatcher(None, word, wrong).ratio()
-                if ratio > best_ratio:
-                    best_ratio = ratio
-                    best_match = correct
-            
-            corrected_words.append(best_match)
+            # Level 3: Fuzzy match against known corrections (indexed + cached)
+            corrected_words.append(_fuzzy_word(word) or word)
     
     # Level 4: Check if corrected phrase exists in phrase corrections
     corrected_text = ' '.join(corrected_words)
@@ -266,9 +278,8 @@ def start_interrupt_detection():
             print(f"⚠️ Interrupt detection error: {e}")
     
     try:
-        mic = sr.Microphone(sample_rate=16000)
         interrupt_listener = recognizer.listen_in_background(
-            mic,
+            capture.source(),
             interrupt_callback,
             phrase_time_limit=5
         )
@@ -363,26 +374,43 @@ def UniversalTranslator(text):
 # ==========================================
 # MULTI-ATTEMPT SPEECH RECOGNITION
 # ==========================================
-def SpeechRecognition(timeout=5, phrase_limit=10, retry_count=2):
+def discard_preroll():
+    """Forget the hotword context (e.g. after speaking a greeting over it)"""
+    global hotword_mark
+    hotword_mark = None
+
+def has_pending_command():
+    return pending_command is not None
+
+def SpeechRecognition(timeout=5, phrase_limit=10, retry_count=2, use_preroll=False):
     """
     Enhanced speech recognition with:
+    - Command spoken together with the hotword returned immediately
+    - Pre-roll: with use_preroll, audio captured since the hotword is prepended
     - Audio preprocessing
     - Multiple recognition attempts
     - Better error handling
     - Adaptive timeout
     - INCREASED phrase_limit to capture complete sentences
     """
+    global hotword_mark, pending_command
+    
+    if pending_command:
+        result, pending_command = pending_command, None
+        hotword_mark = None
+        print(f"✅ Command from hotword phrase: '{result}'")
+        return result
+    
     SetAssistantStatus("🎤 Listening...")
     
+    preroll_since = hotword_mark if use_preroll else None
+    hotword_mark = None
+    
     for attempt in range(retry_count):
         try:
-            with sr.Microphone(sample_rate=16000) as source:
+            with capture.source(preroll_since if attempt == 0 else None) as source:
                 StopTTS()
                 
-                # Quick ambient adjustment on first attempt
-                if attempt == 0:
-                    recognizer.adjust_for_ambient_noise(source, duration=0.4)
-                
                 try:
                     # Listen with extended timeout on retries
                     # INCREASED phrase_limit to capture longer, complete sentences
@@ -475,23 +503,116 @@ def SpeechRecognition(timeout=5, phrase_limit=10, retry_count=2):
 # ==========================================
 # ENHANCED HOTWORD DETECTION
 # ==========================================
-def HotwordDetection():
+def _matches_hotword(text):
+    """Direct or fuzzy match of recognized text against HOTWORDS"""
+    # Direct match
+    if any(hotword in text for hotword in HOTWORDS):
+        print(f"✅ Hotword detected: '{text}'")
+        return True
+    
+    # Fuzzy match for variations
+    for hotword in HOTWORDS:
+        ratio = SequenceMatcher(None, text, hotword).ratio()
+        if ratio > 0.72:  # Threshold for fuzzy matching
+            print(f"✅ Fuzzy matched '{text}' to '{hotword}' (similarity: {ratio:.2f})")
+            return True
+    
+    return False
+
+# Only a hotword at the very start splits off a command. A bare "ok" is too
+# common inside commands to split on ("... ok play music").
+HOTWORD_PREFIX_RE = re.compile(
+    r"^\W*(?:" + "|".join(re.escape(h) for h in sorted(HOTWORDS, key=len, reverse=True) if h != "ok") + r")\b",
+    re.IGNORECASE,
+)
+
+def _command_after_hotword(text):
+    """Text following a leading hotword in the same utterance, or '' if there is none"""
+    match = HOTWORD_PREFIX_RE.match(text)
+    return text[match.end():].strip(" ,.!?") if match else ""
+
+def _activate(text="", mark=None):
+    global hotword_mark, pending_command
+    hotword_mark = mark
+    command = _command_after_hotword(text)
+    if command:
+        corrected = fuzzy_correct(command)
+        if not INPUT_LANG.lower().startswith("en"):
+            corrected = UniversalTranslator(corrected)
+        pending_command = QueryModifier(corrected) or None
+    
+    SetAssistantStatus("🎤 Activated! Listening...")
+    from Frontend.GUI import SetMicrophoneStatus
+    SetMicrophoneStatus('True')
+    return True
+
+def _local_hotword_detection(detector, wake=None):
+    """
+    Offline keyword spotting on raw frames; only segments that match the
+    enrolled templates are sent to Google to confirm the hotword.
+    """
+    candidate_count = 0
+    
+    with capture.source() as source:
+        detector.reset()
+        
+        while True:
+            if wake is not None and wake():
+                return False
+            try:
+                frame = source.stream.read(source.CHUNK)
+                candidate = detector.process(frame)
+                if candidate is None:
+                    continue
+                mark = source.mark()
+                
+                candidate_count += 1
+                print(f"🎯 Wake word candidate #{candidate_count} (distance {detector.last_distance:.2f})")
+                
+                audio = sr.AudioData(candidate, source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+                text = recognizer.recognize_google(
+                    preprocess_audio(audio),
+                    language=INPUT_LANG
+                ).lower().strip()
+                
+                if _matches_hotword(text):
+                    return _activate(text, mark)
+            
+            except sr.UnknownValueError:
+                pass
+            
+            except sr.RequestError as e:
+                print(f"❌ Hotword confirmation service error: {e}")
+                time.sleep(1)
+            
+            except Exception as e:
+                print(f"❌ Hotword detection error: {e}")
+                time.sleep(0.2)
+
+def HotwordDetection(wake=None):
     """
     Enhanced hotword detection with:
+    - Offline wake-word spotting when templates are enrolled
+      (python -m Backend.WakeWord enroll)
     - Better noise adaptation
     - Fuzzy matching for variations
     - More reliable detection
+    
+    wake: optional callable; when it returns True the wait ends early and
+    False is returned (e.g. to announce a finished background job)
     """
     SetAssistantStatus("👂 Waiting for 'Ok Sara...'")
     
+    detector = get_wake_word_detector()
+    if detector is not None:
+        return _local_hotword_detection(detector, wake)
+    
     detection_count = 0
     
-    with sr.Microphone(sample_rate=16000) as source:
-        # Initial calibration
-        print("🎚️ Calibrating for hotword detection...")
-        recognizer.adjust_for_ambient_noise(source, duration=0.5)
-        
+    with capture.source() as source:
         while True:
+            if wake is not None and wake():
+                return False
             try:
                 # Listen for hotword
                 audio = recognizer.listen(
@@ -499,6 +620,7 @@ def HotwordDetection():
                     timeout=2.0,
                     phrase_time_limit=4  # INCREASED: Allow longer activation phrases
                 )
+                mark = source.mark()
                 
                 # Preprocess audio
                 processed_audio = preprocess_audio(audio)
@@ -512,23 +634,8 @@ def HotwordDetection():
                 detection_count += 1
                 print(f"🔍 Hotword check #{detection_count}: '{text}'")
                 
-                # Direct match
-                if any(hotword in text for hotword in HOTWORDS):
-                    print(f"✅ Hotword detected: '{text}'")
-                    SetAssistantStatus("🎤 Activated! Listening...")
-                    from Frontend.GUI import SetMicrophoneStatus
-                    SetMicrophoneStatus('True')
-                    return True
-                
-                # Fuzzy match for variations
-                for hotword in HOTWORDS:
-                    ratio = SequenceMatcher(None, text, hotword).ratio()
-                    if ratio > 0.72:  # Threshold for fuzzy matching
-                        print(f"✅ Fuzzy matched '{text}' to '{hotword}' (similarity: {ratio:.2f})")
-                        SetAssistantStatus("🎤 Activated! Listening...")
-                        from Frontend.GUI import SetMicrophoneStatus
-                        SetMicrophoneStatus('True')
-                        return True
+                if _matches_hotword(text):
+                    return _activate(text, mark)
             
             except sr.WaitTimeoutError:
                 # Normal - just listening
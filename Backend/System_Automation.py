@@ -7,20 +7,13 @@ import json
 from pathlib import Path
 from datetime import datetime
 import socket
-
-import cv2
-import numpy as np
-import pyautogui
-import pyaudio
-import wave
 import threading
-import keyboard
-from datetime import datetime
-import pyaudiowpatch
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 import psutil
 import requests
-import pyautogui
+from requests.adapters import HTTPAdapter
 
 # ===== AUDIO =====
 from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
@@ -31,17 +24,152 @@ from ctypes import POINTER, cast
 import win32gui
 import win32con
 
-# ===== POWERPOINT =====
-from pptx import Presentation
-from pptx.util import Inches, Pt
 import random
-from pptx.dml.color import RGBColor
-from pptx.enum.text import PP_ALIGN
+
+# ===== HEAVY, PER-COMMAND =====
+# cv2, numpy, pptx, pyautogui, keyboard and pyaudiowpatch are imported inside
+# the methods that use them so the rest of automation loads quickly.
 
 # ===== GROQ =====
 from dotenv import dotenv_values
 from groq import Groq
 
+from Backend.AppIndex import default_start_menu_dirs, get_app_index, launch as launch_app
+from Backend.ProcessTable import processes
+from Backend.RateLimiter import limits, CHAT_MAX_WAIT
+from Backend.ScreenRecorder import (
+    stream_audio_to_wav, ScreenGrabber, pace_frames, record_with_ffmpeg, DEFAULT_FPS, AUDIO_CHUNK
+)
+
+# ===== SHARED CLIENTS =====
+_env = None
+_automation = None
+_automation_lock = threading.Lock()
+
+
+def get_env():
+    """.env contents, read once per process"""
+    global _env
+    if _env is None:
+        _env = dotenv_values(".env")
+    return _env
+
+
+def make_http_session():
+    """Keep-alive session with a connection pool large enough for parallel probes"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
+    return session
+
+
+def get_automation():
+    """Process-wide SystemAutomation, created on first use"""
+    global _automation
+    if _automation is None:
+        with _automation_lock:
+            if _automation is None:
+                _automation = SystemAutomation()
+    return _automation
+
+
+def warm_up():
+    """Build the shared instance and open TLS connections in the background"""
+    def _warm():
+        try:
+            automation = get_automation()
+            get_app_index()
+            automation.http.head("https://www.google.com", timeout=3)
+            if automation.groq:
+                automation.groq.models.list()
+            print("🔥 Automation clients warmed up")
+        except Exception as e:
+            print(f"⚠️ Warm-up skipped: {e}")
+
+    thread = threading.Thread(target=_warm, daemon=True)
+    thread.start()
+    return thread
+
+
+# ===== WEBSITE LOOKUP CACHE =====
+WEBSITE_CACHE_PATH = Path("Data/website_cache.json")
+WEBSITE_HIT_TTL = 7 * 24 * 3600    # a site that answered
+WEBSITE_MISS_TTL = 24 * 3600       # nothing answered - retry after a day
+WEBSITE_PROBE_TIMEOUT = 3
+WEBSITE_PREFIXES = ["https://", "https://www."]
+WEBSITE_DOMAINS = ["com", "org", "net", "io"]
+WEBSITE_PICK_WINDOW = 0.3          # after the first hit, wait this long for higher-priority candidates
+PROBE_FAILED = object()            # no answer that says anything about the site (offline, timeout)
+NO_SUCH_HOST = object()            # DNS answered that the name does not exist
+DNS_CHECK_HOST = "www.google.com"  # resolved before trusting NO_SUCH_HOST answers
+
+
+def _is_unknown_host(error):
+    """True when a requests error comes from DNS saying the name does not exist (not from being offline)"""
+    seen = set()
+    stack = [error]
+    while stack:
+        e = stack.pop()
+        if e is None or id(e) in seen:
+            continue
+        seen.add(id(e))
+        if isinstance(e, socket.gaierror):
+            return e.errno != getattr(socket, "EAI_AGAIN", None)
+        stack.extend([e.__cause__, e.__context__, getattr(e, "reason", None)])
+        stack.extend(arg for arg in e.args if isinstance(arg, BaseException))
+    return False
+
+
+def _dns_reachable():
+    try:
+        socket.getaddrinfo(DNS_CHECK_HOST, 443)
+        return True
+    except OSError:
+        return False
+
+
+class WebsiteCache:
+    """name -> resolved URL (or None for a miss), persisted as JSON with per-entry timestamps"""
+    def __init__(self, path=WEBSITE_CACHE_PATH, hit_ttl=WEBSITE_HIT_TTL, miss_ttl=WEBSITE_MISS_TTL):
+        self.path = Path(path)
+        self.hit_ttl = hit_ttl
+        self.miss_ttl = miss_ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                self._entries = data
+        except (OSError, ValueError):
+            pass
+
+    def get(self, name):
+        """Returns (found, url); found is False when there is no fresh entry"""
+        with self._lock:
+            entry = self._entries.get(name)
+        if not entry:
+            return False, None
+        ttl = self.hit_ttl if entry.get("url") else self.miss_ttl
+        if time.time() - entry.get("time", 0) > ttl:
+            return False, None
+        return True, entry.get("url")
+
+    def put(self, name, url):
+        with self._lock:
+            self._entries[name] = {"url": url, "time": time.time()}
+            entries = dict(self._entries)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entries, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ Could not save website cache: {e}")
+
 
 class SystemAutomation:
     def __init__(self):
@@ -51,8 +179,11 @@ class SystemAutomation:
         self.data_folder.mkdir(exist_ok=True)
         self.recording = False
 
-        env = dotenv_values(".env")
+        env = get_env()
         self.groq = Groq(api_key=env.get("GroqAPIKey")) if env.get("GroqAPIKey") else None
+        self.http = make_http_session()
+        self.website_cache = WebsiteCache()
+        self._probe_pool = ThreadPoolExecutor(max_workers=len(WEBSITE_PREFIXES) * len(WEBSITE_DOMAINS))
 
     # ==================================================
     # 📊 VOLUME (FAST + SAFE)
@@ -81,6 +212,7 @@ class SystemAutomation:
             return f"Volume set to {level}%"
 
         # FINAL fallback (absolute reset)
+        import pyautogui
         for _ in range(50):
             pyautogui.press("volumedown", _pause=False)
         presses = int(level / 2)   # ~2% per key
@@ -94,6 +226,7 @@ class SystemAutomation:
         if iface:
             iface.SetMute(1, None)
         else:
+            import pyautogui
             pyautogui.press("volumemute")
         return "Volume muted"
 
@@ -102,6 +235,7 @@ class SystemAutomation:
         if iface:
             iface.SetMute(0, None)
         else:
+            import pyautogui
             pyautogui.press("volumemute")
         return "Volume unmuted"
 
@@ -140,27 +274,14 @@ class SystemAutomation:
         name_lower = name.lower().strip()
         
         # Check if already running
-        for proc in psutil.process_iter(['name', 'exe']):
-            try:
-                proc_name = proc.info['name'].lower() if proc.info['name'] else ''
-                proc_exe = proc.info['exe'].lower() if proc.info['exe'] else ''
-                
-                if name_lower in proc_name or name_lower in proc_exe:
-                    return True, proc.info['exe']
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
+        running = processes.find(name_lower)
+        if running:
+            return True, processes.exe(running[0]) or None
         
-        # Check common install locations
-        common_paths = [
-            f"C:\\Program Files\\{name}\\{name}.exe",
-            f"C:\\Program Files (x86)\\{name}\\{name}.exe",
-            f"C:\\Program Files\\{name.capitalize()}\\{name}.exe",
-            f"C:\\Program Files (x86)\\{name.capitalize()}\\{name}.exe",
-        ]
-        
-        for path in common_paths:
-            if os.path.exists(path):
-                return True, path
+        # Check the installed-application index
+        path = self._find_installed_app(name_lower)
+        if path:
+            return True, path
         
         return False, None
 
@@ -197,33 +318,81 @@ class SystemAutomation:
     # ==================================================
     # 📦 APPS (ENHANCED WITH SMART FALLBACK)
     # ==================================================
-    def _find_installed_app(self, name):
-        """Optimized to only look at the main shortcut files."""
-        # We only check the main 'Programs' folder, no subfolders unless necessary
-        start_dirs = [
-            Path(os.environ.get("PROGRAMDATA", "")) / "Microsoft/Windows/Start Menu/Programs",
-            Path(os.environ.get("APPDATA", "")) / "Microsoft/Windows/Start Menu/Programs",
-        ]
-        
-        for d in start_dirs:
-            if not d.exists(): continue
-            # Look only for .lnk files in the top level (Much faster than rglob)
+    def _resolve_installed_app(self, name):
+        """(target, kind) from the app index, or None"""
+        index = get_app_index()
+        if not index.ready:
+            # First run, index still building: never block the voice command on it
+            path = self._shallow_start_menu_search(name)
+            return (path, "shortcut") if path else None
+        return index.resolve(name)
+
+    def _shallow_start_menu_search(self, name):
+        """Top-level Start Menu shortcuts only; used until the app index is ready"""
+        for d in default_start_menu_dirs():
+            if not d.exists():
+                continue
             for file in d.glob("*.lnk"):
                 if name in file.stem.lower():
                     return str(file)
         return None
 
+    def _find_installed_app(self, name):
+        """Shortcut/executable path (or shell:AppsFolder id) for an installed app"""
+        found = self._resolve_installed_app(name)
+        return found[0] if found else None
+
+    def _probe_website(self, url):
+        """Final URL if the site answers, None for an HTTP error, NO_SUCH_HOST or PROBE_FAILED"""
+        try:
+            r = self.http.head(url, timeout=WEBSITE_PROBE_TIMEOUT, allow_redirects=True)
+        except Exception as e:
+            return NO_SUCH_HOST if _is_unknown_host(e) else PROBE_FAILED
+        return r.url if r.status_code < 400 else None
+
     def _find_website(self, name):
-        for prefix in ["https://", "https://www."]:
-            for domain in ["com", "org", "net", "io"]:
-                url = f"{prefix}{name}.{domain}"
-                try:
-                    r = requests.head(url, timeout=3, allow_redirects=True)
-                    if r.status_code < 400:
-                        return r.url
-                except:
-                    pass
-        return None
+        """
+        Probe every prefix/TLD at once. Among the sites that answer, the old
+        priority order (https before www, then WEBSITE_DOMAINS order) still wins.
+        """
+        name = name.lower().strip().replace(" ", "")
+        found, url = self.website_cache.get(name)
+        if found:
+            return url
+
+        urls = [f"{prefix}{name}.{domain}" for prefix in WEBSITE_PREFIXES for domain in WEBSITE_DOMAINS]
+        futures = {self._probe_pool.submit(self._probe_website, u): i for i, u in enumerate(urls)}
+        results = {}
+        pending = set(futures)
+        # Redirects can add a round trip or two on top of the per-request timeout
+        deadline = time.monotonic() + WEBSITE_PROBE_TIMEOUT * 2
+        while pending:
+            hits = [i for i, result in results.items() if isinstance(result, str)]
+            if hits and all(i in results for i in range(min(hits))):
+                break  # no higher-priority candidate is still out
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[futures[future]] = future.result()
+                if isinstance(results[futures[future]], str):
+                    deadline = min(deadline, time.monotonic() + WEBSITE_PICK_WINDOW)
+        # Probes still queued are dropped; in-flight ones end at their own timeout
+        for future in pending:
+            future.cancel()
+
+        hits = sorted(i for i, result in results.items() if isinstance(result, str))
+        url = results[hits[0]] if hits else None
+        # A miss is remembered when every candidate got an HTTP error or does not
+        # exist in DNS; timeouts and connection failures say nothing about the site.
+        # "Does not exist" is only trusted while DNS resolves a known host.
+        answers = [result for result in results.values() if result is None or result is NO_SUCH_HOST]
+        if url:
+            self.website_cache.put(name, url)
+        elif len(answers) == len(urls) and (NO_SUCH_HOST not in answers or _dns_reachable()):
+            self.website_cache.put(name, None)
+        return url
 
 
     def open_app(self, name):
@@ -265,13 +434,16 @@ class SystemAutomation:
 
             # Check Desktop App Map
             if name in app_map:
-                os.startfile(app_map[name])
-                return f"Opened {name} instantly."
-
-            # 3. SHALLOW SEARCH (For everything else)
-            path = self._find_installed_app(name)
-            if path:
-                os.startfile(path)
+                try:
+                    os.startfile(app_map[name])
+                    return f"Opened {name} instantly."
+                except OSError:
+                    pass  # not installed at that path; let the index find it
+
+            # 3. INSTALLED APP INDEX (Start Menu, Store apps, App Paths, PATH)
+            found = self._resolve_installed_app(name)
+            if found:
+                launch_app(*found)
                 return f"Opened {name}"
 
         except Exception as e:
@@ -307,36 +479,21 @@ class SystemAutomation:
                 f"{name.capitalize()}.exe"
             ]
             
-            for proc in psutil.process_iter(['name', 'exe']):
+            # Exact name, name containing the term, or exe path containing it
+            for pid in processes.find(name, exact_names=possible_names):
+                # Skips pids that were reused by another process since the table saw them
+                proc = processes.process(pid)
+                if proc is None:
+                    continue
                 try:
-                    proc_name = proc.info['name'].lower() if proc.info['name'] else ''
-                    proc_exe = proc.info['exe'].lower() if proc.info['exe'] else ''
-                    
-                    # Check multiple matching criteria
-                    should_close = False
-                    
-                    # Exact name match
-                    if any(pn.lower() == proc_name for pn in possible_names):
-                        should_close = True
-                    
-                    # Name contains our search term
-                    elif name in proc_name:
-                        should_close = True
-                    
-                    # Exe path contains our search term
-                    elif proc_exe and name in proc_exe:
-                        should_close = True
-                    
-                    if should_close:
-                        proc.terminate()
-                        closed_count += 1
-                        
+                    proc.terminate()
+                    closed_count += 1
                 except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.TimeoutExpired):
                     continue
             
             # Wait a bit for processes to close
             if closed_count > 0:
-                import time
+                processes.invalidate()
                 time.sleep(0.5)
                 return f"Closed {closed_count} instance(s) of {name}."
             else:
@@ -355,6 +512,8 @@ class SystemAutomation:
         prompt = f"Write a professional {content_type} on the topic: {topic}. Keep it concise and well-structured."
 
         try:
+            if limits.acquire("groq", timeout=CHAT_MAX_WAIT) is None:
+                return "Groq is busy right now, please try again in a moment."
             completion = self.groq.chat.completions.create(
                 model="llama-3.3-70b-versatile",
                 messages=[{"role": "user", "content": prompt}],
@@ -410,6 +569,10 @@ class SystemAutomation:
         # Pick a random font from the AI's suggestions, or fallback if list is empty
         chosen_font = random.choice(suggested_fonts) if suggested_fonts else "Arial"
         
+        from pptx import Presentation
+        from pptx.util import Inches, Pt
+        from pptx.dml.color import RGBColor
+
         prs = Presentation()
         prs.slide_width = Inches(13.33)
         prs.slide_height = Inches(7.5)
@@ -480,6 +643,8 @@ class SystemAutomation:
         """
         
         try:
+            if limits.acquire("groq", timeout=CHAT_MAX_WAIT) is None:
+                return self._fallback_slides(topic), ["Arial"]
             r = self.groq.chat.completions.create(
                 model="llama-3.3-70b-versatile",
                 messages=[{"role": "user", "content": prompt}],
@@ -534,11 +699,13 @@ class SystemAutomation:
     def take_screenshot(self):
         filename = f"Screenshot_{datetime.now():%Y%m%d_%H%M%S}.png"
         path = self.data_folder / filename
+        import pyautogui
         pyautogui.screenshot(str(path))
         os.startfile(path)
         return f"Screenshot saved."
 
     def start_screen_recording(self):
+        import pyautogui
         options = ["System Audio", "Mic Audio", "System + Mic"]
         choice = pyautogui.confirm(text="Select Audio Source:", title="SARA Recorder", buttons=options)
         if not choice: return "Recording cancelled."
@@ -548,12 +715,18 @@ class SystemAutomation:
         self.temp_video = str(self.data_folder / "temp_video.mp4")
         self.final_output = str(self.data_folder / f"Recording_{datetime.now():%Y%m%d_%H%M%S}.mp4")
 
-        threading.Thread(target=self._video_recorder).start()
-        threading.Thread(target=self._audio_recorder, args=(choice,)).start()
+        # RecordingMode=ffmpeg encodes the final file in one pass (no temp files, no merge)
+        if get_env().get("RecordingMode", "merge").lower() == "ffmpeg" and shutil.which("ffmpeg"):
+            threading.Thread(target=self._ffmpeg_recorder, args=(choice,)).start()
+        else:
+            self._audio_thread = threading.Thread(target=self._audio_recorder, args=(choice,))
+            self._audio_thread.start()
+            threading.Thread(target=self._video_recorder).start()
 
         return f"🔴 Recording ({choice}). Press F8 to STOP."
 
-    def _audio_recorder(self, choice):
+    def _open_audio_input(self, choice):
+        """Open the loopback or mic stream; returns (pyaudio, stream, rate, channels, sample_width)"""
         import pyaudiowpatch as pyaudio
         p = pyaudio.PyAudio()
         
@@ -571,47 +744,89 @@ class SystemAutomation:
 
         device_info = p.get_device_info_by_index(device_index)
         native_rate = int(device_info.get("defaultSampleRate", 44100))
+        channels = max(1, min(2, int(device_info.get("maxInputChannels", 2))))
 
         stream = p.open(
             format=pyaudio.paInt16, 
-            channels=2, 
+            channels=channels, 
             rate=native_rate,
             input=True, 
             input_device_index=device_index,
-            frames_per_buffer=1024
+            frames_per_buffer=AUDIO_CHUNK
         )
-        
-        frames = []
-        while self.recording:
-            frames.append(stream.read(1024))
-        
-        stream.stop_stream()
-        stream.close()
-        
-        wf = wave.open(self.temp_audio, 'wb')
-        wf.setnchannels(2)
-        wf.setsampwidth(p.get_sample_size(pyaudio.paInt16))
-        wf.setframerate(44100)
-        wf.writeframes(b''.join(frames))
-        wf.close()
-        p.terminate()
-
-    def _video_recorder(self):
-        screen_size = tuple(pyautogui.size())
-        fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-        out = cv2.VideoWriter(self.temp_video, fourcc, 20.0, screen_size)
+        return p, stream, native_rate, channels, p.get_sample_size(pyaudio.paInt16)
 
-        while self.recording:
-            if keyboard.is_pressed("f8"):
-                self.recording = False
-                break
-            
-            img = pyautogui.screenshot()
-            frame = np.array(img)
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            out.write(frame)
+    def _audio_recorder(self, choice):
+        p = stream = None
+        try:
+            p, stream, rate, channels, sample_width = self._open_audio_input(choice)
+            # Written to disk chunk by chunk at the device's own rate
+            stream_audio_to_wav(
+                lambda: stream.read(AUDIO_CHUNK, exception_on_overflow=False),
+                self.temp_audio, rate, channels, sample_width,
+                should_stop=lambda: not self.recording
+            )
+        finally:
+            # Also reached when the device fails to open: the video thread stops too
+            self.recording = False
+            if stream is not None:
+                stream.stop_stream()
+                stream.close()
+            if p is not None:
+                p.terminate()
+
+    def _ffmpeg_recorder(self, choice):
+        p = stream = grabber = None
+        try:
+            p, stream, rate, channels, _ = self._open_audio_input(choice)
+            grabber = ScreenGrabber()
+            stats = record_with_ffmpeg(
+                grabber.grab, grabber.size,
+                lambda: stream.read(AUDIO_CHUNK, exception_on_overflow=False),
+                rate, channels, self._stop_requested, self.final_output, fps=DEFAULT_FPS
+            )
+            print(f"🎞️ Recorded {stats['seconds']}s: {stats['captured']} frames captured "
+                  f"({stats['fps']} fps), {stats['dropped']} dropped")
+            os.startfile(self.data_folder)
+            print(f"✅ Success! Saved to {self.final_output}")
+        except Exception as e:
+            print(f"❌ Recording failed: {e}")
+        finally:
+            self.recording = False
+            if grabber is not None:
+                grabber.close()
+            if stream is not None:
+                stream.stop_stream()
+                stream.close()
+            if p is not None:
+                p.terminate()
+
+    def _stop_requested(self):
+        import keyboard
+        if keyboard.is_pressed("f8"):
+            self.recording = False
+        return not self.recording
 
-        out.release()
+    def _video_recorder(self):
+        grabber = out = None
+        try:
+            import cv2
+            grabber = ScreenGrabber()
+            fourcc = cv2.VideoWriter_fourcc(*"mp4v")
+            out = cv2.VideoWriter(self.temp_video, fourcc, float(DEFAULT_FPS), grabber.size)
+            stats = pace_frames(grabber.grab, out.write, self._stop_requested, fps=DEFAULT_FPS)
+        finally:
+            # A failed setup must still end the recording, or the audio thread never stops
+            self.recording = False
+            if out is not None:
+                out.release()
+            if grabber is not None:
+                grabber.close()
+        print(f"🎞️ Recorded {stats['seconds']}s: {stats['captured']} frames captured "
+              f"({stats['fps']} fps), {stats['dropped']} dropped")
+
+        # The WAV header is only complete once the audio thread has closed the file
+        self._audio_thread.join()
         self._merge_audio_video()
 
     def _merge_audio_video(self):
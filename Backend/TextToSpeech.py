@@ -59,6 +59,7 @@ pygame.mixer.init(frequency=24000, size=-16, channels=1, buffer=256)
 pygame.mixer.music.set_volume(1.0)
 
 STOP_FLAG = threading.Event()
+DRAIN_JOIN_TIMEOUT = 10  # seconds to wait for a stopped sentence stream to close
 
 # =====================
 # UNICODE HANDLING (FIX FOR BUG 5)
@@ -202,14 +203,14 @@ async def tts_chunk_optimized(chunk: str, voice: str) -> BytesIO:
 
 
 
-async def stream_and_convert_optimized(text: str, voice: str, wav_queue: queue.Queue):
+async def stream_and_convert_optimized(text: str, voice: str, wav_queue: queue.Queue, stop: threading.Event):
     """
     Stream with optimized chunking for faster initial playback
     """
     chunks = split_into_chunks(text, max_length=1000)
     
     for chunk in chunks:
-        if STOP_FLAG.is_set():
+        if stop.is_set():
             break
         try:
             wav_io = await tts_chunk_optimized(chunk, voice)
@@ -221,14 +222,86 @@ async def stream_and_convert_optimized(text: str, voice: str, wav_queue: queue.Q
     
     wav_queue.put_nowait(None)  # end signal
 
+
+_SENTENCES_DONE = object()
+
+def _drain_sentences(sentences, loop, pending: asyncio.Queue, stop: threading.Event):
+    """
+    Pull sentences on a worker thread (each next() blocks on the LLM) and hand
+    them to the event loop, so synthesis of one sentence overlaps generation
+    of the next. Stops at the first sentence after stop is set and closes the
+    generator, which runs its cleanup (GUI post, saving the turn).
+    """
+    def post(item):
+        try:
+            loop.call_soon_threadsafe(pending.put_nowait, item)
+        except RuntimeError:
+            pass  # loop already closed (speech was stopped)
+
+    try:
+        for sentence in sentences:
+            if stop.is_set():
+                break
+            post(sentence)
+    except Exception as e:
+        print(f"Sentence stream error: {e}")
+    finally:
+        close = getattr(sentences, "close", None)
+        if close:
+            close()
+        post(_SENTENCES_DONE)
+
+
+async def stream_sentences_and_convert(sentences, wav_queue: queue.Queue, stop: threading.Event, voice: str = None):
+    """
+    Synthesize sentences as they arrive (e.g. from ChatBotStream) so playback
+    of the first sentence starts while the rest is still being generated.
+    Voice is picked from the first sentence when not given. Returns only once
+    the sentence thread has finished, so nothing from this stream runs later.
+    """
+    pending = asyncio.Queue()
+    drain_thread = threading.Thread(
+        target=_drain_sentences,
+        args=(sentences, asyncio.get_running_loop(), pending, stop),
+        name="tts-sentences",
+        daemon=True,
+    )
+    drain_thread.start()
+    try:
+        while not stop.is_set():
+            try:
+                sentence = await asyncio.wait_for(pending.get(), timeout=0.1)
+            except asyncio.TimeoutError:
+                continue
+            if sentence is _SENTENCES_DONE:
+                break
+            chunk = prepare_text_for_tts(clean_text(sentence))
+            if not chunk:
+                continue
+            if voice is None:
+                voice = VOICE_MAP.get(detect_language(chunk), EN_VOICE)
+            try:
+                wav_io = await tts_chunk_optimized(chunk, voice)
+                wav_queue.put_nowait(wav_io)
+            except Exception as e:
+                print(f"TTS chunk error: {e}")
+                continue
+    finally:
+        wav_queue.put_nowait(None)  # end signal
+        stop.set()
+        # Waits for the LLM's next sentence at most; the generator is closed right after
+        await asyncio.get_running_loop().run_in_executor(None, drain_thread.join, DRAIN_JOIN_TIMEOUT)
+        if drain_thread.is_alive():
+            print("⚠️ Sentence stream did not stop in time")
+
 # =====================
 # PLAYBACK THREAD (OPTIMIZED)
 # =====================
-def playback_thread_func(wav_queue: queue.Queue):
+def playback_thread_func(wav_queue: queue.Queue, stop: threading.Event):
     """
     Optimized playback with minimal delays
     """
-    while not STOP_FLAG.is_set():
+    while not stop.is_set():
         try:
             wav_io = wav_queue.get(timeout=0.1)
             if wav_io is None:
@@ -238,7 +311,7 @@ def playback_thread_func(wav_queue: queue.Queue):
                     pygame.mixer.music.load(wav_io)
                     pygame.mixer.music.play()
                     # Reduced sleep time for faster responsiveness
-                    while pygame.mixer.music.get_busy() and not STOP_FLAG.is_set():
+                    while pygame.mixer.music.get_busy() and not stop.is_set():
                         time.sleep(0.005)
                 except Exception as e:
                     print(f"Playback error: {e}")
@@ -257,9 +330,6 @@ class TTSManager:
         if not text or not text.strip():
             return None
 
-        STOP_FLAG.clear()
-        interrupt_query = None
-
         try:
             text = clean_text(text)
             speak_text = prepare_text_for_tts(text)
@@ -269,15 +339,40 @@ class TTSManager:
 
             # Map language to voice
             voice = VOICE_MAP.get(lang, EN_VOICE)
+        except Exception as e:
+            print(f"TTS error: {e}")
+            return None
 
+        return self._run(
+            lambda wav_queue, stop: stream_and_convert_optimized(speak_text, voice, wav_queue, stop),
+            func,
+            check_interrupt
+        )
+
+    def speak_stream(self, sentences, func=None, check_interrupt=None):
+        """Speak an iterable of sentences, starting playback on the first one"""
+        return self._run(
+            lambda wav_queue, stop: stream_sentences_and_convert(sentences, wav_queue, stop),
+            func,
+            check_interrupt
+        )
+
+    def _run(self, synthesize, func=None, check_interrupt=None):
+        # STOP_FLAG is the external request (StopTTS); this speech's threads only
+        # watch their own event, so the next speak() clearing STOP_FLAG cannot
+        # revive them
+        STOP_FLAG.clear()
+        stop = threading.Event()
+        interrupt_query = None
+        synth_thread = play_thread = None
+
+        try:
             wav_queue = queue.Queue()
 
             # Synthesis in background
             loop = asyncio.new_event_loop()
             synth_thread = threading.Thread(
-                target=lambda: loop.run_until_complete(
-                    stream_and_convert_optimized(speak_text, voice, wav_queue)
-                ),
+                target=lambda: loop.run_until_complete(synthesize(wav_queue, stop)),
                 daemon=True
             )
             synth_thread.start()
@@ -285,7 +380,7 @@ class TTSManager:
             # Playback in separate thread
             play_thread = threading.Thread(
                 target=playback_thread_func,
-                args=(wav_queue,),
+                args=(wav_queue, stop),
                 daemon=True
             )
             play_thread.start()
@@ -301,7 +396,6 @@ class TTSManager:
                 if check_interrupt:
                     q = check_interrupt()
                     if q:
-                        STOP_FLAG.set()
                         pygame.mixer.music.stop()
                         interrupt_query = q
                         print(f"🔇 Interrupted: {q}")
@@ -315,16 +409,22 @@ class TTSManager:
 
                 # Increased timeout for longer responses
                 if time.time() - start > 45:
-                    STOP_FLAG.set()
                     break
 
         except Exception as e:
             print(f"TTS error: {e}")
 
         finally:
-            STOP_FLAG.set()
+            stop.set()
             try:
                 pygame.mixer.music.stop()
+            except:
+                pass
+            # The synthesis thread returns only after the sentence stream is closed
+            for thread in (synth_thread, play_thread):
+                if thread is not None:
+                    thread.join(timeout=DRAIN_JOIN_TIMEOUT)
+            try:
                 pygame.mixer.music.unload()
             except:
                 pass
@@ -349,6 +449,9 @@ def StopTTS():
 def TextToSpeech(text, func=lambda: True, check_interrupt=None):
     return tts_manager.speak(text, func, check_interrupt)
 
+def TextToSpeechStream(sentences, func=lambda: True, check_interrupt=None):
+    return tts_manager.speak_stream(sentences, func, check_interrupt)
+
 def QuickSpeak(text):
     return tts_manager.speak(text, None, None)
 
@@ -0,0 +1,397 @@
+"""
+Offline wake-word spotting (MFCC + DTW templates).
+
+Runs on raw 16 kHz / 16-bit mono frames. An energy gate cuts the stream into
+short utterances; each one is compared against the user's recorded templates
+with dynamic time warping, and only close matches are escalated to full
+speech recognition. Silence and background noise never leave the machine.
+
+Usage:
+    python -m Backend.WakeWord enroll [count]
+    python -m Backend.WakeWord benchmark <fixtures_dir> [--templates DIR]
+
+Benchmark fixtures: <fixtures_dir>/positive/*.wav and <fixtures_dir>/negative/*.wav
+(16-bit mono WAV; other rates are resampled to 16 kHz).
+"""
+import os
+import sys
+import time
+import wave
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+TEMPLATE_DIR = "Data/WakeWord"
+
+# MFCC
+N_FFT = 512
+WIN_LENGTH = 400   # 25 ms
+HOP_LENGTH = 160   # 10 ms
+N_MELS = 26
+N_MFCC = 13
+
+# Utterance segmentation
+SPEECH_RATIO = 2.5       # frame rms must exceed noise floor by this factor
+MIN_NOISE_FLOOR = 80.0
+PRE_ROLL_SEC = 0.25
+HANGOVER_SEC = 0.35      # silence that ends an utterance
+MIN_UTTERANCE_SEC = 0.3
+MAX_UTTERANCE_SEC = 2.5  # wake phrases are short; longer speech is ignored
+
+DEFAULT_THRESHOLD = 4.0   # used with a single template
+MIN_THRESHOLD = 2.0
+THRESHOLD_MARGIN = 1.35
+
+# ===============================
+# FEATURES
+# ===============================
+_mel_cache = {}
+
+def _mel_filterbank(sample_rate=SAMPLE_RATE, n_fft=N_FFT, n_mels=N_MELS):
+    key = (sample_rate, n_fft, n_mels)
+    if key in _mel_cache:
+        return _mel_cache[key]
+
+    def hz_to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def mel_to_hz(mel):
+        return 700.0 * (10 ** (mel / 2595.0) - 1.0)
+
+    mel_points = np.linspace(hz_to_mel(0), hz_to_mel(sample_rate / 2), n_mels + 2)
+    bins = np.floor((n_fft + 1) * mel_to_hz(mel_points) / sample_rate).astype(int)
+
+    fbank = np.zeros((n_mels, n_fft // 2 + 1))
+    for m in range(1, n_mels + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        for k in range(left, center):
+            fbank[m - 1, k] = (k - left) / max(center - left, 1)
+        for k in range(center, right):
+            fbank[m - 1, k] = (right - k) / max(right - center, 1)
+
+    # DCT-II basis (orthonormal) for the cepstrum
+    n = np.arange(n_mels)
+    dct = np.cos(np.pi / n_mels * (n + 0.5)[None, :] * np.arange(N_MFCC)[:, None])
+    dct *= np.sqrt(2.0 / n_mels)
+    dct[0] /= np.sqrt(2.0)
+
+    _mel_cache[key] = (fbank, dct)
+    return fbank, dct
+
+def mfcc(samples: np.ndarray, sample_rate=SAMPLE_RATE) -> np.ndarray:
+    """Return an (frames x N_MFCC) matrix with cepstral mean normalization"""
+    signal = samples.astype(np.float32)
+    if len(signal) < WIN_LENGTH:
+        signal = np.pad(signal, (0, WIN_LENGTH - len(signal)))
+
+    signal = np.append(signal[0], signal[1:] - 0.97 * signal[:-1])
+
+    n_frames = 1 + (len(signal) - WIN_LENGTH) // HOP_LENGTH
+    idx = np.arange(WIN_LENGTH)[None, :] + HOP_LENGTH * np.arange(n_frames)[:, None]
+    frames = signal[idx] * np.hamming(WIN_LENGTH)
+
+    power = np.abs(np.fft.rfft(frames, N_FFT)) ** 2 / N_FFT
+    fbank, dct = _mel_filterbank(sample_rate)
+    mel_energy = np.log(power @ fbank.T + 1e-10)
+    features = mel_energy @ dct.T
+
+    return features - features.mean(axis=0)
+
+def dtw_distance(a: np.ndarray, b: np.ndarray, band=None) -> float:
+    """Length-normalized DTW distance between two feature sequences"""
+    n, m = len(a), len(b)
+    if n == 0 or m == 0:
+        return float("inf")
+
+    cost = np.sqrt(((a[:, None, :] - b[None, :, :]) ** 2).sum(axis=2))
+    band = band or max(n, m)
+
+    acc = np.full((n + 1, m + 1), np.inf)
+    acc[0, 0] = 0.0
+    for i in range(1, n + 1):
+        center = int(round(i * m / n))
+        j_start = max(1, center - band)
+        j_end = min(m, center + band)
+        row_cost = cost[i - 1]
+        prev = acc[i - 1]
+        cur = acc[i]
+        for j in range(j_start, j_end + 1):
+            cur[j] = row_cost[j - 1] + min(prev[j - 1], prev[j], cur[j - 1])
+
+    return float(acc[n, m] / (n + m))
+
+def trim_silence(samples: np.ndarray, margin_sec=0.05) -> np.ndarray:
+    """Cut leading/trailing low-energy audio so templates and utterances align"""
+    hop = HOP_LENGTH
+    n = len(samples) // hop
+    if n == 0:
+        return samples
+    frames = samples[:n * hop].astype(np.float32).reshape(n, hop)
+    rms = np.sqrt((frames ** 2).mean(axis=1))
+    threshold = max(MIN_NOISE_FLOOR * SPEECH_RATIO, 0.1 * rms.max())
+    voiced = np.nonzero(rms > threshold)[0]
+    if len(voiced) == 0:
+        return samples
+    margin = int(margin_sec * SAMPLE_RATE)
+    start = max(0, voiced[0] * hop - margin)
+    end = min(len(samples), (voiced[-1] + 1) * hop + margin)
+    return samples[start:end]
+
+# ===============================
+# TEMPLATES
+# ===============================
+def read_wav(path) -> np.ndarray:
+    """Read a 16-bit WAV as mono int16 at SAMPLE_RATE"""
+    with wave.open(str(path), "rb") as wf:
+        channels = wf.getnchannels()
+        rate = wf.getframerate()
+        if wf.getsampwidth() != SAMPLE_WIDTH:
+            raise ValueError(f"{path}: only 16-bit WAV is supported")
+        samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    if rate != SAMPLE_RATE:
+        positions = np.arange(0, len(samples), rate / SAMPLE_RATE)
+        samples = np.interp(positions, np.arange(len(samples)), samples).astype(np.int16)
+    return samples
+
+def write_wav(path, raw: bytes):
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(SAMPLE_WIDTH)
+        wf.setframerate(SAMPLE_RATE)
+        wf.writeframes(raw)
+
+def load_templates(template_dir=TEMPLATE_DIR) -> list:
+    folder = Path(template_dir)
+    if not folder.exists():
+        return []
+    return [mfcc(trim_silence(read_wav(p))) for p in sorted(folder.glob("*.wav"))]
+
+def calibrate_threshold(templates: list) -> float:
+    """Accept anything closer to a template than the templates are to each other (plus margin)"""
+    if len(templates) < 2:
+        return DEFAULT_THRESHOLD
+    distances = [
+        dtw_distance(a, b)
+        for i, a in enumerate(templates)
+        for b in templates[i + 1:]
+    ]
+    return max(max(distances) * THRESHOLD_MARGIN, MIN_THRESHOLD)
+
+# ===============================
+# DETECTOR
+# ===============================
+class WakeWordDetector:
+    """
+    Feed raw frames with process(); it returns the utterance bytes when a
+    segment matches a template (a candidate to confirm), otherwise None.
+    """
+    def __init__(self, templates, threshold=None, sample_rate=SAMPLE_RATE):
+        self.templates = templates
+        self.threshold = threshold if threshold is not None else calibrate_threshold(templates)
+        self.sample_rate = sample_rate
+        self.noise_floor = None
+        self.last_distance = None
+        self.last_decision_ms = 0.0
+        self.last_latency_ms = 0.0
+
+        self._pre_roll = deque()
+        self._pre_roll_samples = 0
+        self._utterance = []
+        self._utterance_samples = 0
+        self._silence_samples = 0
+        self._too_long = False
+
+    def reset(self):
+        self._pre_roll.clear()
+        self._pre_roll_samples = 0
+        self._utterance = []
+        self._utterance_samples = 0
+        self._silence_samples = 0
+        self._too_long = False
+
+    def process(self, frame: bytes):
+        samples = np.frombuffer(frame, dtype=np.int16)
+        if len(samples) == 0:
+            return None
+        rms = float(np.sqrt(np.mean(samples.astype(np.float32) ** 2)))
+
+        if self.noise_floor is None:
+            self.noise_floor = max(rms, MIN_NOISE_FLOOR)
+        is_speech = rms > self.noise_floor * SPEECH_RATIO
+
+        if not self._utterance:
+            if not is_speech:
+                # Noise floor only tracks non-speech frames
+                self.noise_floor = max(MIN_NOISE_FLOOR, 0.95 * self.noise_floor + 0.05 * rms)
+                self._push_pre_roll(frame, len(samples))
+                return None
+            self._utterance = list(self._pre_roll)
+            self._utterance_samples = self._pre_roll_samples
+            self._pre_roll.clear()
+            self._pre_roll_samples = 0
+
+        self._utterance.append(frame)
+        self._utterance_samples += len(samples)
+        self._silence_samples = 0 if is_speech else self._silence_samples + len(samples)
+
+        if self._utterance_samples > MAX_UTTERANCE_SEC * self.sample_rate:
+            self._too_long = True
+
+        if self._silence_samples < HANGOVER_SEC * self.sample_rate:
+            return None
+
+        # Utterance finished
+        raw = b"".join(self._utterance)
+        speech_samples = self._utterance_samples - self._silence_samples
+        hangover_ms = 1000 * self._silence_samples / self.sample_rate
+        too_long = self._too_long
+        self.reset()
+
+        if too_long or speech_samples < MIN_UTTERANCE_SEC * self.sample_rate:
+            return None
+        if not self.matches(raw):
+            return None
+        # End of speech -> decision: silence hangover plus feature/DTW time
+        self.last_latency_ms = hangover_ms + self.last_decision_ms
+        return raw
+
+    def matches(self, raw: bytes) -> bool:
+        start = time.perf_counter()
+        features = mfcc(trim_silence(np.frombuffer(raw, dtype=np.int16)), self.sample_rate)
+        band = max(10, len(features) // 3)
+        self.last_distance = min(
+            (dtw_distance(features, t, band=max(band, abs(len(features) - len(t)) + 5)) for t in self.templates),
+            default=float("inf")
+        )
+        self.last_decision_ms = (time.perf_counter() - start) * 1000
+        return self.last_distance <= self.threshold
+
+    def _push_pre_roll(self, frame, n_samples):
+        self._pre_roll.append(frame)
+        self._pre_roll_samples += n_samples
+        while self._pre_roll_samples > PRE_ROLL_SEC * self.sample_rate and len(self._pre_roll) > 1:
+            self._pre_roll_samples -= len(self._pre_roll.popleft()) // SAMPLE_WIDTH
+
+_detector = None
+
+def get_detector(template_dir=TEMPLATE_DIR):
+    """Shared detector built from the enrolled templates, or None if none are enrolled"""
+    global _detector
+    if _detector is None:
+        templates = load_templates(template_dir)
+        if templates:
+            _detector = WakeWordDetector(templates)
+            print(f"🎯 Local wake word: {len(templates)} templates (threshold {_detector.threshold:.1f})")
+    return _detector
+
+# ===============================
+# ENROLLMENT
+# ===============================
+def enroll(count=4, template_dir=TEMPLATE_DIR):
+    """Record the user saying the wake phrase a few times"""
+    import speech_recognition as sr
+
+    folder = Path(template_dir)
+    folder.mkdir(parents=True, exist_ok=True)
+    recognizer = sr.Recognizer()
+
+    with sr.Microphone(sample_rate=SAMPLE_RATE) as source:
+        recognizer.adjust_for_ambient_noise(source, duration=1.0)
+        for i in range(count):
+            print(f"🎙️ ({i + 1}/{count}) Say 'Ok Sara'...")
+            audio = recognizer.listen(source, timeout=10, phrase_time_limit=MAX_UTTERANCE_SEC)
+            raw = audio.get_raw_data(convert_rate=SAMPLE_RATE, convert_width=SAMPLE_WIDTH)
+            path = folder / f"template_{int(time.time())}_{i}.wav"
+            write_wav(path, raw)
+            print(f"💾 Saved {path}")
+
+    templates = load_templates(template_dir)
+    print(f"✅ {len(templates)} templates, threshold {calibrate_threshold(templates):.1f}")
+
+# ===============================
+# BENCHMARK HARNESS
+# ===============================
+def _replay(detector, samples, chunk=1024):
+    """Replay samples through the detector; return (detected, latency ms, per-utterance decision ms)"""
+    detector.reset()
+    detector.noise_floor = None
+    decision_ms = []
+    # Trailing silence so the last utterance is closed
+    padded = np.concatenate([samples, np.zeros(int(HANGOVER_SEC * SAMPLE_RATE) + chunk, dtype=np.int16)])
+    for start in range(0, len(padded), chunk):
+        result = detector.process(padded[start:start + chunk].tobytes())
+        if detector.last_distance is not None:
+            decision_ms.append(detector.last_decision_ms)
+            detector.last_distance = None
+        if result is not None:
+            return True, detector.last_latency_ms, decision_ms
+    return False, None, decision_ms
+
+def benchmark(fixtures_dir, template_dir=TEMPLATE_DIR):
+    templates = load_templates(template_dir)
+    if not templates:
+        print(f"❌ No templates in {template_dir}. Run: python -m Backend.WakeWord enroll")
+        return None
+
+    detector = WakeWordDetector(templates)
+    fixtures = Path(fixtures_dir)
+    stats = {"positive": [0, 0], "negative": [0, 0]}
+    seconds = {"positive": 0.0, "negative": 0.0}
+    latencies = []
+    decisions = []
+
+    cpu_start = time.process_time()
+    for label in ("positive", "negative"):
+        for path in sorted((fixtures / label).glob("*.wav")):
+            samples = read_wav(path)
+            seconds[label] += len(samples) / SAMPLE_RATE
+            detected, latency_ms, decision_ms = _replay(detector, samples)
+            decisions.extend(decision_ms)
+            stats[label][0] += 1
+            stats[label][1] += int(detected)
+            if detected and label == "positive":
+                latencies.append(latency_ms)
+            print(f"  {'✅' if detected == (label == 'positive') else '❌'} {label}/{path.name}")
+    cpu_seconds = time.process_time() - cpu_start
+
+    pos_total, pos_hits = stats["positive"]
+    neg_total, neg_hits = stats["negative"]
+    audio_seconds = seconds["positive"] + seconds["negative"]
+    # Only negative audio can produce a false accept; positives would dilute the rate
+    neg_hours = seconds["negative"] / 3600
+    report = {
+        "templates": len(templates),
+        "threshold": round(detector.threshold, 2),
+        "false_reject_rate": (pos_total - pos_hits) / pos_total if pos_total else None,
+        "false_accept_rate": neg_hits / neg_total if neg_total else None,
+        "false_accepts_per_hour": neg_hits / neg_hours if neg_hours else None,
+        "detection_latency_ms_mean": float(np.mean(latencies)) if latencies else None,
+        "decision_ms_mean": float(np.mean(decisions)) if decisions else None,
+        "decision_ms_p95": float(np.percentile(decisions, 95)) if decisions else None,
+        "cpu_percent_of_realtime": 100 * cpu_seconds / audio_seconds if audio_seconds else None,
+    }
+
+    print("\n📊 Wake word benchmark")
+    for key, value in report.items():
+        print(f"  {key}: {value:.3f}" if isinstance(value, float) else f"  {key}: {value}")
+    return report
+
+if __name__ == "__main__":
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+    args = sys.argv[1:]
+
+    if args and args[0] == "enroll":
+        enroll(int(args[1]) if len(args) > 1 else 4)
+    elif len(args) >= 2 and args[0] == "benchmark":
+        template_dir = TEMPLATE_DIR
+        if "--templates" in args:
+            template_dir = args[args.index("--templates") + 1]
+        benchmark(args[1], template_dir)
+    else:
+        print(__doc__)
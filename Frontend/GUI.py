@@ -2,7 +2,7 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QTextEdit, QStackedWidge
                              QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QFrame, 
                              QLabel, QSizePolicy, QGraphicsDropShadowEffect)
 from PyQt5.QtGui import QIcon, QColor, QTextCharFormat, QFont, QPixmap, QTextBlockFormat, QPainter, QPen, QCursor, QMovie
-from PyQt5.QtCore import Qt, QTimer, QPoint, QRect, QPropertyAnimation, QEasingCurve, QSize
+from PyQt5.QtCore import Qt, QTimer, QPoint, QRect, QPropertyAnimation, QEasingCurve, QSize, QObject, pyqtSignal
 from dotenv import dotenv_values
 import sys
 import os
@@ -10,14 +10,17 @@ import ctypes
 from ctypes import wintypes
 import win32gui
 import win32process
-import psutil
 import warnings
 warnings.filterwarnings("ignore", category=UserWarning, module = "pygame")
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Backend.EventBus import bus, STATUS, RESPONSE, MIC, EXIT, IMAGE_JOB
+from Backend.ProcessTable import processes
+
 env_vars = dotenv_values('.env')
 AssistantName = env_vars.get('AssistantName')
 current_dir = os.getcwd()
-old_chat_message = ""
 TempDirPath = rf"{current_dir}/Frontend/Files"
 GraphicsDirPath = r"C:\Users\as\Desktop\SARA\Frontend\Graphics"
 
@@ -43,29 +46,22 @@ def QueryModifier(Query):
     return new_query.capitalize()
 
 def SetMicrophoneStatus(Command):
-    with open(rf'{TempDirPath}/Mic.data', 'w', encoding='utf-8') as file:
-        file.write(Command)
+    bus.publish(MIC, str(Command) == 'True')
 
 def GetMicrophoneStatus():
-    with open(rf'{TempDirPath}/Mic.data', 'r', encoding='utf-8') as file:
-        Status = file.read()
-    return Status
+    return 'True' if bus.last(MIC, False) else 'False'
 
 def SetAssistantStatus(Status):
-    with open(rf'{TempDirPath}/Status.data', 'w', encoding='utf-8') as file:
-        file.write(Status)
+    bus.publish(STATUS, str(Status))
 
 def GetAssistantStatus():
-    with open(rf'{TempDirPath}/Status.data', 'r', encoding='utf-8') as file:
-        Status = file.read()
-    return Status
+    return bus.last(STATUS, "")
 
 def MicButtonInitiated():
     SetMicrophoneStatus('False')
 
 def SignalExit():
-    with open(rf"{TempDirPath}/exit.signal", "w") as f:
-        f.write("EXIT")
+    bus.publish(EXIT, True)
 
 def MicButtonClosed():
     SetMicrophoneStatus('True')
@@ -75,8 +71,29 @@ def GraphicsDirectoryPath(FileName):
     return Path
 
 def ShowTextToScreen(Text):
-    with open(rf'{TempDirPath}/Responses.data', 'w', encoding='utf-8') as file:
-        file.write(Text)
+    bus.publish(RESPONSE, str(Text))
+
+class GuiBridge(QObject):
+    """Re-emits event bus updates as Qt signals (queued onto the GUI thread)"""
+    status_changed = pyqtSignal(str)
+    response_posted = pyqtSignal(str)
+    mic_changed = pyqtSignal(bool)
+    image_job_changed = pyqtSignal(dict)
+
+    def __init__(self):
+        super().__init__()
+        bus.subscribe(STATUS, self.status_changed.emit, replay=True)
+        bus.subscribe(RESPONSE, self.response_posted.emit)
+        bus.subscribe(MIC, self.mic_changed.emit, replay=True)
+        bus.subscribe(IMAGE_JOB, self.image_job_changed.emit)
+
+_bridge = None
+
+def GetGuiBridge():
+    global _bridge
+    if _bridge is None:
+        _bridge = GuiBridge()
+    return _bridge
 
 # 🆕 Helper functions for tracking snapped apps
 def get_snapped_apps():
@@ -226,13 +243,26 @@ class ChatSession(QWidget):
         self.label.setAlignment(Qt.AlignCenter)
         layout.addWidget(self.label)
         
+        # Progress of background image jobs (hidden while none are running)
+        self.image_jobs = {}
+        self.jobs_label = QLabel("")
+        self.jobs_label.setStyleSheet("""
+            color: rgba(120, 190, 255, 0.9);
+            font-size: 13px;
+            padding: 4px 10px;
+        """)
+        self.jobs_label.setAlignment(Qt.AlignCenter)
+        self.jobs_label.hide()
+        layout.addWidget(self.jobs_label)
+        
         font = QFont("Segoe UI", 11)
         self.chat_text_edit.setFont(font)
         
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.loadMessages)
-        self.timer.timeout.connect(self.SpeechRecogText)
-        self.timer.start(50)
+        bridge = GetGuiBridge()
+        bridge.response_posted.connect(self.loadMessages)
+        bridge.status_changed.connect(self.SpeechRecogText)
+        bridge.image_job_changed.connect(self.updateImageJob)
+        self.label.setText(GetAssistantStatus())
         
         self.setStyleSheet("""
             QScrollBar:vertical {
@@ -257,24 +287,26 @@ class ChatSession(QWidget):
             self.movie.setScaledSize(QSize(size, size))
         super().resizeEvent(event)
 
-    def loadMessages(self):
-        global old_chat_message
-        try:
-            with open(rf'{TempDirPath}/Responses.data', 'r', encoding='utf-8') as file:
-                messages = file.read()
-                if messages and len(messages) > 1 and str(old_chat_message) != str(messages):
-                    self.addMessage(message=messages, color='White')
-                    old_chat_message = messages
-        except:
-            pass
+    def loadMessages(self, messages):
+        if messages and len(messages) > 1:
+            self.addMessage(message=messages, color='White')
 
-    def SpeechRecogText(self):
-        try:
-            with open(rf'{TempDirPath}/Status.data', 'r', encoding='utf-8') as file:
-                messages = file.read()
-                self.label.setText(messages)
-        except:
-            pass
+    def SpeechRecogText(self, status):
+        self.label.setText(status)
+
+    def updateImageJob(self, job):
+        if job["state"] in ("done", "failed"):
+            self.image_jobs.pop(job["id"], None)
+            if job["state"] == "done":
+                self.addMessage(message=f"🖼️ Image ready: {job['prompt']} ({job['path']})", color='White')
+            else:
+                self.addMessage(message=f"⚠️ Image failed: {job['prompt']}", color='White')
+        else:
+            self.image_jobs[job["id"]] = job
+        
+        lines = [f"🎨 {j['prompt'][:40]} - {j['stage']} ({j['progress']:.0%})" for j in self.image_jobs.values()]
+        self.jobs_label.setText("\n".join(lines))
+        self.jobs_label.setVisible(bool(lines))
 
     def addMessage(self, message, color):
         cursor = self.chat_text_edit.textCursor()
@@ -289,7 +321,6 @@ class ChatSession(QWidget):
         self.chat_text_edit.setTextCursor(cursor)
 
     def closeEvent(self, event):
-        self.timer.stop()
         if self.movie:
             self.movie.stop()
         event.accept()
@@ -331,10 +362,10 @@ class InitialScreen(QWidget):
         button_layout.addStretch()
         layout.addWidget(button_container)
         
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_status)
-        self.timer.timeout.connect(self.update_mic_icon)
-        self.timer.start(100)
+        bridge = GetGuiBridge()
+        bridge.status_changed.connect(self.update_status)
+        bridge.mic_changed.connect(self.update_mic_icon)
+        self.status_label.setText(GetAssistantStatus())
 
     def resizeEvent(self, event):
         if self.movie and self.width() > 50 and self.height() > 50:
@@ -342,28 +373,18 @@ class InitialScreen(QWidget):
             self.movie.setScaledSize(QSize(size, size))
         super().resizeEvent(event)
 
-    def update_status(self):
-        try:
-            with open(rf'{TempDirPath}/Status.data', 'r', encoding='utf-8') as file:
-                status = file.read()
-                self.status_label.setText(status)
-        except:
-            pass
+    def update_status(self, status):
+        self.status_label.setText(status)
 
-    def update_mic_icon(self):
-        status = GetMicrophoneStatus()
-        if status == 'True' and not self.mic_button.is_active:
-            self.mic_button.is_active = True
-            self.mic_button.updateIcon()
-        elif status == 'False' and self.mic_button.is_active:
-            self.mic_button.is_active = False
+    def update_mic_icon(self, active):
+        if active != self.mic_button.is_active:
+            self.mic_button.is_active = active
             self.mic_button.updateIcon()
 
     def toggle_mic(self):
         pass
 
     def closeEvent(self, event):
-        self.timer.stop()
         if self.movie:
             self.movie.stop()
         event.accept()
@@ -614,12 +635,8 @@ class MainWindow(QMainWindow):
         if not snapped_apps:
             return
         
-        # Get all running process names
-        running_processes = {}
-        for proc in psutil.process_iter(['name', 'pid']):
-            if proc.info['name']:
-                proc_name = proc.info['name'].lower().replace('.exe', '')
-                running_processes[proc_name] = proc.info['pid']
+        # Running process names from the shared snapshot (refreshed at most once per second)
+        running_processes = processes.names()
         
         # Check if any snapped app is no longer running
         apps_to_remove = []
@@ -632,7 +649,7 @@ class MainWindow(QMainWindow):
                 app_found = True
             else:
                 # Check partial matches (more flexible)
-                for proc_name in running_processes.keys():
+                for proc_name in running_processes:
                     # Check if app name is in process name or vice versa
                     if app_lower in proc_name or proc_name in app_lower:
                         app_found = True
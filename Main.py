@@ -10,32 +10,52 @@ import sys
 import time
 import threading
 import subprocess
+import queue
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from dotenv import dotenv_values
 from datetime import datetime
-from Backend.TextToSpeech import TextToSpeech, StopTTS
-from Backend.SpeechToText import get_interrupt_query, clear_interrupt_queue, start_interrupt_detection, stop_interrupt_detection
-from Backend.TextToSpeech import StopTTS
-from Frontend.GUI import SetAssistantStatus
-from Backend.System_Automation import SystemAutomation
-from Backend.Chatbot import ChatBot
-from Backend.RealtimeSearchEngine import RealtimeSearchEngine
-from Frontend.GUI import ShowTextToScreen, SetAssistantStatus
-from Backend.TextToSpeech import StopTTS
-from Backend.SpeechToText import (
-        SpeechRecognition, HotwordDetection, calibrate_microphone,
-        start_interrupt_detection, stop_interrupt_detection,
-        get_interrupt_query, clear_interrupt_queue
-    )
 from Frontend.GUI import GraphicalUserInterface, ShowTextToScreen, SetAssistantStatus
-from Backend.Model import FirstLayerDMM
-from Backend.TextToSpeech import StopTTS
-from Frontend.GUI import GraphicalUserInterface
+from Backend.EventBus import bus, MIC, EXIT, IMAGE_JOB
+from Backend.LazyImport import lazy_callable, preload
 
 # ==========================================
-# IMPORT IMAGE GENERATION MODULE
+# LAZY BACKEND IMPORTS
 # ==========================================
-from Backend.ImageGeneration import GenerateImages
+# Only the GUI loads up front; each backend is imported on first call
+# (or by the background preload once the window is showing).
+TextToSpeech = lazy_callable("Backend.TextToSpeech", "TextToSpeech")
+TextToSpeechStream = lazy_callable("Backend.TextToSpeech", "TextToSpeechStream")
+StopTTS = lazy_callable("Backend.TextToSpeech", "StopTTS")
+
+SpeechRecognition = lazy_callable("Backend.SpeechToText", "SpeechRecognition")
+HotwordDetection = lazy_callable("Backend.SpeechToText", "HotwordDetection")
+calibrate_microphone = lazy_callable("Backend.SpeechToText", "calibrate_microphone")
+start_interrupt_detection = lazy_callable("Backend.SpeechToText", "start_interrupt_detection")
+stop_interrupt_detection = lazy_callable("Backend.SpeechToText", "stop_interrupt_detection")
+get_interrupt_query = lazy_callable("Backend.SpeechToText", "get_interrupt_query")
+clear_interrupt_queue = lazy_callable("Backend.SpeechToText", "clear_interrupt_queue")
+discard_preroll = lazy_callable("Backend.SpeechToText", "discard_preroll")
+has_pending_command = lazy_callable("Backend.SpeechToText", "has_pending_command")
+
+FirstLayerDMM = lazy_callable("Backend.Model", "FirstLayerDMM")
+ChatBot = lazy_callable("Backend.Chatbot", "ChatBot")
+ChatBotStream = lazy_callable("Backend.Chatbot", "ChatBotStream")
+RealtimeSearchEngineStream = lazy_callable("Backend.RealtimeSearchEngine", "RealtimeSearchEngineStream")
+PrefetchSearch = lazy_callable("Backend.RealtimeSearchEngine", "PrefetchSearch")
+get_automation = lazy_callable("Backend.System_Automation", "get_automation")
+warm_up = lazy_callable("Backend.System_Automation", "warm_up")
+SubmitImageJob = lazy_callable("Backend.ImageGeneration", "SubmitImageJob")
+
+# Hotword path first, then routing/answering, then automation (+ client warm-up)
+PRELOAD_MODULES = (
+    "Backend.SpeechToText",
+    "Backend.TextToSpeech",
+    "Backend.Model",
+    "Backend.Chatbot",
+    "Backend.RealtimeSearchEngine",
+    "Backend.System_Automation",
+)
 
 env_vars = dotenv_values('.env')
 AssistantName = env_vars.get('AssistantName', 'SARA')
@@ -46,9 +66,6 @@ Path("Frontend/Files").mkdir(parents=True, exist_ok=True)
 
 TEMP_DIR = "Frontend/Files"
 for file_name, default_content in [
-    ("Mic.data", "False"),
-    ("Status.data", "Idle"),
-    ("Responses.data", ""),
     ("ImageGeneration.data", "False,False"),
     ("snap.data", ""),
     ("snapped_apps.data", "")
@@ -57,14 +74,6 @@ for file_name, default_content in [
     if not file_path.exists():
         file_path.write_text(default_content)
 
-exit_signal = Path(TEMP_DIR) / "exit.signal"
-if exit_signal.exists():
-    exit_signal.unlink()
-
-(Path(TEMP_DIR) / "Status.data").write_text("")
-(Path(TEMP_DIR) / "Mic.data").write_text("")
-(Path(TEMP_DIR) / "Responses.data").write_text("")
-
 print(f"🚀 Initializing {AssistantName}...")
 
 exit_lock = threading.Lock()
@@ -77,22 +86,13 @@ has_greeted_once = False
 # Lazy-loaded modules will be imported inside functions
 
 def check_exit_signal():
-    if (Path(TEMP_DIR) / "exit.signal").exists():
-        (Path(TEMP_DIR) / "exit.signal").unlink()
-        return True
-    return False
+    return bool(bus.consume(EXIT, False))
 
 def get_mic_status():
-    try:
-        return (Path(TEMP_DIR) / "Mic.data").read_text().strip() == "True"
-    except:
-        return False
+    return bool(bus.last(MIC, False))
 
 def set_mic_status(status: bool):
-    try:
-        (Path(TEMP_DIR) / "Mic.data").write_text("True" if status else "False")
-    except:
-        pass
+    bus.publish(MIC, bool(status))
 
 def cleanup_and_exit():
     global should_exit, is_speaking
@@ -108,6 +108,34 @@ def cleanup_and_exit():
     set_mic_status(False)
     sys.exit(0)
 
+# ==========================================
+# BACKGROUND JOB ANNOUNCEMENTS
+# ==========================================
+# Finished image jobs queue a spoken announcement; assistant_loop speaks
+# them between turns (the GUI already shows the result when it happens).
+announcements = queue.Queue()
+
+def on_image_job(job):
+    if job["state"] == "done":
+        announcements.put(f"Your image of {job['prompt']} is ready.")
+    elif job["state"] == "failed":
+        announcements.put(f"Sorry, I couldn't generate the image of {job['prompt']}.")
+
+bus.subscribe(IMAGE_JOB, on_image_job)
+
+def has_announcements():
+    return not announcements.empty()
+
+def announce_finished_jobs():
+    while True:
+        try:
+            text = announcements.get_nowait()
+        except queue.Empty:
+            return
+        interrupt = speak_with_interrupt(text)
+        if interrupt:
+            execute_plan(FirstLayerDMM(interrupt))
+
 def speak_with_interrupt(text):
     global is_speaking, last_activity_time
     
@@ -129,6 +157,45 @@ def speak_with_interrupt(text):
             is_speaking = False
         stop_interrupt_detection()
 
+def show_when_complete(sentences):
+    """Pass sentences through to TTS and post the full answer to the GUI once it ends"""
+    parts = []
+    try:
+        for sentence in sentences:
+            parts.append(sentence)
+            yield sentence
+    finally:
+        sentences.close()
+        response = "".join(parts).strip()
+        if response:
+            ShowTextToScreen(response)
+
+def speak_stream_with_interrupt(sentences):
+    global is_speaking, last_activity_time
+    
+    with exit_lock:
+        is_speaking = True
+        clear_interrupt_queue()
+    
+    start_interrupt_detection()
+    
+    try:
+        interrupt_query = TextToSpeechStream(
+            show_when_complete(sentences), lambda: is_speaking, lambda: get_interrupt_query()
+        )
+        last_activity_time = time.time()
+        return interrupt_query
+    finally:
+        with exit_lock:
+            is_speaking = False
+        stop_interrupt_detection()
+
+def prefetch_realtime_searches(tasks):
+    """Start web searches for realtime tasks right after routing, before they execute"""
+    for task in tasks:
+        if task.lower().startswith("realtime "):
+            PrefetchSearch(task.replace("realtime ", "").strip())
+
 # ==========================================
 # ENHANCED IMAGE PROMPT EXTRACTION
 # ==========================================
@@ -147,6 +214,126 @@ def extract_image_prompt(query: str) -> str:
     return query
 
 
+# ==========================================
+# EXECUTION PLANNER
+# ==========================================
+# Tasks with these prefixes only fire an action and return a short confirmation,
+# so consecutive ones can run together and be announced in one utterance.
+INDEPENDENT_PREFIXES = ("open ", "close ", "play ", "google search ", "youtube search ")
+INDEPENDENT_SYSTEM_COMMANDS = ("set to", "mute", "unmute")
+
+def _init_task_worker():
+    # pycaw needs COM initialised on the thread that touches the endpoint
+    try:
+        import comtypes
+        comtypes.CoInitialize()
+    except Exception:
+        pass
+
+task_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="task", initializer=_init_task_worker)
+
+def is_independent(task: str) -> bool:
+    task_lower = task.lower().strip()
+    if task_lower.startswith("system "):
+        sys_cmd = task_lower.replace("system ", "", 1)
+        return any(cmd in sys_cmd for cmd in INDEPENDENT_SYSTEM_COMMANDS)
+    return task_lower.startswith(INDEPENDENT_PREFIXES)
+
+def resource_key(task: str) -> str:
+    """Tasks sharing a key touch the same thing and keep their relative order"""
+    task_lower = task.lower().strip()
+    if task_lower.startswith("system "):
+        return "volume"
+    for prefix in ("open ", "close "):
+        if task_lower.startswith(prefix):
+            return "app:" + task_lower[len(prefix):].strip()
+    return task_lower
+
+def plan_tasks(tasks):
+    """Split tasks into steps: runs of independent tasks are batched, everything else stays ordered"""
+    plan = []
+    for task in tasks:
+        if is_independent(task):
+            if plan and plan[-1][0] == "parallel":
+                plan[-1][1].append(task)
+            else:
+                plan.append(("parallel", [task]))
+        else:
+            plan.append(("ordered", [task]))
+    return plan
+
+def run_independent_task(task: str) -> str:
+    """Execute an independent task and return its spoken confirmation (display text goes to the GUI)"""
+    automation = get_automation()
+    task_lower = task.lower().strip()
+    
+    try:
+        if task_lower.startswith("open "):
+            result = automation.open_app(task[5:].strip())
+            if isinstance(result, dict):
+                ShowTextToScreen(result["display"])
+                return result["speech"]
+            ShowTextToScreen(result)
+            return result
+        
+        if task_lower.startswith("close "):
+            response = automation.close_app(task[6:].strip())
+        elif task_lower.startswith("play "):
+            response = automation.play_on_youtube(task[5:].strip())
+        elif task_lower.startswith("google search "):
+            response = automation.google_search(task[14:].strip())
+        elif task_lower.startswith("youtube search "):
+            response = automation.youtube_search(task[15:].strip())
+        else:
+            sys_cmd = task_lower.replace("system ", "", 1).strip()
+            if "set to" in sys_cmd:
+                response = automation.set_volume(sys_cmd.replace("set to ", "").strip())
+            elif "unmute" in sys_cmd:
+                response = automation.unmute_volume()
+            else:
+                response = automation.mute_volume()
+    except Exception as e:
+        print(f"❌ Task '{task}' failed: {e}")
+        response = f"Could not {task_lower}."
+    
+    ShowTextToScreen(response)
+    return response
+
+def run_parallel(tasks):
+    """Run a batch of independent tasks on the pool; returns confirmations in task order"""
+    chains = {}
+    for index, task in enumerate(tasks):
+        chains.setdefault(resource_key(task), []).append((index, task))
+    
+    def run_chain(chain):
+        return [(index, run_independent_task(task)) for index, task in chain]
+    
+    futures = [task_executor.submit(run_chain, chain) for chain in chains.values()]
+    results = {}
+    for future in futures:
+        results.update(future.result())
+    return [results[i] for i in sorted(results) if results[i]]
+
+def execute_plan(tasks):
+    """Execute routed tasks; returns an interrupt query if the user cut in"""
+    for mode, batch in plan_tasks(tasks):
+        if should_exit:
+            return None
+        
+        if mode == "parallel":
+            if len(batch) > 1:
+                print(f"⚡ Running in parallel: {batch}")
+            confirmations = run_parallel(batch)
+            interrupt = speak_with_interrupt(" ".join(confirmations))
+        else:
+            # Pass 'task' as both the intent and the specific query for that task
+            # so execution never falls back to the full original 'query'
+            interrupt = execute_task(batch[0], batch[0])
+        
+        if interrupt:
+            return interrupt
+    return None
+
 # ==========================================
 # TASK EXECUTION WITH FIXED IMAGE GENERATION
 # ==========================================
@@ -157,7 +344,7 @@ def execute_task(task: str, query: str):
     
     # Lazy imports inside function
     
-    automation = SystemAutomation()
+    automation = get_automation()
     
     try:
         if task_lower == "exit":
@@ -168,7 +355,7 @@ def execute_task(task: str, query: str):
             return None
         
         # ==========================================
-        # IMAGE GENERATION (DIRECT CALL)
+        # IMAGE GENERATION (BACKGROUND JOB)
         # ==========================================
         elif task_lower.startswith("generate image"):
 
@@ -181,16 +368,17 @@ def execute_task(task: str, query: str):
 
             print(f"🎨 Generating image for: {prompt}")
 
-            ShowTextToScreen(f"Generating image: {prompt}")
-            speak_with_interrupt(f"Generating image of {prompt}")
-
             try:
-                # DIRECT CALL to your ImageGeneration.py
-                GenerateImages(prompt)
-                response = "Image generated successfully."
+                # Runs in the background; completion is announced by announce_finished_jobs
+                job_id = SubmitImageJob(prompt)
+                if job_id is None:
+                    response = "I can't start another image right now, please try again shortly."
+                else:
+                    print(f"📥 Image job {job_id} queued")
+                    response = f"Started generating an image of {prompt}. I'll let you know when it's ready."
             except Exception as e:
                 print("Image generation error:", e)
-                response = "Image generation failed."
+                response = "Sorry, image generation failed to start."
 
             ShowTextToScreen(response)
             return speak_with_interrupt(response)
@@ -221,65 +409,17 @@ def execute_task(task: str, query: str):
             return speak_with_interrupt(response)
         
         # ==========================================
-        # APP MANAGEMENT
-        # ==========================================
-        elif task.startswith("open "):
-            app_name = task.replace("open ", "").strip()
-            result = automation.open_app(app_name)
-            if isinstance(result, dict):
-                ShowTextToScreen(result["display"])
-                TextToSpeech(result["speech"])
-            else:
-                ShowTextToScreen(result)
-                TextToSpeech(result)
-        
-        elif task_lower.startswith("close "):
-            app = task.replace("close ", "").strip()
-            ShowTextToScreen(f"Closing: {app}")
-            response = automation.close_app(app)
-            ShowTextToScreen(response)
-            return speak_with_interrupt(response)
-        
-        # ==========================================
-        # MEDIA PLAYBACK & SEARCH
+        # APP MANAGEMENT, MEDIA, SEARCH & VOLUME
         # ==========================================
-        elif task_lower.startswith("play "):
-            topic = task.replace("play ", "").strip()
-            ShowTextToScreen(f"Playing: {topic}")
-            response = automation.play_on_youtube(topic)
-            ShowTextToScreen(response)
-            return speak_with_interrupt(response)
-        
-        elif task_lower.startswith("google search "):
-            search_query = task.replace("google search ", "").strip()
-            ShowTextToScreen(f"Searching Google for: {search_query}")
-            response = automation.google_search(search_query)
-            ShowTextToScreen(response)
-            return speak_with_interrupt(response)
-        
-        elif task_lower.startswith("youtube search "):
-            search_query = task.replace("youtube search ", "").strip()
-            ShowTextToScreen(f"Searching YouTube for: {search_query}")
-            response = automation.youtube_search(search_query)
-            ShowTextToScreen(response)
-            return speak_with_interrupt(response)
+        elif is_independent(task):
+            return speak_with_interrupt(run_independent_task(task))
         
         # ==========================================
         # SYSTEM COMMANDS
         # ==========================================
         elif task_lower.startswith("system "):
             sys_cmd = task.replace("system ", "").strip().lower()
-            if "set to" in sys_cmd:
-                level = sys_cmd.replace("set to ", "").strip()
-                ShowTextToScreen(f"Setting volume to: {level}")
-                response = automation.set_volume(level)
-            elif "mute" in sys_cmd:
-                ShowTextToScreen("Muting volume")
-                response = automation.mute_volume()
-            elif "unmute" in sys_cmd:
-                ShowTextToScreen("Unmuting volume")
-                response = automation.unmute_volume()
-            elif "screenshot" in sys_cmd or "take screenshot" in sys_cmd:
+            if "screenshot" in sys_cmd or "take screenshot" in sys_cmd:
                 ShowTextToScreen("Taking screenshot")
                 response = automation.take_screenshot()
             elif "record" in sys_cmd or "start screen recording" in sys_cmd:
@@ -308,18 +448,13 @@ def execute_task(task: str, query: str):
         elif task_lower.startswith("general "):
             q = task.replace("general ", "").strip()
             ShowTextToScreen(f"Processing: {q}")
-            response = ChatBot(q)
-            ShowTextToScreen(response)  # Then update GUI
-            interrupt = speak_with_interrupt(response)  # Speak first
-            return interrupt
+            # Sentences are spoken as they are generated; GUI gets the full answer at the end
+            return speak_stream_with_interrupt(ChatBotStream(q))
         
         elif task_lower.startswith("realtime "):
             q = task.replace("realtime ", "").strip()
             ShowTextToScreen(f"Searching realtime: {q}")
-            response = RealtimeSearchEngine(q)
-            ShowTextToScreen(response)  # Then update GUI
-            interrupt = speak_with_interrupt(response)  # Speak first
-            return interrupt
+            return speak_stream_with_interrupt(RealtimeSearchEngineStream(q))
         
         # ==========================================
         # DEFAULT: CHATBOT
@@ -357,6 +492,8 @@ def assistant_loop():
                 cleanup_and_exit()
                 break
             
+            announce_finished_jobs()
+            
             if get_mic_status():
                 if time.time() - last_activity_time > 10:
                     SetAssistantStatus("💤 Standby...")
@@ -367,23 +504,26 @@ def assistant_loop():
             
             if not get_mic_status():
                 SetAssistantStatus(f"Say 'Ok {AssistantName}'...")
-                activated = HotwordDetection()
+                activated = HotwordDetection(wake=has_announcements)
                 
                 if activated:
                     set_mic_status(True)
                     is_conversation_active = True
                     last_activity_time = time.time()
                     
-                    if not has_greeted_once:
+                    # Skip the greeting when the command came with the hotword
+                    if not has_greeted_once and not has_pending_command():
                         greeting = f"Hello {Username}! How can i help you today?"
                         ShowTextToScreen(greeting)
                         speak_with_interrupt(f"Hello {Username}. How can i help you today?")
                         has_greeted_once = True
+                        # Pre-roll would now hold the greeting, not the user
+                        discard_preroll()
                 
                 continue
             
             SetAssistantStatus("🎤 Listening...")
-            query = SpeechRecognition(timeout=5, phrase_limit=10)  # Increased phrase_limit
+            query = SpeechRecognition(timeout=5, phrase_limit=10, use_preroll=True)  # Increased phrase_limit
             
             if not query or not query.strip():
                 time.sleep(0.03)
@@ -397,24 +537,16 @@ def assistant_loop():
             
             SetAssistantStatus("🧠 Processing...")
             tasks = FirstLayerDMM(query)
+            prefetch_realtime_searches(tasks)
             
             print(f"🎯 Tasks: {tasks}")
             
-            # In Main.py -> assistant_loop
-
-            for task in tasks:
-                if should_exit:
-                    break
-                # FIX: Pass 'task' as both the intent and the specific query for that task
-                # This prevents the execution from falling back to the full original 'query'
-                interrupt = execute_task(task, task) 
-                
-                if interrupt:
-                    new_tasks = FirstLayerDMM(interrupt)
-                    for nt in new_tasks:
-                        execute_task(nt, nt)
-                    break
-                time.sleep(0.08)
+            interrupt = execute_plan(tasks)
+            
+            if interrupt:
+                new_tasks = FirstLayerDMM(interrupt)
+                prefetch_realtime_searches(new_tasks)
+                execute_plan(new_tasks)
             
             clear_interrupt_queue()
             time.sleep(0.03)
@@ -430,6 +562,9 @@ def main():
     print(f"  {AssistantName} - Optimized Version (Image Gen Fixed)")
     print("="*60 + "\n")
     
+    # Import the backends and connect the automation clients while the GUI comes up
+    preload(*PRELOAD_MODULES, then=warm_up)
+    
     assistant_thread = threading.Thread(target=assistant_loop, daemon=True)
     assistant_thread.start()
     
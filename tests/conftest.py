@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Tests import Backend.* the same way the app does, from the repository root
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
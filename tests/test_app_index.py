@@ -0,0 +1,107 @@
+import os
+import time
+
+import pytest
+
+from Backend.AppIndex import AppIndex
+
+
+def touch(path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("")
+
+
+@pytest.fixture
+def start_menu(tmp_path):
+    root = tmp_path / "Programs"
+    for rel in [
+        "Google Chrome.lnk",
+        "Microsoft Teams.lnk",
+        "Visual Studio Code/Visual Studio Code.lnk",
+        "Python 3.12/Python 3.12 Module Docs (64-bit).lnk",
+        "Python 3.12/IDLE (Python 3.12 64-bit).lnk",
+        "VLC/Uninstall VLC.lnk",
+        "VLC/VLC media player.lnk",
+        "Tools/HelpDesk.lnk",
+        "Tools/Help and Support.lnk",
+        "Tools/notes.txt",
+    ]:
+        touch(root / rel)
+    return root
+
+
+def make_index(root, index_path=None):
+    return AppIndex(start_menu_dirs=[root], path_dirs=[], index_path=index_path,
+                    include_registry=False, include_uwp=False)
+
+
+def target(index, name):
+    found = index.resolve(name)
+    return os.path.basename(found[0]) if found else None
+
+
+def test_exact_whole_word_and_prefix_matches(start_menu):
+    index = make_index(start_menu)
+    index.refresh()
+    assert target(index, "Google Chrome") == "Google Chrome.lnk"
+    assert target(index, "chrome") == "Google Chrome.lnk"
+    assert target(index, "teams") == "Microsoft Teams.lnk"
+    assert target(index, "visual studio") == "Visual Studio Code.lnk"
+
+
+def test_partial_match_must_cover_enough_of_the_name(start_menu):
+    index = make_index(start_menu)
+    index.refresh()
+    # One word out of "python 3 12 module docs 64 bit" is not enough to launch it
+    assert index.resolve("python") is None
+    assert index.resolve("code") is None
+    assert index.resolve("vis") is None
+
+
+def test_skip_words_match_whole_words_only(start_menu):
+    index = make_index(start_menu)
+    index.refresh()
+    assert target(index, "helpdesk") == "HelpDesk.lnk"
+    assert index.resolve("help and support") is None
+    assert index.resolve("uninstall vlc") is None
+    assert target(index, "vlc media player") == "VLC media player.lnk"
+    assert index.resolve("notes") is None  # not a shortcut extension
+
+
+def test_incremental_refresh_relists_only_changed_directories(start_menu):
+    index = make_index(start_menu)
+    cold = index.refresh()
+    assert cold["listed"] == 5 and cold["reused"] == 0
+
+    warm = index.refresh()
+    assert warm["listed"] == 0 and warm["reused"] == 5
+
+    time.sleep(0.01)
+    touch(start_menu / "Tools" / "Spotify.lnk")
+    changed = index.refresh()
+    assert changed["listed"] == 1 and changed["reused"] == 4
+    assert target(index, "spotify") == "Spotify.lnk"
+
+
+def test_removed_directories_are_forgotten(start_menu):
+    index = make_index(start_menu)
+    index.refresh()
+    for file in (start_menu / "VLC").iterdir():
+        file.unlink()
+    (start_menu / "VLC").rmdir()
+    stats = index.refresh()
+    assert stats["listed"] == 1  # the root, whose mtime changed
+    assert index.resolve("vlc media player") is None
+
+
+def test_saved_index_is_ready_and_reused(start_menu, tmp_path):
+    path = tmp_path / "app_index.json"
+    first = make_index(start_menu, path)
+    assert not first.ready
+    first.refresh()
+    assert first.ready
+
+    second = make_index(start_menu, path)
+    assert second.ready
+    assert target(second, "chrome") == "Google Chrome.lnk"
+    assert second.refresh()["listed"] == 0
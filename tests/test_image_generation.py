@@ -0,0 +1,117 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+for dependency in ("aiohttp", "requests", "PIL", "bs4", "dotenv"):
+    pytest.importorskip(dependency)
+
+import Backend.ImageGeneration as ig
+
+
+@pytest.fixture
+def prompt_cache(tmp_path, monkeypatch):
+    cache = ig.PromptCache(path=tmp_path / "image_prompt_cache.json")
+    monkeypatch.setattr(ig, "prompt_cache", cache)
+    return cache
+
+
+def sources(monkeypatch, wiki, ddg):
+    async def fake_wikipedia(query):
+        return wiki
+
+    async def fake_duckduckgo(query):
+        return ddg
+
+    monkeypatch.setattr(ig, "search_wikipedia", fake_wikipedia)
+    monkeypatch.setattr(ig, "search_duckduckgo", fake_duckduckgo)
+
+
+def test_prompt_is_not_cached_when_a_source_was_unreachable(prompt_cache, monkeypatch):
+    sources(monkeypatch, wiki=None, ddg=[])
+    positive, _ = asyncio.run(ig.create_web_enhanced_prompt("a red fox"))
+    assert positive.startswith("a red fox")
+    assert prompt_cache.get("a red fox") is None
+
+
+def test_prompt_is_cached_when_every_source_answered(prompt_cache, monkeypatch):
+    sources(monkeypatch, wiki="", ddg=[])
+    positive, negative = asyncio.run(ig.create_web_enhanced_prompt("a red fox"))
+    assert prompt_cache.get("a red fox") == (positive, negative)
+
+
+# ===============================
+# Race against the local stub endpoint
+# ===============================
+RACE_MODELS = [
+    {"name": "test/overloaded", "steps": 1, "guidance": 1.0},
+    {"name": "test/fast", "steps": 1, "guidance": 1.0},
+    {"name": "test/slow", "steps": 1, "guidance": 1.0},
+]
+STUB = {
+    "test/overloaded": ("503", 0.05),   # answers 503 with estimated_time 1s, then retries
+    "test/fast": ("ok", 0.4),
+    "test/slow": ("ok", 3.0),
+}
+
+
+@pytest.fixture
+def model_stats(tmp_path, monkeypatch):
+    stats = ig.ModelStats(path=tmp_path / "image_model_stats.json")
+    monkeypatch.setattr(ig, "model_stats", stats)
+    return stats
+
+
+def race_against_stub(monkeypatch, hedge_delay):
+    """(image, seconds, [(model, seconds after start)]) for one race; the stub keeps running 1.5s after it"""
+    from aiohttp import ClientSession, web
+    seen = []
+
+    async def scenario():
+        runner = web.AppRunner(ig.make_stub_app(STUB, seen))
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        monkeypatch.setattr(ig, "HF_BASE_URL", f"http://127.0.0.1:{port}/models")
+        try:
+            async with ClientSession() as session:
+                start = time.perf_counter()
+                image = await ig.race_models(session, "a red fox", "", models=RACE_MODELS,
+                                             hedge_delay=hedge_delay)
+                elapsed = time.perf_counter() - start
+                # Long enough for the overloaded model's retry to arrive had it not been cancelled
+                await asyncio.sleep(1.5)
+        finally:
+            await runner.cleanup()
+        return image, elapsed, [(name, at - start) for name, at in seen]
+
+    return asyncio.run(scenario())
+
+
+def test_503_starts_the_next_model_before_the_hedge_delay(model_stats, monkeypatch):
+    saved_on = []
+    save = model_stats.save
+    monkeypatch.setattr(model_stats, "save", lambda: (saved_on.append(threading.current_thread()), save()))
+
+    image, elapsed, seen = race_against_stub(monkeypatch, hedge_delay=10)
+    assert image.startswith(b"\x89PNG")
+    assert [name for name, _ in seen] == ["test/overloaded", "test/fast"]
+    assert seen[1][1] < 0.3          # hedged on the 503, not after 10 s
+    assert elapsed < 1.0
+    # Stats are written off the event loop thread
+    assert saved_on and threading.main_thread() not in saved_on
+
+
+def test_first_image_cancels_the_other_requests(model_stats, monkeypatch):
+    image, elapsed, seen = race_against_stub(monkeypatch, hedge_delay=0.1)
+    assert image.startswith(b"\x89PNG")
+    names = [name for name, _ in seen]
+    assert names == ["test/overloaded", "test/fast", "test/slow"]   # no retry after the win
+    assert elapsed < 1.0                                            # did not wait for test/slow
+    # Cancelled requests record nothing; the winner is ranked first next time
+    assert set(model_stats.snapshot()) == {"test/fast"}
+    assert [m["name"] for m in model_stats.ordered(RACE_MODELS)][0] == "test/fast"
+    assert json.loads(model_stats.path.read_text())["test/fast"]["successes"] == 1
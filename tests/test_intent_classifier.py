@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+pytest.importorskip("dotenv")
+
+from Backend.IntentClassifier import (EVAL_PATH, intent_classifier, is_phatic, labels_from,
+                                      load_eval, reaches_classifier, tasks_for_label)
+from Backend.IntentEngine import classify
+
+
+RUNNING = {"chrome", "spotify", "notepad"}
+
+
+def is_running(name):
+    return name in RUNNING
+
+
+def local_route(prompt):
+    """Tasks FirstLayerDMM returns for a prompt without calling Cohere"""
+    tasks = classify(prompt)
+    if tasks != [f"general {prompt}"]:
+        return tasks
+    label = intent_classifier.classify(prompt)
+    assert label is not None, f"{prompt!r} would go to Cohere"
+    return (tasks_for_label(label, prompt, is_running) if label != "general" else None) or tasks
+
+
+@pytest.mark.parametrize("prompt, expected", [
+    ("shut down chrome", ["close chrome"]),
+    ("quit spotify", ["close spotify"]),
+    ("fire up spotify", ["open spotify"]),
+    ("bring up the settings", ["open settings"]),
+    ("i'd like to listen to taylor swift", ["play taylor swift"]),
+    ("look up flights to goa", ["google search flights to goa"]),
+    ("max volume", ["system set to 100"]),
+    ("silence the computer", ["system mute"]),
+    ("capture my screen", ["system screenshot"]),
+])
+def test_labelled_prompts_keep_only_the_target(prompt, expected):
+    assert local_route(prompt) == expected
+
+
+@pytest.mark.parametrize("prompt", [
+    "quit now", "shut it down", "stop it",              # close with nothing to close
+    "turn off spotify", "get whatsapp running",         # ambiguous verbs
+    "turn off the lights", "louder please",             # system paraphrases Main cannot execute
+    "never mind", "thanks", "ok cool", "thank you sara",
+])
+def test_prompts_without_an_actionable_target_stay_general(prompt):
+    assert local_route(prompt) == [f"general {prompt}"]
+
+
+def test_phatic_replies_are_general_with_full_margin():
+    assert is_phatic("Never mind.")
+    assert not is_phatic("never mind the weather, open chrome")
+    assert intent_classifier.predict("never mind") == ("general", 1.0)
+
+
+@pytest.mark.parametrize("prompt", [
+    "shut up", "end the call", "put on some weight", "stop the music", "make it stop",
+    "get some rest", "i need to use the bathroom", "close up", "quit now", "play it",
+])
+@pytest.mark.parametrize("label", ["open", "close", "play", "google search", "youtube search"])
+def test_idioms_never_become_app_or_media_tasks(label, prompt):
+    # Even with every name "running": no unambiguous verb or no real target
+    assert tasks_for_label(label, prompt, is_running=lambda name: True) is None
+
+
+def test_close_needs_a_process_with_exactly_that_name():
+    assert tasks_for_label("close", "shut down chrome", is_running) == ["close chrome"]
+    assert tasks_for_label("close", "close the updater", is_running) is None
+    assert tasks_for_label("close", "shut down chrome") is None
+
+
+def test_cohere_labels_use_the_same_extraction():
+    assert tasks_for_label("play", "play believer") == ["play believer"]
+    assert tasks_for_label("realtime", "bitcoin price") == ["realtime bitcoin price"]
+    assert tasks_for_label("close", "close it", is_running) is None
+
+
+def test_eval_set_only_holds_prompts_that_reach_the_classifier():
+    with open(EVAL_PATH, encoding="utf-8") as f:
+        entries = json.load(f)
+    assert [p for p in entries if not reaches_classifier(p)] == []
+    assert set(labels_from(entries, "hand")) == set(entries)
+    assert all(set(labels) <= {"hand", "cohere"} for labels in entries.values())
+
+
+def test_load_eval_drops_prompts_the_rules_route(tmp_path):
+    path = tmp_path / "intent_eval.json"
+    path.write_text('{"open chrome": {"hand": "open", "cohere": "open"},'
+                    ' "fire up spotify": {"hand": "open"}}')
+    entries = load_eval(path)
+    assert list(entries) == ["fire up spotify"]
+    assert labels_from(entries, "cohere") == {}
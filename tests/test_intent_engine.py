@@ -0,0 +1,12 @@
+from Backend.IntentEngine import check_golden, classify, load_golden
+
+
+def test_golden_corpus_matches():
+    golden = load_golden()
+    assert len(golden) > 100
+    assert check_golden(golden) == []
+
+
+def test_empty_command_is_a_greeting():
+    assert classify("") == ["general hello"]
+    assert classify("   ") == ["general hello"]
@@ -0,0 +1,18 @@
+import os
+
+import pytest
+
+pytest.importorskip("dotenv")
+
+from Backend.LazyImport import DEFAULT_BUDGET_MS, EAGER_FORBIDDEN, measure_import
+from conftest import ROOT
+
+
+def test_main_startup_stays_lazy_and_within_budget(tmp_path):
+    # Main creates its Data/ and Frontend/Files/ state relative to the cwd, so
+    # import it from a scratch directory instead of the working tree
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    total_us, rows = measure_import("Main", cwd=tmp_path, env=env)
+    eager = {name for _, name in rows if name in EAGER_FORBIDDEN}
+    assert not eager, f"imported at startup: {sorted(eager)}"
+    assert total_us / 1000 <= DEFAULT_BUDGET_MS
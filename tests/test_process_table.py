@@ -0,0 +1,44 @@
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("psutil")
+
+from Backend.ProcessTable import ProcessTable
+
+
+@pytest.fixture
+def child():
+    proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    yield proc
+    proc.kill()
+    proc.wait()
+
+
+def test_process_is_returned_while_the_pid_is_the_same_process(child):
+    table = ProcessTable(ttl=0)
+    table.refresh(force=True)
+    assert child.pid in table.find("python")
+    assert table.process(child.pid).pid == child.pid
+
+
+def test_reused_pid_is_not_handed_out(child):
+    table = ProcessTable(ttl=60)
+    table.refresh(force=True)
+    name, exe, created = table._procs[child.pid]
+    # Same pid, different process: what a reused pid looks like to the table
+    table._procs[child.pid] = (name, exe, created - 100)
+    assert table.process(child.pid) is None
+    assert child.pid not in table._procs
+
+    table.refresh(force=True)
+    assert table.process(child.pid).pid == child.pid
+
+
+def test_exited_process_is_dropped(child):
+    table = ProcessTable(ttl=60)
+    table.refresh(force=True)
+    child.kill()
+    child.wait()
+    assert table.process(child.pid) is None
@@ -0,0 +1,23 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("dotenv")
+
+from Backend.RateLimiter import RateLimiter
+
+
+def test_acquire_gives_up_past_the_timeout():
+    limiter = RateLimiter({"demo": (60, 1)})
+    assert limiter.acquire("demo", timeout=0.1) == 0.0
+    assert limiter.acquire("demo", timeout=0.1) is None
+    assert limiter.stats()["demo"]["rejected"] == 1
+    assert limiter.stats()["demo"]["calls"] == 1
+
+
+def test_acquire_async_waits_for_the_next_token():
+    limiter = RateLimiter({"demo": (600, 1)})
+    assert limiter.acquire("demo") == 0.0
+    waited = asyncio.run(limiter.acquire_async("demo", timeout=1))
+    assert 0 < waited <= 0.11
+    assert limiter.stats()["demo"]["throttled"] == 1
@@ -0,0 +1,33 @@
+import time
+
+from Backend.RoutingCache import RoutingCache
+
+
+def test_entries_round_trip_with_their_own_ttl(tmp_path):
+    path = tmp_path / "routing_cache.json"
+    cache = RoutingCache(path=path, ttl=3600)
+    cache.put("classify", "open chrome", ["open chrome"])
+    cache.put("classify", "never mind", None, ttl=60)
+
+    reloaded = RoutingCache(path=path, ttl=3600)
+    assert reloaded.get("classify", "open chrome") == (True, ["open chrome"])
+    assert reloaded.get("classify", "never mind") == (True, None)
+    assert reloaded._entries["classify:never mind"][2] == 60
+
+
+def test_short_ttl_entry_expires_first(tmp_path, monkeypatch):
+    cache = RoutingCache(path=tmp_path / "routing_cache.json", ttl=3600)
+    cache.put("classify", "open chrome", ["open chrome"])
+    cache.put("classify", "never mind", None, ttl=60)
+
+    later = time.time() + 120
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert cache.get("classify", "never mind") == (False, None)
+    assert cache.get("classify", "open chrome") == (True, ["open chrome"])
+
+
+def test_old_three_field_rows_still_load(tmp_path):
+    path = tmp_path / "routing_cache.json"
+    path.write_text('{"entries": [["classify:open chrome", ["open chrome"], %f]]}' % time.time())
+    cache = RoutingCache(path=path, ttl=3600)
+    assert cache.get("classify", "open chrome") == (True, ["open chrome"])
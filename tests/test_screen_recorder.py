@@ -0,0 +1,175 @@
+import json
+import os
+import shutil
+import stat
+import sys
+import textwrap
+import time
+import wave
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from Backend.ScreenRecorder import (pace_frames, record_with_ffmpeg, sine_source,
+                                    stream_audio_to_wav, synthetic_frames)
+
+SIZE = (160, 90)
+
+# Speaks just enough of ffmpeg's interface for record_with_ffmpeg: raw BGR
+# frames on stdin, PCM from the tcp://...?listen=1 input, output path last.
+# Writes what it received to the output file as JSON.
+STUB_FFMPEG = """
+import json, socket, sys, threading
+args = sys.argv[1:]
+width, height = map(int, args[args.index("-s") + 1].split("x"))
+port = int(next(a for a in args if a.startswith("tcp://")).split(":")[2].split("?")[0])
+server = socket.socket()
+server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+server.bind(("127.0.0.1", port))
+server.listen(1)
+audio = {"bytes": 0}
+
+def receive():
+    conn, _ = server.accept()
+    while True:
+        data = conn.recv(65536)
+        if not data:
+            break
+        audio["bytes"] += len(data)
+
+receiver = threading.Thread(target=receive)
+receiver.start()
+frame_bytes = width * height * 3
+frames = 0
+while True:
+    data = sys.stdin.buffer.read(frame_bytes)
+    if len(data) < frame_bytes:
+        break
+    frames += 1
+receiver.join(timeout=5)
+with open(args[-1], "w") as f:
+    json.dump({"frames": frames, "audio_bytes": audio["bytes"]}, f)
+"""
+
+
+@pytest.fixture
+def stub_ffmpeg(tmp_path):
+    if sys.platform == "win32":
+        pytest.skip("stub ffmpeg is a shebang script")
+    path = tmp_path / "ffmpeg"
+    path.write_text(f"#!{sys.executable}\n" + textwrap.dedent(STUB_FFMPEG))
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return str(path)
+
+
+def stop_after(seconds):
+    began = time.perf_counter()
+    return lambda: time.perf_counter() - began > seconds
+
+
+
+class FakeClock:
+    """Time only moves when the code under test sleeps or a grab takes a while"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_pace_frames_writes_one_frame_per_slot():
+    clock = FakeClock()
+    written = []
+    stats = pace_frames(lambda: "frame", written.append, lambda: clock.now >= 1.0,
+                        fps=10, clock=clock, sleep=clock.sleep)
+    assert stats["captured"] == stats["written"] == len(written) == 10
+    assert stats["dropped"] == 0
+    assert stats["seconds"] == 1.0
+
+
+def test_pace_frames_repeats_frames_when_capture_falls_behind():
+    clock = FakeClock()
+    written = []
+
+    def slow_grab():
+        clock.now += 0.25
+        return clock.now
+
+    stats = pace_frames(slow_grab, written.append, lambda: clock.now >= 1.0,
+                        fps=10, clock=clock, sleep=clock.sleep)
+    # The last grab overruns the stop time; every slot it covered is still filled
+    assert stats["captured"] == 4
+    assert stats["written"] == len(written) == round(stats["seconds"] * 10)
+    assert stats["dropped"] == stats["written"] - stats["captured"]
+    assert written[:3] == [0.25, 0.25, 0.25]
+
+
+def test_stream_audio_to_wav_writes_until_stopped(tmp_path):
+    # An empty read (nothing buffered yet) is skipped, not written
+    chunks = [b"\x01\x00\x02\x00" * 256, b"", b"\x03\x00\x04\x00" * 128]
+    pending = list(chunks)
+    path = tmp_path / "audio.wav"
+    frames = stream_audio_to_wav(lambda: pending.pop(0), path, 44100, channels=2, sample_width=2,
+                                 should_stop=lambda: not pending)
+    assert frames == 256 + 128
+    with wave.open(str(path), "rb") as wf:
+        assert (wf.getnchannels(), wf.getsampwidth(), wf.getframerate()) == (2, 2, 44100)
+        assert wf.readframes(wf.getnframes()) == b"".join(chunks)
+
+
+def test_stream_audio_to_wav_closes_the_file_when_a_read_fails(tmp_path):
+    reads = iter([b"\x00\x00" * 64])
+
+    def read_chunk():
+        chunk = next(reads, None)
+        if chunk is None:
+            raise OSError("device lost")
+        return chunk
+
+    path = tmp_path / "audio.wav"
+    with pytest.raises(OSError):
+        stream_audio_to_wav(read_chunk, path, 16000, channels=1, sample_width=2)
+    # Header was finalized on the way out, so what was recorded stays playable
+    with wave.open(str(path), "rb") as wf:
+        assert wf.getnframes() == 64
+
+
+def test_frames_and_audio_reach_ffmpeg(stub_ffmpeg, tmp_path):
+    output = tmp_path / "out.json"
+    stats = record_with_ffmpeg(synthetic_frames(*SIZE), SIZE, sine_source(), 44100, 2,
+                               should_stop=stop_after(1.0), output=output, fps=10, ffmpeg=stub_ffmpeg)
+    received = json.loads(output.read_text())
+    assert received["frames"] == stats["written"] >= 9
+    # About one second of 16-bit stereo; the audio thread may stop a chunk early
+    assert received["audio_bytes"] >= 44100 * 4 * 0.8
+
+
+def test_audio_failure_does_not_hang(stub_ffmpeg, tmp_path):
+    def broken_audio():
+        raise ValueError("device lost")
+
+    began = time.perf_counter()
+    with pytest.raises((OSError, RuntimeError)):
+        record_with_ffmpeg(synthetic_frames(*SIZE), SIZE, broken_audio, 44100, 2,
+                           should_stop=stop_after(10.0), output=tmp_path / "out.json",
+                           fps=10, ffmpeg=stub_ffmpeg)
+    assert time.perf_counter() - began < 5
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not on PATH")
+def test_real_ffmpeg_encodes_frames_and_silence(tmp_path):
+    output = tmp_path / "out.mp4"
+    silence = bytes(1024 * 4)
+
+    def read_silence():
+        time.sleep(1024 / 44100)
+        return silence
+
+    record_with_ffmpeg(synthetic_frames(*SIZE), SIZE, read_silence, 44100, 2,
+                       should_stop=stop_after(1.0), output=output, fps=10)
+    assert os.path.getsize(output) > 0
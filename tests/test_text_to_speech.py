@@ -0,0 +1,65 @@
+import os
+import time
+from io import BytesIO
+
+import pytest
+
+for dependency in ("pygame", "edge_tts", "unidecode", "langdetect", "dotenv"):
+    pytest.importorskip(dependency)
+
+# TextToSpeech opens the mixer at import; CI machines have no sound card
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import Backend.TextToSpeech as tts
+
+
+@pytest.fixture
+def synthesized(monkeypatch):
+    chunks = []
+
+    async def fake_tts(chunk, voice):
+        chunks.append(chunk)
+        return BytesIO(b"")
+
+    monkeypatch.setattr(tts, "tts_chunk_optimized", fake_tts)
+    return chunks
+
+
+def test_interrupt_closes_the_sentence_stream_before_returning(synthesized):
+    events = []
+
+    def sentences():
+        try:
+            yield "First sentence."
+            time.sleep(0.3)  # the LLM is still generating when the user interrupts
+            yield "Second sentence."
+            yield "Third sentence."
+        finally:
+            events.append("closed")
+
+    start = time.time()
+    result = tts.TextToSpeechStream(
+        sentences(), check_interrupt=lambda: "stop" if time.time() - start > 0.1 else None
+    )
+
+    assert result == "stop"
+    assert events == ["closed"]          # cleanup ran before the next turn can start
+    assert synthesized in ([], ["First sentence."])   # nothing after the interrupt
+
+
+def test_next_speak_does_not_revive_a_stopped_stream(synthesized):
+    events = []
+
+    def sentences():
+        try:
+            yield "One."
+            time.sleep(0.2)
+            yield "Two."
+        finally:
+            events.append("closed")
+
+    tts.TextToSpeechStream(sentences(), func=lambda: False)
+    assert events == ["closed"]
+    tts.TextToSpeech("Next answer.")
+    assert "Two." not in synthesized
+    assert synthesized[-1] == "Next answer."